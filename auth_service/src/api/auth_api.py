@@ -3,14 +3,21 @@ from faststream.rabbit import RabbitExchange, ExchangeType
 from faststream.rabbit.fastapi import RabbitRouter
 
 from src.core import get_auth_service, get_user_service
-from src.core.logging_config import logger
+from src.core.logging_config import logger, hot_path_logger
+from src.core.metrics import broker_metrics_middleware
+from src.core.tracing import broker_tracing_middleware
 from src.config import get_settings
 from src.schemas import Token, LoginRequest, UserCreate, UserResponse, UserEvent
 from src.services import AuthService, UserService
 from src.exceptions import AlreadyExistError, AuthenticationError, NotFoundError
 
 settings = get_settings()
-router = RabbitRouter(settings.rabbitmq_url, prefix="/auth")
+router = RabbitRouter(
+    settings.rabbitmq_url,
+    prefix="/auth",
+    graceful_timeout=settings.shutdown_timeout,
+    middlewares=[broker_metrics_middleware, broker_tracing_middleware],
+)
 
 
 @router.post("/register", response_model=UserResponse, status_code=status.HTTP_201_CREATED)
@@ -41,7 +48,7 @@ async def register(
         )
 
         # Отправка события в RabbitMQ
-        logger.info(f"User created successfully: {user.id} - {user.username}")
+        logger.info("User created successfully: %s - %s", user.id, user.username)
         await router.broker.publish(
             message=user_event.model_dump(),
             exchange=RabbitExchange(name="user_created", type=ExchangeType.FANOUT),
@@ -49,13 +56,13 @@ async def register(
         return user
 
     except NotFoundError as e:
-        logger.warning(f"User logging is failed: {str(e)}")
+        logger.warning("User logging is failed: %s", e)
         raise HTTPException(status_code=404, detail=str(e))
     except AlreadyExistError as e:
-        logger.warning(f"User creating is failed: {str(e)}")
+        logger.warning("User creating is failed: %s", e)
         raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
-        logger.error(f"Unexpected error in register: {str(e)}", exc_info=True)
+        logger.error("Unexpected error in register: %s", e, exc_info=True)
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail="Internal server error"
@@ -87,17 +94,17 @@ async def login(
         )
         token = await auth_service.create_token(user)
 
-        logger.info(f"User logged in successfully: {user.id} - {user.username}")
+        logger.info("User logged in successfully: %s - %s", user.id, user.username)
         return token
 
     except NotFoundError as e:
-        logger.warning(f"User logging is failed: {str(e)}")
+        logger.warning("User logging is failed: %s", e)
         raise HTTPException(status_code=404, detail=str(e))
     except AuthenticationError as e:
-        logger.warning(f"Authentification failed: {str(e)}")
+        logger.warning("Authentification failed: %s", e)
         raise HTTPException(status_code=403, detail=str(e))
     except Exception as e:
-        logger.error(f"Unexpected error in login: {str(e)}", exc_info=True)
+        logger.error("Unexpected error in login: %s", e, exc_info=True)
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail="Internal server error"
@@ -120,12 +127,12 @@ async def verify_token(
         dict: Результат проверки токена с информацией о пользователе
     """
     try:
-        logger.info("Token verification request received")
+        hot_path_logger.info("Token verification request received")
         result = await auth_service.verify_token(token)
 
         if result:
             user, payload = result  # Распаковываем результат
-            logger.info(f"Token is valid for user: {user.id} - {user.username}")
+            hot_path_logger.info("Token is valid for user: %s - %s", user.id, user.username)
             return {
                 "valid": True,
                 "user_id": str(user.id),
@@ -136,5 +143,5 @@ async def verify_token(
         logger.warning("Token verification failed: invalid token")
         return {"valid": False}
     except Exception as e:
-        logger.error(f"Error in verify_token: {str(e)}", exc_info=True)
+        logger.error("Error in verify_token: %s", e, exc_info=True)
         return {"valid": False}
@@ -7,6 +7,8 @@ from faststream.rabbit.fastapi import RabbitRouter
 
 from src.core import get_current_user, get_current_admin, get_user_service
 from src.core.logging_config import logger
+from src.core.metrics import broker_metrics_middleware
+from src.core.tracing import broker_tracing_middleware
 from src.schemas import UserResponse, UserUpdate, UserEvent, UserEventID
 from src.services import UserService
 from src.models import User
@@ -14,7 +16,12 @@ from src.config import get_settings
 from src.exceptions import NotFoundError
 
 settings = get_settings()
-router = RabbitRouter(settings.rabbitmq_url, prefix="/users")
+router = RabbitRouter(
+    settings.rabbitmq_url,
+    prefix="/users",
+    graceful_timeout=settings.shutdown_timeout,
+    middlewares=[broker_metrics_middleware, broker_tracing_middleware],
+)
 
 
 @router.get("/me", response_model=UserResponse)
@@ -57,10 +64,10 @@ async def read_users(
         return users
 
     except NotFoundError as e:
-        logger.warning(f"User getting is failed: {str(e)}")
+        logger.warning("User getting is failed: %s", e)
         raise HTTPException(status_code=404, detail=str(e))
     except Exception as e:
-        logger.error(f"Unexpected error in read_users: {str(e)}", exc_info=True)
+        logger.error("Unexpected error in read_users: %s", e, exc_info=True)
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail="Internal server error"
@@ -92,16 +99,16 @@ async def read_user(
         return user
 
     except NotFoundError as e:
-        logger.warning(f"User getting is failed: {str(e)}")
+        logger.warning("User getting is failed: %s", e)
         raise HTTPException(status_code=404, detail=str(e))
     except ValueError:
-        logger.warning(f"Invalid user_id format: {user_id}")
+        logger.warning("Invalid user_id format: %s", user_id)
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Invalid user ID format"
         )
     except Exception as e:
-        logger.error(f"Unexpected error in read_user: {str(e)}", exc_info=True)
+        logger.error("Unexpected error in read_user: %s", e, exc_info=True)
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail="Internal server error"
@@ -134,7 +141,7 @@ async def update_user_me(
         if user_data.email and user_data.email != current_user.email:
             existing_user = await user_service.get_user_by_email(user_data.email)
             if existing_user:
-                logger.warning(f"Update failed: email {user_data.email} already registered")
+                logger.warning("Update failed: email %s already registered", user_data.email)
                 raise HTTPException(
                     status_code=status.HTTP_400_BAD_REQUEST,
                     detail="Email already registered"
@@ -144,7 +151,7 @@ async def update_user_me(
         if user_data.username and user_data.username != current_user.username:
             existing_user = await user_service.get_user_by_username(user_data.username)
             if existing_user:
-                logger.warning(f"Update failed: username {user_data.username} already taken")
+                logger.warning("Update failed: username %s already taken", user_data.username)
                 raise HTTPException(
                     status_code=status.HTTP_400_BAD_REQUEST,
                     detail="Username already taken"
@@ -152,7 +159,7 @@ async def update_user_me(
 
         updated_user = await user_service.update_user(current_user.id, user_data)
         if not updated_user:
-            logger.warning(f"User not found for update: {current_user.id}")
+            logger.warning("User not found for update: %s", current_user.id)
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail="User not found"
@@ -164,7 +171,7 @@ async def update_user_me(
             role=updated_user.role
         )
 
-        logger.info(f"User updated successfully: {updated_user.id} - {updated_user.username}")
+        logger.info("User updated successfully: %s - %s", updated_user.id, updated_user.username)
         await router.broker.publish(
             message=user_event.model_dump(),
             exchange=RabbitExchange(name="user_updated", type=ExchangeType.FANOUT)
@@ -174,7 +181,7 @@ async def update_user_me(
     except HTTPException:
         raise
     except Exception as e:
-        logger.error(f"Unexpected error in update_user_me: {str(e)}", exc_info=True)
+        logger.error("Unexpected error in update_user_me: %s", e, exc_info=True)
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail="Internal server error"
@@ -201,7 +208,7 @@ async def delete_user(
     try:
         success = await user_service.delete_user(uuid.UUID(user_id))
         if not success:
-            logger.warning(f"User not found for deletion: {user_id}")
+            logger.warning("User not found for deletion: %s", user_id)
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail="User not found"
@@ -209,7 +216,7 @@ async def delete_user(
 
         user_event_id = UserEventID(id=uuid.UUID(user_id))
 
-        logger.info(f"User deleted successfully: {user_id}")
+        logger.info("User deleted successfully: %s", user_id)
         await router.broker.publish(
             message=user_event_id.model_dump(),
             exchange=RabbitExchange(name="user_deleted", type=ExchangeType.FANOUT)
@@ -217,16 +224,16 @@ async def delete_user(
         return {"message": "Ok"}
 
     except NotFoundError as e:
-        logger.warning(f"Order creation failed: {str(e)}")
+        logger.warning("Order creation failed: %s", e)
         raise HTTPException(status_code=404, detail=str(e))
     except ValueError:
-        logger.warning(f"Invalid user_id format: {user_id}")
+        logger.warning("Invalid user_id format: %s", user_id)
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Invalid user ID format"
         )
     except Exception as e:
-        logger.error(f"Unexpected error in delete_user: {str(e)}", exc_info=True)
+        logger.error("Unexpected error in delete_user: %s", e, exc_info=True)
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail="Internal server error"
@@ -1,10 +1,12 @@
 from pathlib import Path
+from typing import Literal, Optional
 
 from pydantic import SecretStr
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
 BASE_DIR = Path(__file__).parent.parent
 ENV_PATH = BASE_DIR / ".env"
+SERVICE_NAME = "auth_service"
 
 
 class Settings(BaseSettings):
@@ -16,6 +18,51 @@ class Settings(BaseSettings):
     db_port: int
     db_echo: bool
 
+    # DataBase: реплика только для чтения (необязательно)
+    db_replica_host: Optional[str] = None
+    db_replica_port: Optional[int] = None
+
+    # DataBase: пул соединений
+    db_pool_size: int = 10
+    db_max_overflow: int = 10
+    db_pool_timeout: float = 30.0
+    db_pool_recycle: int = 1800
+    db_pool_pre_ping: bool = True
+    db_statement_cache_size: int = 100
+
+    # DataBase: учет запросов
+    db_slow_query_ms: float = 200
+    db_n_plus_one_threshold: int = 3
+
+    # Server: SERVER_WORKERS не задан - по числу доступных CPU
+    server_host: str = "0.0.0.0"
+    server_port: int = 8000
+    server_workers: Optional[int] = None
+    server_keep_alive: int = 5
+    server_backlog: int = 2048
+    server_limit_max_requests: Optional[int] = 10000
+    server_limit_max_requests_jitter: int = 1000
+    server_graceful_timeout: int = 30
+    server_access_log: bool = False
+    prometheus_multiproc_dir: str = "/tmp/prometheus_multiproc"
+
+    # Compression: ответы меньше COMPRESSION_MINIMUM_SIZE байт не сжимаются
+    compression_minimum_size: int = 1024
+    compression_gzip_level: int = 6
+    compression_brotli_quality: int = 4
+
+    # Shutdown: сколько ждать завершения обработчиков сообщений при остановке
+    shutdown_timeout: float = 15.0
+
+    # Logging: json или text, доля сообщений hot_path_logger уровня INFO, которые попадают в лог
+    log_format: Literal["json", "text"] = "json"
+    log_sample_rate: float = 0.1
+
+    # Tracing: none - выключено, otlp - OTLP/HTTP коллектор, file - JSON строки в файл
+    otel_exporter: Literal["none", "otlp", "file"] = "none"
+    otel_exporter_otlp_endpoint: str = "http://localhost:4318/v1/traces"
+    otel_trace_file: str = "logs/traces.jsonl"
+
     # JWT
     jwt_secret_key: str
     jwt_algorithm: str = "HS256"
@@ -34,6 +81,13 @@ class Settings(BaseSettings):
         return (f"postgresql+asyncpg://{self.db_user}:{self.db_password.get_secret_value()}@"
                 f"{self.db_host}:{self.db_port}/{self.db_name}")
 
+    @property
+    def db_replica_url(self) -> Optional[str]:
+        if not self.db_replica_host:
+            return None
+        return (f"postgresql+asyncpg://{self.db_user}:{self.db_password.get_secret_value()}@"
+                f"{self.db_replica_host}:{self.db_replica_port or self.db_port}/{self.db_name}")
+
     @property
     def rabbitmq_url(self) -> str:
         return f"amqp://{self.rabbitmq_user}:{self.rabbitmq_password}@{self.rabbitmq_host}:{self.rabbitmq_port}/"
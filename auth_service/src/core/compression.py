@@ -0,0 +1,52 @@
+from starlette.datastructures import Headers
+from starlette.middleware.gzip import GZipMiddleware, IdentityResponder
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+try:
+    import brotli
+except ImportError:  # brotli - необязательная зависимость, без нее ответы сжимаются только gzip
+    brotli = None
+
+
+class BrotliResponder(IdentityResponder):
+    """
+    Сжатие тела ответа brotli
+
+    Порог размера, пропуск уже сжатых ответов и заголовок Vary
+    обрабатываются так же, как в GZipResponder
+    """
+
+    content_encoding = "br"
+
+    def __init__(self, app: ASGIApp, minimum_size: int, quality: int) -> None:
+        super().__init__(app, minimum_size)
+        self.compressor = brotli.Compressor(quality=quality)
+
+    def apply_compression(self, body: bytes, *, more_body: bool) -> bytes:
+        data = self.compressor.process(body)
+        if more_body:
+            # Каждая часть потокового ответа отправляется клиенту сразу
+            return data + self.compressor.flush()
+        return data + self.compressor.finish()
+
+
+class CompressionMiddleware(GZipMiddleware):
+    """
+    ASGI middleware: сжатие ответов brotli или gzip по заголовку Accept-Encoding
+
+    Brotli выбирается, если клиент его поддерживает и установлен пакет brotli,
+    иначе используется gzip. Ответы меньше minimum_size байт отправляются без сжатия
+    """
+
+    def __init__(self, app: ASGIApp, minimum_size: int, compresslevel: int, brotli_quality: int) -> None:
+        super().__init__(app, minimum_size=minimum_size, compresslevel=compresslevel)
+        self.brotli_quality = brotli_quality
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] == "http" and brotli is not None:
+            if "br" in Headers(scope=scope).get("Accept-Encoding", ""):
+                responder = BrotliResponder(self.app, self.minimum_size, self.brotli_quality)
+                await responder(scope, receive, send)
+                return
+
+        await super().__call__(scope, receive, send)
@@ -0,0 +1,69 @@
+import time
+
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+
+from src.core.logging_config import logger
+
+
+class PoolMetrics:
+    """
+    Счетчики получения соединений из пула
+    """
+
+    def __init__(self) -> None:
+        self.checkouts = 0
+        self.timeouts = 0
+        self.wait_seconds_total = 0.0
+        self.wait_seconds_max = 0.0
+
+    def observe_wait(self, seconds: float) -> None:
+        """
+        Учесть время ожидания соединения
+
+        Args:
+            seconds: Время от запроса соединения до его получения
+        """
+        self.checkouts += 1
+        self.wait_seconds_total += seconds
+        if seconds > self.wait_seconds_max:
+            self.wait_seconds_max = seconds
+
+
+class InstrumentedPool(AsyncAdaptedQueuePool):
+    """
+    Пул соединений с замером времени ожидания и учетом таймаутов
+    """
+
+    def __init__(self, *args, **kwargs) -> None:
+        super().__init__(*args, **kwargs)
+        self.metrics = PoolMetrics()
+
+    def connect(self):
+        started = time.perf_counter()
+        try:
+            connection = super().connect()
+        except PoolTimeoutError:
+            self.metrics.timeouts += 1
+            logger.warning("Database pool checkout timed out: %s", self.status())
+            raise
+        self.metrics.observe_wait(time.perf_counter() - started)
+        return connection
+
+    def stats(self) -> dict:
+        """
+        Текущее состояние пула и накопленные счетчики
+
+        Returns:
+            Словарь со статистикой пула
+        """
+        return {
+            "size": self.size(),
+            "checked_out": self.checkedout(),
+            "checked_in": self.checkedin(),
+            "overflow": max(self.overflow(), 0),
+            "checkouts": self.metrics.checkouts,
+            "timeouts": self.metrics.timeouts,
+            "wait_seconds_total": round(self.metrics.wait_seconds_total, 6),
+            "wait_seconds_max": round(self.metrics.wait_seconds_max, 6),
+        }
@@ -0,0 +1,93 @@
+import functools
+from pathlib import Path
+from typing import Callable, Optional
+
+from fastapi import FastAPI
+from faststream.rabbit.opentelemetry import RabbitTelemetryMiddleware
+from opentelemetry import trace
+from opentelemetry.instrumentation.fastapi import FastAPIInstrumentor
+from opentelemetry.sdk.resources import Resource
+from opentelemetry.sdk.trace import TracerProvider
+from opentelemetry.sdk.trace.export import BatchSpanProcessor, ConsoleSpanExporter, SpanExporter
+
+from src.config import SERVICE_NAME, get_settings
+from src.core.logging_config import logger
+
+settings = get_settings()
+
+# Пути без трассировки
+EXCLUDED_URLS = "/health,/metrics"
+
+tracer = trace.get_tracer(SERVICE_NAME)
+
+# Спаны публикации и обработки сообщений RabbitMQ, контекст передается в заголовках AMQP.
+# Провайдер берется глобальный, поэтому middleware можно создать до setup_tracing
+broker_tracing_middleware = RabbitTelemetryMiddleware()
+
+_tracer_provider: Optional[TracerProvider] = None
+
+
+def _create_exporter() -> SpanExporter:
+    if settings.otel_exporter == "otlp":
+        from opentelemetry.exporter.otlp.proto.http.trace_exporter import OTLPSpanExporter
+
+        return OTLPSpanExporter(endpoint=settings.otel_exporter_otlp_endpoint)
+
+    trace_file = Path(settings.otel_trace_file)
+    trace_file.parent.mkdir(parents=True, exist_ok=True)
+    return ConsoleSpanExporter(
+        out=trace_file.open("a", encoding="utf8"),
+        formatter=lambda span: span.to_json(indent=None) + "\n",
+    )
+
+
+def setup_tracing(app: FastAPI) -> None:
+    """
+    Включить трассировку HTTP маршрутов и брокера
+
+    Контекст трассировки принимается и передается в заголовках traceparent.
+    При OTEL_EXPORTER=none ничего не делает
+
+    Args:
+        app: Приложение FastAPI
+    """
+    global _tracer_provider
+
+    if settings.otel_exporter == "none":
+        return
+
+    _tracer_provider = TracerProvider(resource=Resource.create({"service.name": SERVICE_NAME}))
+    _tracer_provider.add_span_processor(BatchSpanProcessor(_create_exporter()))
+    trace.set_tracer_provider(_tracer_provider)
+
+    FastAPIInstrumentor.instrument_app(app, tracer_provider=_tracer_provider, excluded_urls=EXCLUDED_URLS)
+    logger.info("Tracing enabled, exporter: %s", settings.otel_exporter)
+
+
+def shutdown_tracing() -> None:
+    """
+    Отправить накопленные спаны и остановить экспорт
+    """
+    if _tracer_provider is not None:
+        _tracer_provider.shutdown()
+
+
+def traced(name: str) -> Callable:
+    """
+    Декоратор: выполнить корутину внутри спана
+
+    Args:
+        name: Имя спана
+
+    Returns:
+        Декоратор для асинхронной функции
+    """
+    def decorator(func: Callable) -> Callable:
+        @functools.wraps(func)
+        async def wrapper(*args, **kwargs):
+            with tracer.start_as_current_span(name):
+                return await func(*args, **kwargs)
+
+        return wrapper
+
+    return decorator
@@ -1,25 +1,47 @@
 from contextlib import asynccontextmanager
 
 import uvicorn
-from fastapi import FastAPI
+from fastapi import FastAPI, Response
+from fastapi.responses import ORJSONResponse
+from prometheus_client import CONTENT_TYPE_LATEST
 
 from src import db_dependency_instance, router
+from src.config import get_settings
+from src.core.compression import CompressionMiddleware
 from src.core.logging_config import logger
+from src.core.metrics import MetricsMiddleware, register_db_pool_collector, render_metrics
+from src.core.tracing import setup_tracing, shutdown_tracing
+from src.core.query_stats import QueryStatsMiddleware
+
+settings = get_settings()
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     logger.info("Starting application...")
     try:
-        await db_dependency_instance.table_creating()
+        await db_dependency_instance.check_schema_version()
     except Exception as e:
-        logger.error(f"Error creating database tables: {str(e)}", exc_info=True)
+        logger.error("Database schema check failed: %s", e, exc_info=True)
         raise
     yield
     logger.info("Shutting down application...")
+    await db_dependency_instance.dispose()
+    shutdown_tracing()
+
 
+app = FastAPI(lifespan=lifespan, default_response_class=ORJSONResponse)
+app.add_middleware(
+    CompressionMiddleware,
+    minimum_size=settings.compression_minimum_size,
+    compresslevel=settings.compression_gzip_level,
+    brotli_quality=settings.compression_brotli_quality,
+)
+app.add_middleware(QueryStatsMiddleware)
+app.add_middleware(MetricsMiddleware)
 
-app = FastAPI(lifespan=lifespan)
+register_db_pool_collector(db_dependency_instance.pool_stats)
+setup_tracing(app)
 
 app.include_router(router, prefix="/api/v1")
 
@@ -27,6 +49,14 @@ app.include_router(router, prefix="/api/v1")
 async def health():
     return {"status": "ok"}
 
+@app.get("/metrics/db_pool")
+async def db_pool_metrics():
+    return db_dependency_instance.pool_stats()
+
+@app.get("/metrics")
+async def metrics():
+    return Response(render_metrics(), media_type=CONTENT_TYPE_LATEST)
+
 if __name__ == "__main__":
     uvicorn.run("main:app", port=8000)
 
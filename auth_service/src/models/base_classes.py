@@ -13,4 +13,4 @@ class UUIDMixin:
 
 
 class NameMixin:
-    username: Mapped[str]
+    username: Mapped[str] = mapped_column(index=True)
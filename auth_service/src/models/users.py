@@ -15,6 +15,6 @@ class UserRole(str, enum.Enum):
 class User(Base, UUIDMixin, NameMixin):
     __tablename__ = 'users'
 
-    email: Mapped[str] = mapped_column(nullable=False)
+    email: Mapped[str] = mapped_column(nullable=False, index=True)
     password: Mapped[str] = mapped_column(nullable=False)
     role: Mapped[UserRole] = mapped_column(Enum(UserRole), default=UserRole.USER, nullable=False)
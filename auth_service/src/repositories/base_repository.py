@@ -1,16 +1,34 @@
+import inspect
 from abc import ABC
 from contextlib import asynccontextmanager
 from typing import List, Any
 
+from sqlalchemy import Result
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.sql.base import Executable
 
 from src.core.logging_config import logger
+from src.core.tracing import traced
+from src.core.db_dependency import (
+    REPLICA_OPTION,
+    TRANSACTION_DEPTH,
+    TRANSACTION_WROTE,
+)
 
 
 class BaseRepository(ABC):
     """
     Базовый репозиторий с транзакционной поддержкой
+    
+    Публичные асинхронные методы наследников выполняются в спане
+    трассировки с именем "<Репозиторий>.<метод>"
     """
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        for name, method in list(vars(cls).items()):
+            if not name.startswith("_") and inspect.iscoroutinefunction(method):
+                setattr(cls, name, traced(f"{cls.__name__}.{name}")(method))
     
     def __init__(self, session: AsyncSession):
         """
@@ -30,13 +48,60 @@ class BaseRepository(ABC):
             async with self.transaction():
                 # операции с БД
         """
+        info = self.session.info
+        info[TRANSACTION_DEPTH] = info.get(TRANSACTION_DEPTH, 0) + 1
         try:
             yield self.session
             await self.session.commit()
         except Exception as e:
-            logger.error(f"Transaction error, rolling back: {str(e)}", exc_info=True)
+            logger.error("Transaction error, rolling back: %s", e, exc_info=True)
             await self.session.rollback()
             raise
+        finally:
+            info[TRANSACTION_DEPTH] -= 1
+
+    async def execute_read(self, statement: Executable) -> Result:
+        """
+        Выполнить запрос только на чтение
+        
+        Запрос может быть направлен на реплику, если она настроена
+        и в текущей сессии еще не было записи. После запроса соединение
+        возвращается в пул (см. release_connection)
+        
+        Args:
+            statement: SELECT запрос
+            
+        Returns:
+            Результат запроса
+        """
+        self.session.info[REPLICA_OPTION] = True
+        try:
+            result = await self.session.execute(statement)
+        finally:
+            self.session.info[REPLICA_OPTION] = False
+        await self.release_connection()
+        return result
+
+    async def release_connection(self) -> None:
+        """
+        Вернуть соединение сессии в пул, если текущая транзакция только читала
+        
+        Транзакция завершается через commit: загруженные объекты не истекают
+        (expire_on_commit=False), а следующий запрос сессии возьмет соединение
+        из пула заново. Транзакция не завершается внутри transaction(),
+        после записи и при наличии несохраненных изменений
+        """
+        session = self.session
+        if (
+            not session.in_transaction()
+            or session.info.get(TRANSACTION_DEPTH)
+            or session.info.get(TRANSACTION_WROTE)
+            or session.new
+            or session.dirty
+            or session.deleted
+        ):
+            return
+        await session.commit()
 
     async def save_all(self, entities: List[Any]):
         """
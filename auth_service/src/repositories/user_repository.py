@@ -69,7 +69,7 @@ class UserRepository(BaseRepository):
         Returns:
             Список пользователей
         """
-        result = await self.session.execute(
+        result = await self.execute_read(
             select(User).offset(skip).limit(limit)
         )
         return list(result.scalars().all())
@@ -0,0 +1,94 @@
+import os
+import random
+import shutil
+import sys
+from typing import List, Optional
+
+import uvicorn
+from uvicorn.main import STARTUP_FAILURE
+from uvicorn.supervisors import Multiprocess
+
+from src.config import get_settings
+
+settings = get_settings()
+
+
+def get_workers_count() -> int:
+    """
+    Количество worker-процессов
+
+    Если SERVER_WORKERS не задан, берется число CPU, доступных процессу
+    (с учетом ограничений контейнера по cpuset)
+
+    Returns:
+        Количество worker-процессов
+    """
+    if settings.server_workers:
+        return settings.server_workers
+    if hasattr(os, "sched_getaffinity"):
+        return len(os.sched_getaffinity(0))
+    return os.cpu_count() or 1
+
+
+def prepare_prometheus_multiproc_dir() -> None:
+    """
+    Подготовить каталог для метрик Prometheus нескольких worker-процессов
+
+    Каталог очищается при каждом запуске, чтобы не учитывать значения
+    процессов предыдущего запуска. Переменная окружения наследуется worker-процессами
+    """
+    multiproc_dir = settings.prometheus_multiproc_dir
+    shutil.rmtree(multiproc_dir, ignore_errors=True)
+    os.makedirs(multiproc_dir, exist_ok=True)
+    os.environ["PROMETHEUS_MULTIPROC_DIR"] = multiproc_dir
+
+
+class Server(uvicorn.Server):
+    """
+    Сервер uvicorn со случайной добавкой к limit_max_requests в каждом worker-процессе
+
+    Worker-процессы запускаются одновременно и получают запросы поровну: без добавки
+    они достигали бы лимита и перезапускались бы все разом
+    """
+
+    def run(self, sockets: Optional[List] = None) -> None:
+        # Выполняется уже в worker-процессе: конфигурация - его собственная копия
+        if self.config.limit_max_requests is not None and settings.server_limit_max_requests_jitter > 0:
+            self.config.limit_max_requests += random.randint(0, settings.server_limit_max_requests_jitter)
+        super().run(sockets)
+
+
+def main() -> None:
+    workers = get_workers_count()
+    if workers > 1:
+        prepare_prometheus_multiproc_dir()
+
+    config = uvicorn.Config(
+        "src.main:app",
+        host=settings.server_host,
+        port=settings.server_port,
+        workers=workers,
+        loop="uvloop",
+        http="httptools",
+        timeout_keep_alive=settings.server_keep_alive,
+        backlog=settings.server_backlog,
+        # Перезапуск worker-процессов по лимиту запросов выполняет только менеджер нескольких
+        # процессов: единственный процесс по лимиту просто завершился бы
+        limit_max_requests=settings.server_limit_max_requests if workers > 1 else None,
+        timeout_graceful_shutdown=settings.server_graceful_timeout,
+        proxy_headers=True,
+        access_log=settings.server_access_log,
+    )
+    server = Server(config)
+
+    if workers > 1:
+        sock = config.bind_socket()
+        Multiprocess(config, target=server.run, sockets=[sock]).run()
+    else:
+        server.run()
+        if not server.started:
+            sys.exit(STARTUP_FAILURE)
+
+
+if __name__ == "__main__":
+    main()
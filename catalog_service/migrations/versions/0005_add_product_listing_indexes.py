@@ -0,0 +1,35 @@
+"""add product listing indexes
+
+Revision ID: 0005
+Revises: 0004
+Create Date: 2026-10-19
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0005'
+down_revision: Union[str, None] = '0004'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index('ix_products_category_id_id', 'products', ['category_id', 'id'], unique=False)
+    op.drop_index(op.f('ix_products_category_id'), table_name='products')
+    op.create_index('ix_products_category_id_price_id', 'products', ['category_id', 'price', 'id'], unique=False)
+    op.create_index('ix_products_category_id_name_id', 'products', ['category_id', 'name', 'id'], unique=False)
+    op.create_index('ix_products_price_id', 'products', ['price', 'id'], unique=False)
+    op.create_index('ix_products_name_id', 'products', ['name', 'id'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_products_name_id', table_name='products')
+    op.drop_index('ix_products_price_id', table_name='products')
+    op.drop_index('ix_products_category_id_name_id', table_name='products')
+    op.drop_index('ix_products_category_id_price_id', table_name='products')
+    op.create_index(op.f('ix_products_category_id'), 'products', ['category_id'], unique=False)
+    op.drop_index('ix_products_category_id_id', table_name='products')
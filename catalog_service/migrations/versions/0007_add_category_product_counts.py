@@ -0,0 +1,51 @@
+"""add category product counts
+
+Revision ID: 0007
+Revises: 0006
+Create Date: 2026-10-19
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0007'
+down_revision: Union[str, None] = '0006'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('categories', sa.Column('direct_count', sa.Integer(), server_default='0', nullable=False))
+    op.add_column('categories', sa.Column('subtree_count', sa.Integer(), server_default='0', nullable=False))
+    # Начальные значения: товары каждой категории и суммы по всем ее потомкам
+    op.execute("""
+        WITH RECURSIVE paths(ancestor_id, id) AS (
+            SELECT id, id FROM categories
+            UNION ALL
+            SELECT paths.ancestor_id, categories.id
+            FROM categories JOIN paths ON categories.parent_id = paths.id
+        ),
+        direct AS (
+            SELECT category_id AS id, count(*) AS n FROM products GROUP BY category_id
+        ),
+        counts AS (
+            SELECT paths.ancestor_id AS id,
+                   coalesce(sum(direct.n) FILTER (WHERE paths.ancestor_id = paths.id), 0) AS direct_count,
+                   coalesce(sum(direct.n), 0) AS subtree_count
+            FROM paths LEFT JOIN direct ON direct.id = paths.id
+            GROUP BY paths.ancestor_id
+        )
+        UPDATE categories
+        SET direct_count = counts.direct_count, subtree_count = counts.subtree_count
+        FROM counts
+        WHERE categories.id = counts.id
+    """)
+
+
+def downgrade() -> None:
+    op.drop_column('categories', 'subtree_count')
+    op.drop_column('categories', 'direct_count')
@@ -0,0 +1,26 @@
+"""use clock_timestamp for product updated_at
+
+Revision ID: 0008
+Revises: 0007
+Create Date: 2026-10-19
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0008'
+down_revision: Union[str, None] = '0007'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.alter_column('products', 'updated_at', server_default=sa.text('clock_timestamp()'))
+
+
+def downgrade() -> None:
+    op.alter_column('products', 'updated_at', server_default=sa.text('now()'))
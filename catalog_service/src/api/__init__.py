@@ -2,7 +2,8 @@ from fastapi import APIRouter
 
 from src.api.categories_api import router as categories_router
 from src.api.product_api import router as product_router
-from src.consumer import sub_router
+from src.consumer import sub_router, stock_sub
+from src.publisher import table_versions_pub
 
 
 router = APIRouter()
@@ -10,7 +11,13 @@ router = APIRouter()
 router.include_router(categories_router)
 router.include_router(product_router)
 router.include_router(sub_router)
+router.include_router(stock_sub)
+router.include_router(table_versions_pub)
+
+# Брокеры RabbitMQ сервиса: при остановке их подписчики останавливаются первыми
+brokers = [categories_router.broker, product_router.broker, sub_router.broker, stock_sub.broker, table_versions_pub.broker]
 
 __all__ = [
     "router",
+    "brokers",
 ]
@@ -1,17 +1,34 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from typing import List
+from fastapi import Depends, HTTPException, status
+from faststream.rabbit.fastapi import RabbitRouter
+from typing import Optional
 
-from src.core import get_current_admin, get_current_user, get_category_service
+from src.config import get_settings
+from src.core import get_current_admin, get_current_user, get_category_service, table_etag
 from src.core.logging_config import logger
-from src.schemas import CategoryAddDTO
+from src.core.metrics import broker_metrics_middleware
+from src.core.tracing import broker_tracing_middleware
+from src.schemas import (
+    CategoryAddDTO,
+    CategoryMoveDTO,
+    CategoryResponse,
+    CategoryListResponse,
+    CategoryTreeResponse,
+    CategoryDeleteResponse,
+    ProductsDeletedDTO,
+)
 from src.services import CategoryService
-from src.models import Category, User
-from src.exceptions import NotFoundError
+from src.models import Category, Product, User
+from src.exceptions import NotFoundError, BusinessRuleError
 
-router = APIRouter()
+settings = get_settings()
+router = RabbitRouter(
+    settings.rabbitmq_url,
+    graceful_timeout=settings.shutdown_timeout,
+    middlewares=[broker_metrics_middleware, broker_tracing_middleware],
+)
 
 
-@router.post("/category")
+@router.post("/category", response_model=CategoryResponse)
 async def add_category(
     data: CategoryAddDTO,
     current_user: User = Depends(get_current_admin),
@@ -26,7 +43,7 @@ async def add_category(
         category_service: Сервис для работы с категориями
         
     Returns:
-        Category: Созданная категория
+        CategoryResponse: Созданная категория
         
     Raises:
         HTTPException 404: Если родительская категория не найдена
@@ -34,11 +51,11 @@ async def add_category(
     """
     try:
         category = await category_service.create_category(data)
-        logger.info(f"Category created successfully: {category.id} - {category.name}")
+        logger.info("Category created successfully: %s - %s", category.id, category.name)
         return {"Message": "Ok", "Category" : category}
 
     except NotFoundError as e:
-        logger.warning(f"Category creation failed: {str(e)}")
+        logger.warning("Category creation failed: %s", e)
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail=str(e)
@@ -46,18 +63,143 @@ async def add_category(
     except HTTPException:
         raise
     except Exception as e:
-        logger.error(f"Unexpected error in add_category: {str(e)}", exc_info=True)
+        logger.error("Unexpected error in add_category: %s", e, exc_info=True)
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail="Internal server error"
         )
 
 
-@router.get("/categories")
+@router.post("/category/{category_id}/move", response_model=CategoryResponse)
+async def move_category(
+    category_id: int,
+    data: CategoryMoveDTO,
+    current_user: User = Depends(get_current_admin),
+    category_service: CategoryService = Depends(get_category_service)
+):
+    """
+    Переместить категорию вместе с подкатегориями к другому родителю
+    
+    Args:
+        category_id: ID перемещаемой категории
+        data: Новый родитель (parent_id; 0 или null - корневая категория)
+        current_user: Текущий авторизованный пользователь (администратор)
+        category_service: Сервис для работы с категориями
+        
+    Returns:
+        CategoryResponse: Перемещенная категория
+        
+    Raises:
+        HTTPException 400: Если новый родитель - сама категория или ее подкатегория
+        HTTPException 404: Если категория или новый родитель не найдены
+        HTTPException 500: При внутренней ошибке сервера
+    """
+    try:
+        category = await category_service.move_category(category_id, data)
+        logger.info("Category moved successfully: %s -> parent %s", category.id, category.parent_id)
+        return {"Message": "Ok", "Category": category}
+
+    except NotFoundError as e:
+        logger.warning("Category move failed: %s", e)
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=str(e)
+        )
+    except BusinessRuleError as e:
+        logger.warning("Category move failed: %s", e)
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error("Unexpected error in move_category: %s", e, exc_info=True)
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Internal server error"
+        )
+
+
+@router.delete("/category/{category_id}", response_model=CategoryDeleteResponse)
+async def delete_category(
+    category_id: int,
+    move_products_to: Optional[int] = None,
+    cascade: bool = False,
+    current_user: User = Depends(get_current_admin),
+    category_service: CategoryService = Depends(get_category_service)
+):
+    """
+    Удалить категорию вместе с подкатегориями
+    
+    Товары удаляемых категорий переносятся в категорию move_products_to
+    или, при cascade=true, удаляются (событие products.deleted)
+    
+    Args:
+        category_id: ID удаляемой категории
+        move_products_to: ID категории для товаров удаляемых категорий (необязательно)
+        cascade: Удалить товары удаляемых категорий (по умолчанию false)
+        current_user: Текущий авторизованный пользователь (администратор)
+        category_service: Сервис для работы с категориями
+        
+    Returns:
+        CategoryDeleteResponse: Количество удаленных категорий, перенесенных и удаленных товаров
+        
+    Raises:
+        HTTPException 400: Если в категориях есть товары, а move_products_to и cascade не заданы,
+            или move_products_to входит в удаляемые категории
+        HTTPException 404: Если категория или категория для товаров не найдены
+        HTTPException 500: При внутренней ошибке сервера
+    """
+    try:
+        deleted_categories, moved, deleted = await category_service.delete_category(
+            category_id, move_products_to, cascade
+        )
+        if deleted:
+            # Отправка события в RabbitMQ: товары удалены и в order_service
+            await router.broker.publish(
+                message=ProductsDeletedDTO(ids=deleted).model_dump(),
+                queue="products.deleted"
+            )
+        logger.info(
+            "Category deleted successfully: %s (%s categories, %s products moved, %s products deleted)",
+            category_id, len(deleted_categories), len(moved), len(deleted)
+        )
+        return {
+            "Message": "Ok",
+            "Deleted": len(deleted_categories),
+            "ProductsMoved": len(moved),
+            "ProductsDeleted": len(deleted),
+        }
+
+    except NotFoundError as e:
+        logger.warning("Category deletion failed: %s", e)
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=str(e)
+        )
+    except BusinessRuleError as e:
+        logger.warning("Category deletion failed: %s", e)
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error("Unexpected error in delete_category: %s", e, exc_info=True)
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Internal server error"
+        )
+
+
+@router.get("/categories", response_model=CategoryListResponse)
 async def get_all_categories(
     skip: int = 0,
     limit: int = 100,
     user: User = Depends(get_current_user),
+    etag: str = Depends(table_etag(Category.__tablename__, Product.__tablename__)),
     category_service: CategoryService = Depends(get_category_service)
 ):
     """
@@ -67,17 +209,50 @@ async def get_all_categories(
         skip: Количество записей для пропуска (по умолчанию 0)
         limit: Максимальное количество записей (по умолчанию 100)
         user: Текущий авторизованный пользователь
+        etag: ETag ответа (при совпадении с If-None-Match - ответ 304)
         category_service: Сервис для работы с категориями
         
     Returns:
-        List[Category]: Список категорий
+        CategoryListResponse: Список категорий с количеством товаров
     """
     try:
         categories = await category_service.get_all_categories(skip, limit)
         return {"Message": "Ok", "Categories" : categories}
 
     except Exception as e:
-        logger.error(f"Unexpected error in get_all_categories: {str(e)}", exc_info=True)
+        logger.error("Unexpected error in get_all_categories: %s", e, exc_info=True)
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Internal server error"
+        )
+
+
+@router.get("/categories/tree", response_model=CategoryTreeResponse)
+async def get_category_tree(
+    user: User = Depends(get_current_user),
+    etag: str = Depends(table_etag(Category.__tablename__, Product.__tablename__)),
+    category_service: CategoryService = Depends(get_category_service)
+):
+    """
+    Получить дерево категорий с количеством товаров (для меню)
+    
+    Количество товаров хранится в категориях (direct_count, subtree_count),
+    поэтому ответ строится одним запросом без подсчета товаров
+    
+    Args:
+        user: Текущий авторизованный пользователь
+        etag: ETag ответа (при совпадении с If-None-Match - ответ 304)
+        category_service: Сервис для работы с категориями
+        
+    Returns:
+        CategoryTreeResponse: Корневые категории с вложенными подкатегориями
+    """
+    try:
+        categories = await category_service.get_category_tree()
+        return {"Message": "Ok", "Categories": categories}
+
+    except Exception as e:
+        logger.error("Unexpected error in get_category_tree: %s", e, exc_info=True)
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail="Internal server error"
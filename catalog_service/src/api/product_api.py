@@ -1,20 +1,55 @@
-from fastapi import Depends, HTTPException, status
+from datetime import datetime, timezone
+
+from fastapi import Depends, HTTPException, Query, Request, status
+from fastapi.responses import StreamingResponse
 from faststream.rabbit.fastapi import RabbitRouter
-from typing import List
+from typing import Optional
 
 from src.config import get_settings
-from src.core import get_current_admin, get_current_user, get_product_service
+from src.core import (
+    get_current_admin,
+    get_current_user,
+    get_category_service,
+    get_product_filters,
+    get_product_service,
+    table_etag,
+)
 from src.core.logging_config import logger
-from src.schemas import ProductAddDTO
-from src.services import ProductService
-from src.models import Product, User
+from src.core.metrics import broker_metrics_middleware
+from src.core.product_export import EXPORT_MEDIA_TYPES, ExportFormat, export_products
+from src.core.product_import import import_format, iter_product_batches
+from src.core.suggest import ProductSuggestions, get_product_suggestions
+from src.core.tracing import broker_tracing_middleware
+from src.schemas import (
+    ProductAddDTO,
+    ProductUpdateDTO,
+    ProductBulkUpdateDTO,
+    ProductBulkUpdateResponse,
+    ProductChangeDTO,
+    ProductsUpdatedDTO,
+    ProductEventDTO,
+    ProductsCreatedDTO,
+    ProductImportResponse,
+    ProductFilterDTO,
+    ProductResponse,
+    ProductListResponse,
+    ProductDetailResponse,
+    ProductSearchResponse,
+    ProductSuggestResponse,
+)
+from src.services import CategoryService, ProductService
+from src.models import Category, Product, User
 from src.exceptions import NotFoundError
 
 settings = get_settings()
-router = RabbitRouter(settings.rabbitmq_url)
+router = RabbitRouter(
+    settings.rabbitmq_url,
+    graceful_timeout=settings.shutdown_timeout,
+    middlewares=[broker_metrics_middleware, broker_tracing_middleware],
+)
 
 
-@router.post("/product")
+@router.post("/product", response_model=ProductResponse)
 async def create_product(
     data: ProductAddDTO,
     current_user: User = Depends(get_current_admin),
@@ -29,7 +64,7 @@ async def create_product(
         product_service: Сервис для работы с товарами
         
     Returns:
-        Product: Созданный товар
+        ProductResponse: Созданный товар
         
     Raises:
         HTTPException 404: Если категория не найдена
@@ -39,7 +74,8 @@ async def create_product(
         product = await product_service.create_product(data)
         
         # Отправка события в RabbitMQ
-        product_DTO = ProductAddDTO(
+        product_DTO = ProductEventDTO(
+            id=product.id,
             name=product.name,
             price=product.price,
             quantity=product.storage_quantity,
@@ -49,12 +85,12 @@ async def create_product(
             message=product_DTO.model_dump(),
             queue="product.created"
         )
-        logger.info(f"Product created successfully: {product.id} - {product.name}")
+        logger.info("Product created successfully: %s - %s", product.id, product.name)
         
         return {"Message": "Ok", "Product" : product}
 
     except NotFoundError as e:
-        logger.warning(f"Product creation failed: {str(e)}")
+        logger.warning("Product creation failed: %s", e)
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail=str(e)
@@ -62,50 +98,452 @@ async def create_product(
     except HTTPException:
         raise
     except Exception as e:
-        logger.error(f"Unexpected error in create_product: {str(e)}", exc_info=True)
+        logger.error("Unexpected error in create_product: %s", e, exc_info=True)
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Internal server error"
+        )
+
+
+@router.post("/products/import", response_model=ProductImportResponse)
+async def import_products(
+    request: Request,
+    current_user: User = Depends(get_current_admin),
+    product_service: ProductService = Depends(get_product_service)
+):
+    """
+    Импорт товаров из CSV (text/csv) или NDJSON (application/x-ndjson)
+    
+    Тело читается потоком и обрабатывается пакетами по PRODUCT_IMPORT_BATCH_SIZE строк:
+    валидация, проверка категорий одним запросом, многострочный INSERT и одно
+    событие products.created на пакет. Строки с ошибками пропускаются.
+    Пакеты фиксируются по отдельности: при ошибке сервера уже созданные товары остаются
+    
+    Args:
+        request: Запрос с телом CSV (заголовок name,quantity,price,category_id) или NDJSON
+        current_user: Текущий авторизованный пользователь (администратор)
+        product_service: Сервис для работы с товарами
+        
+    Returns:
+        ProductImportResponse: Количество созданных товаров и строк с ошибками, ошибки строк
+        
+    Raises:
+        HTTPException 400: Если в заголовке CSV нет нужных колонок
+        HTTPException 415: Если формат тела не поддерживается
+        HTTPException 500: При внутренней ошибке сервера
+    """
+    fmt = import_format(request.headers.get("content-type", ""))
+    if fmt is None:
+        raise HTTPException(
+            status_code=status.HTTP_415_UNSUPPORTED_MEDIA_TYPE,
+            detail="Content-Type must be text/csv or application/x-ndjson"
+        )
+
+    imported = 0
+    failed = 0
+    errors = []
+    try:
+        batches = iter_product_batches(request.stream(), fmt, settings.product_import_batch_size)
+        async for rows, row_errors in batches:
+            products, category_errors = await product_service.import_products(rows) if rows else ([], [])
+            if products:
+                # Отправка пакета событий в RabbitMQ одним сообщением
+                event = ProductsCreatedDTO(items=[
+                    ProductEventDTO(
+                        id=product.id,
+                        name=product.name,
+                        price=product.price,
+                        quantity=product.storage_quantity,
+                        category_id=product.category_id
+                    )
+                    for product in products
+                ])
+                await router.broker.publish(
+                    message=event.model_dump(),
+                    queue="products.created"
+                )
+
+            batch_errors = sorted(row_errors + category_errors, key=lambda error: error.line)
+            imported += len(products)
+            failed += len(batch_errors)
+            errors.extend(batch_errors[:max(settings.product_import_max_errors - len(errors), 0)])
+
+        logger.info("Products imported: %s, failed rows: %s", imported, failed)
+        return {"Message": "Ok", "Imported": imported, "Failed": failed, "Errors": errors}
+
+    except ValueError as e:
+        logger.warning("Product import failed: %s", e)
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error("Unexpected error in import_products after %s products: %s", imported, e, exc_info=True)
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Internal server error"
+        )
+
+
+@router.post("/products/bulk_update", response_model=ProductBulkUpdateResponse)
+async def bulk_update_products(
+    data: ProductBulkUpdateDTO,
+    current_user: User = Depends(get_current_admin),
+    product_service: ProductService = Depends(get_product_service)
+):
+    """
+    Массовое изменение цен и остатков товаров
+    
+    Изменения применяются пакетами по PRODUCT_BULK_UPDATE_BATCH_SIZE товаров:
+    один UPDATE ... FROM unnest(...) и одно событие products.updated на пакет
+    (остатки в событии - изменения, а не новые значения).
+    Товары, цена и остаток которых уже равны новым, не перезаписываются и не входят в событие.
+    Пакеты фиксируются по отдельности: при ошибке сервера уже измененные товары остаются
+    
+    Args:
+        data: Новые цены и/или остатки товаров (id, price, quantity)
+        current_user: Текущий авторизованный пользователь (администратор)
+        product_service: Сервис для работы с товарами
+        
+    Returns:
+        ProductBulkUpdateResponse: Количество измененных товаров и ID не найденных товаров
+        
+    Raises:
+        HTTPException 500: При внутренней ошибке сервера
+    """
+    updated = 0
+    not_found = []
+    try:
+        batch_size = settings.product_bulk_update_batch_size
+        for start in range(0, len(data.items), batch_size):
+            products, missing = await product_service.bulk_update_products(data.items[start:start + batch_size])
+            if products:
+                # Отправка пакета изменений в RabbitMQ одним сообщением
+                event = ProductsUpdatedDTO(items=[
+                    ProductChangeDTO(id=product.id, price=product.price, quantity_delta=product.quantity_delta or None)
+                    for product in products
+                ])
+                await router.broker.publish(
+                    message=event.model_dump(exclude_none=True),
+                    queue="products.updated"
+                )
+
+            updated += len(products)
+            not_found.extend(missing[:max(settings.product_bulk_update_max_not_found - len(not_found), 0)])
+
+        logger.info("Products bulk updated: %s, not found: %s", updated, len(not_found))
+        return {"Message": "Ok", "Updated": updated, "NotFound": not_found}
+
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error("Unexpected error in bulk_update_products after %s products: %s", updated, e, exc_info=True)
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Internal server error"
+        )
+
+
+@router.patch("/product/{product_id}", response_model=ProductResponse)
+async def update_product(
+    product_id: int,
+    data: ProductUpdateDTO,
+    current_user: User = Depends(get_current_admin),
+    product_service: ProductService = Depends(get_product_service)
+):
+    """
+    Изменить товар
+    
+    Args:
+        product_id: ID товара
+        data: Изменяемые поля (name, quantity, price, category_id); остальные не меняются
+        current_user: Текущий авторизованный пользователь (администратор)
+        product_service: Сервис для работы с товарами
+        
+    Returns:
+        ProductResponse: Измененный товар
+        
+    Raises:
+        HTTPException 404: Если товар или категория не найдены
+        HTTPException 500: При внутренней ошибке сервера
+    """
+    try:
+        product, quantity_delta = await product_service.update_product(product_id, data)
+
+        # Отправка в RabbitMQ только измененных полей; остаток - изменением,
+        # чтобы не перезаписать списания order_service, еще не дошедшие до каталога
+        changes = data.model_dump(include={"name", "price"}, exclude_none=True)
+        if quantity_delta:
+            changes["quantity_delta"] = quantity_delta
+        if changes:
+            event = ProductsUpdatedDTO(items=[ProductChangeDTO(id=product.id, **changes)])
+            await router.broker.publish(
+                message=event.model_dump(exclude_none=True),
+                queue="products.updated"
+            )
+        logger.info("Product updated successfully: %s - %s", product.id, product.name)
+
+        return {"Message": "Ok", "Product": product}
+
+    except NotFoundError as e:
+        logger.warning("Product update failed: %s", e)
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=str(e)
+        )
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error("Unexpected error in update_product: %s", e, exc_info=True)
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Internal server error"
+        )
+
+
+@router.get("/product/{product_id}", response_model=ProductDetailResponse)
+async def get_product(
+    product_id: int,
+    user: User = Depends(get_current_user),
+    etag: str = Depends(table_etag(Product.__tablename__, Category.__tablename__)),
+    product_service: ProductService = Depends(get_product_service)
+):
+    """
+    Получить товар с категорией по ID
+    
+    Args:
+        product_id: ID товара
+        user: Текущий авторизованный пользователь
+        etag: ETag ответа (при совпадении с If-None-Match - ответ 304)
+        product_service: Сервис для работы с товарами
+        
+    Returns:
+        ProductDetailResponse: Товар с категорией
+        
+    Raises:
+        HTTPException 404: Если товар не найден
+        HTTPException 500: При внутренней ошибке сервера
+    """
+    try:
+        product = await product_service.get_product_with_category(product_id)
+        if product is None:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail=f"Product with id {product_id} not found"
+            )
+        return {"Message": "Ok", "Product": product}
+
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error("Unexpected error in get_product: %s", e, exc_info=True)
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail="Internal server error"
         )
 
 
-@router.get("/products")
+@router.get("/products", response_model=ProductListResponse)
 async def get_products(
+    filters: ProductFilterDTO = Depends(get_product_filters),
     skip: int = 0,
     limit: int = 100,
+    cursor: Optional[str] = None,
     user: User = Depends(get_current_user),
+    etag: str = Depends(table_etag(Product.__tablename__)),
     product_service: ProductService = Depends(get_product_service)
 ):
     """
     Получить список всех товаров
     
+    Следующая страница запрашивается с курсором NextCursor из предыдущего
+    ответа и теми же фильтрами. Количество товаров по категориям и диапазонам
+    цен (Facets) возвращается на первой странице
+    
     Args:
-        skip: Количество записей для пропуска (по умолчанию 0)
+        filters: Фильтры по цене и наличию, сортировка
+        skip: Количество записей для пропуска (по умолчанию 0, не передается вместе с cursor)
         limit: Максимальное количество записей (по умолчанию 100)
+        cursor: Курсор страницы (по умолчанию - первая страница)
         user: Текущий авторизованный пользователь
+        etag: ETag ответа (при совпадении с If-None-Match - ответ 304)
         product_service: Сервис для работы с товарами
         
     Returns:
-        List[Product]: Список товаров
+        ProductListResponse: Список товаров, курсор следующей страницы и количество по фильтрам
+        
+    Raises:
+        HTTPException 400: Если курсор поврежден, получен с другой сортировкой или передан вместе со skip
+        HTTPException 500: При внутренней ошибке сервера
     """
     try:
-        products = await product_service.get_all_products(skip, limit)
-        return {"Message": "Ok", "Products" : products}
+        products, next_cursor = await product_service.get_all_products(skip, limit, filters, cursor)
+        facets = None if cursor else await product_service.get_product_facets(None, filters)
+        return {"Message": "Ok", "Products" : products, "NextCursor": next_cursor, "Facets": facets}
 
+    except ValueError as e:
+        logger.warning("Product listing failed: %s", e)
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
     except Exception as e:
-        logger.error(f"Unexpected error in get_products: {str(e)}", exc_info=True)
+        logger.error("Unexpected error in get_products: %s", e, exc_info=True)
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail="Internal server error"
         )
 
 
-@router.get("/products_with_category/{category_id}")
+@router.get("/products/export")
+async def export_products_stream(
+    format: ExportFormat = "ndjson",
+    category_id: Optional[int] = None,
+    updated_since: Optional[datetime] = None,
+    user: User = Depends(get_current_user),
+    category_service: CategoryService = Depends(get_category_service)
+):
+    """
+    Выгрузить товары одним потоковым ответом (NDJSON или CSV) в порядке ID
+    
+    Заменяет постраничный обход /products: товары читаются из серверного
+    курсора, память не зависит от размера каталога
+    
+    Args:
+        format: Формат выгрузки: ndjson (по умолчанию) или csv
+        category_id: Только товары категории и всех ее подкатегорий (необязательно)
+        updated_since: Только товары, измененные начиная с этого времени (без часового пояса - UTC);
+            для инкрементальной выгрузки - с окном перекрытия, см. README
+        user: Текущий авторизованный пользователь
+        category_service: Сервис для работы с категориями
+        
+    Returns:
+        StreamingResponse: Товары (id, name, storage_quantity, price, category_id, updated_at)
+        
+    Raises:
+        HTTPException 404: Если категория не найдена
+        HTTPException 500: При внутренней ошибке сервера
+    """
+    try:
+        category_ids = None
+        if category_id is not None:
+            category_ids = await category_service.get_subtree_ids(category_id)
+        if updated_since is not None and updated_since.tzinfo is None:
+            updated_since = updated_since.replace(tzinfo=timezone.utc)
+
+    except NotFoundError as e:
+        logger.warning("Product export failed: %s", e)
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=str(e)
+        )
+    except Exception as e:
+        logger.error("Unexpected error in export_products_stream: %s", e, exc_info=True)
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Internal server error"
+        )
+
+    return StreamingResponse(
+        export_products(format, category_ids, updated_since),
+        media_type=EXPORT_MEDIA_TYPES[format],
+        headers={"Content-Disposition": f'attachment; filename="products.{format}"'},
+    )
+
+
+@router.get("/products/search", response_model=ProductSearchResponse)
+async def search_products(
+    q: str = Query(min_length=2, max_length=100),
+    category_id: Optional[int] = None,
+    limit: int = Query(20, ge=1, le=100),
+    cursor: Optional[str] = None,
+    user: User = Depends(get_current_user),
+    etag: str = Depends(table_etag(Product.__tablename__)),
+    product_service: ProductService = Depends(get_product_service)
+):
+    """
+    Поиск товаров по названию
+    
+    Полнотекстовый поиск с нечетким совпадением и поиском по началу названия,
+    результаты по убыванию релевантности. Следующая страница запрашивается
+    с курсором NextCursor из предыдущего ответа
+    
+    Args:
+        q: Поисковый запрос
+        category_id: ID категории для фильтрации (необязательно)
+        limit: Размер страницы (по умолчанию 20)
+        cursor: Курсор страницы (по умолчанию - первая страница)
+        user: Текущий авторизованный пользователь
+        etag: ETag ответа (при совпадении с If-None-Match - ответ 304)
+        product_service: Сервис для работы с товарами
+        
+    Returns:
+        ProductSearchResponse: Страница найденных товаров и курсор следующей
+        
+    Raises:
+        HTTPException 400: Если курсор поврежден
+        HTTPException 500: При внутренней ошибке сервера
+    """
+    try:
+        products, next_cursor = await product_service.search_products(q, category_id, limit, cursor)
+        return {"Message": "Ok", "Products": products, "NextCursor": next_cursor}
+
+    except ValueError as e:
+        logger.warning("Product search failed: %s", e)
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+    except Exception as e:
+        logger.error("Unexpected error in search_products: %s", e, exc_info=True)
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Internal server error"
+        )
+
+
+@router.get("/products/suggest", response_model=ProductSuggestResponse)
+async def suggest_products(
+    prefix: str = Query(min_length=1, max_length=100),
+    limit: int = Query(10, ge=1, le=50),
+    user: User = Depends(get_current_user),
+    etag: str = Depends(table_etag(Product.__tablename__)),
+    suggestions: ProductSuggestions = Depends(get_product_suggestions)
+):
+    """
+    Подсказки названий товаров при вводе
+    
+    Ищет по индексу в памяти процесса, без запроса к БД: одно из слов
+    названия должно начинаться с введенного префикса
+    
+    Args:
+        prefix: Введенная часть названия
+        limit: Максимальное количество подсказок (по умолчанию 10)
+        user: Текущий авторизованный пользователь
+        etag: ETag ответа (при совпадении с If-None-Match - ответ 304)
+        suggestions: Индекс названий товаров
+        
+    Returns:
+        ProductSuggestResponse: Подсказки (ID и название товара)
+    """
+    found = suggestions.suggest(prefix, limit)
+    return {
+        "Message": "Ok",
+        "Suggestions": [{"id": product_id, "name": name} for product_id, name in found],
+    }
+
+
+@router.get("/products_with_category/{category_id}", response_model=ProductListResponse)
 async def get_products_by_category(
     category_id: int,
+    filters: ProductFilterDTO = Depends(get_product_filters),
     skip: int = 0,
     limit: int = 100,
+    cursor: Optional[str] = None,
     user: User = Depends(get_current_user),
+    etag: str = Depends(table_etag(Product.__tablename__)),
     product_service: ProductService = Depends(get_product_service)
 ):
     """
@@ -113,20 +551,36 @@ async def get_products_by_category(
     
     Args:
         category_id: ID категории
-        skip: Количество записей для пропуска (по умолчанию 0)
+        filters: Фильтры по цене и наличию, сортировка
+        skip: Количество записей для пропуска (по умолчанию 0, не передается вместе с cursor)
         limit: Максимальное количество записей (по умолчанию 100)
+        cursor: Курсор страницы (по умолчанию - первая страница)
         user: Текущий авторизованный пользователь
+        etag: ETag ответа (при совпадении с If-None-Match - ответ 304)
         product_service: Сервис для работы с товарами
         
     Returns:
-        List[Product]: Список товаров в категории
+        ProductListResponse: Список товаров в категории, курсор следующей страницы и количество по фильтрам
+        
+    Raises:
+        HTTPException 400: Если курсор поврежден, получен с другой сортировкой или передан вместе со skip
+        HTTPException 500: При внутренней ошибке сервера
     """
     try:
-        products = await product_service.get_products_by_category_id(category_id, skip, limit)
-        return {"Message": "Ok", "Products" : products}
+        products, next_cursor = await product_service.get_products_by_category_id(
+            category_id, skip, limit, filters, cursor
+        )
+        facets = None if cursor else await product_service.get_product_facets(category_id, filters)
+        return {"Message": "Ok", "Products" : products, "NextCursor": next_cursor, "Facets": facets}
 
+    except ValueError as e:
+        logger.warning("Product listing failed: %s", e)
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
     except Exception as e:
-        logger.error(f"Unexpected error in get_products_by_category: {str(e)}", exc_info=True)
+        logger.error("Unexpected error in get_products_by_category: %s", e, exc_info=True)
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail="Internal server error"
@@ -1,3 +1,7 @@
 from src.consumer.subscriber import router as sub_router
+from src.consumer.stock_sub import router as stock_sub
 
-__all__ = ["sub_router",]
\ No newline at end of file
+__all__ = [
+    "sub_router",
+    "stock_sub",
+]
@@ -0,0 +1,48 @@
+from fastapi import Depends, HTTPException, status
+from faststream.rabbit.fastapi import RabbitRouter
+
+from src.core import get_product_service
+from src.core.logging_config import logger
+from src.core.metrics import broker_metrics_middleware
+from src.core.tracing import broker_tracing_middleware
+from src.config import get_settings
+from src.services import ProductService
+from src.schemas import StockChangedDTO
+
+settings = get_settings()
+router = RabbitRouter(
+    settings.rabbitmq_url,
+    graceful_timeout=settings.shutdown_timeout,
+    middlewares=[broker_metrics_middleware, broker_tracing_middleware],
+)
+
+
+@router.subscriber("stock.changed")
+async def handle_stock_changed(
+    data: StockChangedDTO,
+    product_service: ProductService = Depends(get_product_service)
+):
+    """
+    Обработка пакета изменений остатков из order_service
+    
+    Args:
+        data: Изменения остатков по товарам
+        product_service: Сервис для работы с товарами
+        
+    Raises:
+        HTTPException 500: При внутренней ошибке сервера
+    """
+    try:
+        updated, clamped = await product_service.apply_stock_changes(data.items)
+        logger.info("Stock changes applied in catalog service: %s products", updated)
+        if clamped:
+            logger.warning(
+                "Stock clamped to zero for %s products (oversold or out of sync with order service): %s",
+                len(clamped), clamped[:20]
+            )
+    except Exception as e:
+        logger.error("Unexpected error in handle_stock_changed: %s", e, exc_info=True)
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Internal server error"
+        )
@@ -4,13 +4,19 @@ from faststream.rabbit.fastapi import RabbitRouter
 
 from src.core import get_user_service
 from src.core.logging_config import logger
+from src.core.metrics import broker_metrics_middleware
+from src.core.tracing import broker_tracing_middleware
 from src.config import get_settings
 from src.services import UserService
 from src.schemas import UserBase, UserAll
 from src.exceptions import NotFoundError
 
 settings = get_settings()
-router = RabbitRouter(settings.rabbitmq_url)
+router = RabbitRouter(
+    settings.rabbitmq_url,
+    graceful_timeout=settings.shutdown_timeout,
+    middlewares=[broker_metrics_middleware, broker_tracing_middleware],
+)
 
 
 @router.subscriber(
@@ -32,24 +38,24 @@ async def handle_user_created(
         HTTPException 400: Если пользователь уже существует
     """
     try:
-        logger.info(f"User creation event received in catalog service: {user_data.username}")
+        logger.info("User creation event received in catalog service: %s", user_data.username)
         # Создаем пользователя
         await user_service.create_user(user_data)
-        logger.info(f"User created successfully in catalog service: {user_data.id} - {user_data.username}")
+        logger.info("User created successfully in catalog service: %s - %s", user_data.id, user_data.username)
     except NotFoundError as e:
-        logger.warning(f"Category creation failed: {str(e)}")
+        logger.warning("Category creation failed: %s", e)
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail=str(e)
         )
     except ValueError as e:
-        logger.warning(f"User creation failed: {str(e)}")
+        logger.warning("User creation failed: %s", e)
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail=str(e)
         )
     except Exception as e:
-        logger.error(f"Unexpected error in handle_user_created: {str(e)}", exc_info=True)
+        logger.error("Unexpected error in handle_user_created: %s", e, exc_info=True)
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail="Internal server error"
@@ -75,20 +81,20 @@ async def handle_user_updated(
         HTTPException 404: Если пользователь не найден
     """
     try:
-        logger.info(f"User update event received in catalog service: {user_data.username}")
+        logger.info("User update event received in catalog service: %s", user_data.username)
         updated_user = await user_service.update_user(user_data)
         if not updated_user:
-            logger.warning(f"Failed to update user: {user_data.id}")
+            logger.warning("Failed to update user: %s", user_data.id)
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail="User not found"
             )
         
-        logger.info(f"User updated successfully in catalog service: {user_data.id} - {user_data.username}")
+        logger.info("User updated successfully in catalog service: %s - %s", user_data.id, user_data.username)
     except HTTPException:
         raise
     except Exception as e:
-        logger.error(f"Unexpected error in handle_user_updated: {str(e)}", exc_info=True)
+        logger.error("Unexpected error in handle_user_updated: %s", e, exc_info=True)
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail="Internal server error"
@@ -115,22 +121,22 @@ async def handle_user_deleted(
         HTTPException 500: При внутренней ошибке сервера
     """
     try:
-        logger.info(f"User deletion event received in catalog service: {user.id}")
+        logger.info("User deletion event received in catalog service: %s", user.id)
         
         # Удаляем пользователя через сервис
         success = await user_service.delete_user(user.id)
         if not success:
-            logger.warning(f"User not found for deletion: {user.id}")
+            logger.warning("User not found for deletion: %s", user.id)
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail="User not found"
             )
         
-        logger.info(f"User deleted successfully in catalog service: {user.id}")
+        logger.info("User deleted successfully in catalog service: %s", user.id)
     except HTTPException:
         raise
     except Exception as e:
-        logger.error(f"Unexpected error in handle_user_deleted: {str(e)}", exc_info=True)
+        logger.error("Unexpected error in handle_user_deleted: %s", e, exc_info=True)
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail="Internal server error"
@@ -6,11 +6,14 @@ __all__ = [
     "get_user_repository",
     "get_category_repository",
     "get_product_repository",
+    "get_table_version_repository",
     "get_user_service",
     "get_category_service",
     "get_product_service",
+    "get_product_filters",
     "get_current_user",
     "get_current_admin",
+    "table_etag",
 
     "logger",
 ]
\ No newline at end of file
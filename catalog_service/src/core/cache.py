@@ -0,0 +1,179 @@
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Hashable, List, Optional, Tuple
+
+from src.config import get_settings
+from src.core.metrics import cache_entries, cache_requests_total
+from src.models import Category, Product
+from src.publisher import get_table_versions
+
+settings = get_settings()
+
+
+class LRUCache:
+    """
+    Кэш в памяти процесса с вытеснением давно не использованных записей
+
+    Размер ограничен числом записей, каждая запись живет не дольше ttl секунд.
+    Обращения учитываются в метрике cache_requests_total (hit/miss)
+    """
+
+    def __init__(self, name: str, maxsize: int, ttl: float):
+        """
+        Инициализация кэша
+
+        Args:
+            name: Имя кэша (метка метрик)
+            maxsize: Максимальное количество записей
+            ttl: Время жизни записи в секундах
+        """
+        self.name = name
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._entries: "OrderedDict[Hashable, Tuple[float, Any]]" = OrderedDict()
+        # Увеличивается при каждой инвалидации: загруженное во время инвалидации значение не кэшируется
+        self._generation = 0
+        self.hits = 0
+        self.misses = 0
+        self._hits = cache_requests_total.labels(name, "hit")
+        self._misses = cache_requests_total.labels(name, "miss")
+        self._size = cache_entries.labels(name)
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        """
+        Получить значение из кэша
+
+        Args:
+            key: Ключ записи
+
+        Returns:
+            Значение или None, если записи нет или она устарела
+        """
+        entry = self._entries.get(key)
+        if entry is not None:
+            expires_at, value = entry
+            if expires_at > time.monotonic():
+                self._entries.move_to_end(key)
+                self.hits += 1
+                self._hits.inc()
+                return value
+            del self._entries[key]
+            self._size.set(len(self._entries))
+        self.misses += 1
+        self._misses.inc()
+        return None
+
+    def put(self, key: Hashable, value: Any) -> None:
+        """
+        Сохранить значение, вытеснив самую давно использованную запись при переполнении
+
+        Args:
+            key: Ключ записи
+            value: Значение
+        """
+        self._entries[key] = (time.monotonic() + self.ttl, value)
+        self._entries.move_to_end(key)
+        if len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+        self._size.set(len(self._entries))
+
+    async def get_or_load(self, key: Hashable, loader: Callable[[], Awaitable[Optional[Any]]]) -> Optional[Any]:
+        """
+        Получить значение из кэша, при промахе загрузить и сохранить (read-through)
+
+        None не кэшируется. Если во время загрузки кэш инвалидировался,
+        значение возвращается, но не сохраняется: оно могло быть прочитано до изменения
+
+        Args:
+            key: Ключ записи
+            loader: Корутина без аргументов, загружающая значение
+
+        Returns:
+            Значение или None
+        """
+        value = self.get(key)
+        if value is not None:
+            return value
+
+        generation = self._generation
+        value = await loader()
+        if value is not None and generation == self._generation:
+            self.put(key, value)
+        return value
+
+    def invalidate(self, keys: List[Hashable]) -> None:
+        """
+        Удалить записи по ключам
+
+        Args:
+            keys: Ключи записей
+        """
+        self._generation += 1
+        for key in keys:
+            self._entries.pop(key, None)
+        self._size.set(len(self._entries))
+
+    def invalidate_where(self, predicate: Callable[[Any], bool]) -> None:
+        """
+        Удалить записи, значения которых удовлетворяют условию
+
+        Args:
+            predicate: Условие для значения записи
+        """
+        self.invalidate([key for key, (_, value) in self._entries.items() if predicate(value)])
+
+    def clear(self) -> None:
+        """
+        Удалить все записи
+        """
+        self.invalidate(list(self._entries))
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Статистика кэша
+
+        Returns:
+            Словарь с размером, числом попаданий и промахов и долей попаданий (в этом процессе)
+        """
+        total = self.hits + self.misses
+        return {
+            "size": len(self._entries),
+            "maxsize": self.maxsize,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / total, 4) if total else 0.0,
+        }
+
+
+def _invalidate_products(cache: LRUCache, table: str, ids: Optional[List[int]]) -> None:
+    if table == Product.__tablename__:
+        if ids is None:
+            cache.clear()
+        else:
+            cache.invalidate(ids)
+    elif table == Category.__tablename__:
+        if ids is None:
+            cache.clear()
+        else:
+            changed = set(ids)
+            cache.invalidate_where(lambda product: product.category.id in changed)
+
+
+_product_cache = None
+
+def get_product_cache():
+    """
+    Кэш товаров с категорией по ID товара
+
+    Записи удаляются при изменении товаров и их категорий в любом
+    процессе сервиса (через рассылку версий таблиц)
+    """
+    global _product_cache
+
+    if _product_cache is None:
+        _product_cache = LRUCache("product", settings.product_cache_size, settings.product_cache_ttl)
+        get_table_versions().add_listener(
+            lambda table, ids, columns: _invalidate_products(_product_cache, table, ids)
+        )
+
+    return _product_cache
@@ -0,0 +1,114 @@
+import asyncio
+from typing import Optional
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncConnection
+
+from src.config import get_settings
+from src.core.logging_config import logger
+from src.database import db_dependency_instance
+from src.publisher import get_table_versions
+from src.repositories import CategoryRepository, ProductRepository, TableVersionRepository
+from src.services import CategoryService
+
+settings = get_settings()
+
+# Advisory-блокировка, которую держит процесс, выполняющий сверку
+REPAIR_LOCK = "category_counts_repair"
+
+
+class CategoryCountsRepair:
+    """
+    Периодическая сверка счетчиков товаров категорий
+
+    Счетчики direct_count и subtree_count изменяются вместе с товарами;
+    сверка пересчитывает их по таблице products и исправляет расхождения
+    (например, после изменения товаров в обход сервиса).
+
+    Задача запускается в каждом worker-процессе, но сверяет только процесс,
+    взявший сессионную advisory-блокировку REPAIR_LOCK: остальные пробуют
+    взять ее каждый период и сменяют его, если он остановился или потерял соединение
+    """
+
+    def __init__(self, interval: float):
+        """
+        Инициализация сверки
+
+        Args:
+            interval: Период сверки, секунды
+        """
+        self.interval = interval
+        self._task: Optional[asyncio.Task] = None
+        self._lock_connection: Optional[AsyncConnection] = None
+
+    async def run(self) -> None:
+        """
+        Сверить счетчики один раз
+        """
+        async with db_dependency_instance.db_session() as session:
+            service = CategoryService(
+                CategoryRepository(session),
+                ProductRepository(session),
+                TableVersionRepository(session),
+                get_table_versions(),
+            )
+            ids = await service.repair_product_counts()
+        if ids:
+            logger.warning("Category product counts repaired: %s categories %s", len(ids), ids[:20])
+
+    async def _hold_lock(self) -> bool:
+        if self._lock_connection is not None:
+            try:
+                await self._lock_connection.execute(select(1))
+                await self._lock_connection.commit()
+                return True
+            except Exception as e:
+                logger.warning("Category counts repair lock connection lost: %s", e)
+                await self._release_lock()
+
+        self._lock_connection = await db_dependency_instance.try_session_lock(REPAIR_LOCK)
+        return self._lock_connection is not None
+
+    async def _release_lock(self) -> None:
+        connection, self._lock_connection = self._lock_connection, None
+        if connection is not None:
+            try:
+                await db_dependency_instance.release_session_lock(connection)
+            except Exception as e:
+                logger.warning("Error releasing category counts repair lock: %s", e)
+
+    async def _run_periodically(self) -> None:
+        while True:
+            await asyncio.sleep(self.interval)
+            try:
+                if await self._hold_lock():
+                    await self.run()
+            except Exception as e:
+                logger.error("Error repairing category product counts: %s", e, exc_info=True)
+
+    def start(self) -> None:
+        """
+        Запустить периодическую сверку в фоне (при запуске сервиса)
+        """
+        if self.interval > 0 and (self._task is None or self._task.done()):
+            self._task = asyncio.create_task(self._run_periodically())
+
+    async def close(self) -> None:
+        """
+        Остановить периодическую сверку (при остановке сервиса)
+        """
+        if self._task is not None and not self._task.done():
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+        await self._release_lock()
+
+
+_category_counts_repair = None
+
+def get_category_counts_repair():
+    global _category_counts_repair
+
+    if _category_counts_repair is None:
+        _category_counts_repair = CategoryCountsRepair(settings.category_counts_repair_interval)
+
+    return _category_counts_repair
@@ -1,17 +1,25 @@
-from typing import AsyncGenerator
+from typing import AsyncGenerator, Dict, Optional
 
-from fastapi import HTTPException, Depends, status
+from fastapi import HTTPException, Depends, Query, Request, Response, status
 from fastapi.security import HTTPBearer
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from src.repositories import UserRepository, ProductRepository, CategoryRepository
+from src.config import get_settings
+from src.repositories import UserRepository, ProductRepository, CategoryRepository, TableVersionRepository
 from src.services import UserService, ProductService, CategoryService
 from src.models import UserRole, User
 from src.database import db_dependency_instance
+from src.core.cache import LRUCache, get_product_cache
 from src.core.security import verify_token_with_auth_service
+from src.publisher import TableVersions, get_table_versions
+from src.schemas import ProductFilterDTO, ProductSort
 
+settings = get_settings()
 security = HTTPBearer()
 
+# Ответы требуют авторизации: кэшировать может только клиент, с проверкой ETag
+CACHE_CONTROL = f"private, max-age={settings.http_cache_max_age}, must-revalidate"
+
 async def get_db_session() -> AsyncGenerator[AsyncSession, None]:
     async for session in db_dependency_instance.get_session():
         yield session
@@ -38,6 +46,13 @@ async def get_product_repository(
     return ProductRepository(session)
 
 
+async def get_table_version_repository(
+    session: AsyncSession = Depends(get_db_session)
+) -> TableVersionRepository:
+    """Dependency для TableVersionRepository"""
+    return TableVersionRepository(session)
+
+
 async def get_user_service(
     user_repo: UserRepository = Depends(get_user_repository)
 ) -> UserService:
@@ -46,18 +61,45 @@ async def get_user_service(
 
 
 async def get_category_service(
-    category_repo: CategoryRepository = Depends(get_category_repository)
+    category_repo: CategoryRepository = Depends(get_category_repository),
+    product_repo: ProductRepository = Depends(get_product_repository),
+    table_version_repo: TableVersionRepository = Depends(get_table_version_repository),
+    table_versions: TableVersions = Depends(get_table_versions)
 ) -> CategoryService:
     """Dependency для CategoryService"""
-    return CategoryService(category_repo)
+    return CategoryService(category_repo, product_repo, table_version_repo, table_versions)
 
 
 async def get_product_service(
     product_repo: ProductRepository = Depends(get_product_repository),
-    category_repo: CategoryRepository = Depends(get_category_repository)
+    category_repo: CategoryRepository = Depends(get_category_repository),
+    table_version_repo: TableVersionRepository = Depends(get_table_version_repository),
+    table_versions: TableVersions = Depends(get_table_versions),
+    product_cache: LRUCache = Depends(get_product_cache)
 ) -> ProductService:
     """Dependency для ProductService"""
-    return ProductService(product_repo, category_repo)
+    return ProductService(product_repo, category_repo, table_version_repo, table_versions, product_cache)
+
+
+async def get_product_filters(
+    min_price: Optional[int] = Query(None, ge=0),
+    max_price: Optional[int] = Query(None, ge=0),
+    in_stock: bool = False,
+    sort: ProductSort = "id"
+) -> ProductFilterDTO:
+    """
+    Dependency для фильтров и сортировки списков товаров из параметров запроса
+    
+    Args:
+        min_price: Минимальная цена (включительно)
+        max_price: Максимальная цена (включительно)
+        in_stock: Только товары в наличии
+        sort: Сортировка: id, price, name; с "-" - по убыванию
+        
+    Returns:
+        ProductFilterDTO: Фильтры списка товаров
+    """
+    return ProductFilterDTO(min_price=min_price, max_price=max_price, in_stock=in_stock, sort=sort)
 
 
 async def get_current_user(token: str = Depends(security)):
@@ -105,3 +147,62 @@ def require_role(required_role: UserRole):
     return role_checker
 
 get_current_admin = require_role(UserRole.ADMIN)
+
+
+def etag_matches(if_none_match: str, etag: str) -> bool:
+    """
+    Проверить заголовок If-None-Match (слабое сравнение ETag)
+
+    Args:
+        if_none_match: Значение заголовка If-None-Match
+        etag: Текущий ETag ресурса
+
+    Returns:
+        True, если у клиента актуальная версия ресурса
+    """
+    if if_none_match.strip() == "*":
+        return True
+    current = etag.removeprefix("W/")
+    return any(
+        candidate.strip().removeprefix("W/") == current
+        for candidate in if_none_match.split(",")
+    )
+
+
+def table_etag(*tables: str):
+    """
+    Dependency для условных запросов на чтение по версиям таблиц
+
+    If-None-Match сравнивается с версиями таблиц в памяти процесса, поэтому
+    ответ 304 отдается без запроса к БД. Иначе версии читаются в снимке
+    реплики, в котором затем читаются данные ответа (begin_read_snapshot):
+    отстающая реплика не отдаст прежние данные под новым ETag. ETag не новее
+    и версий в памяти процесса: по ним обновляются кэши процесса (товары,
+    подсказки), из которых часть ответов читается без БД
+    
+    Args:
+        tables: Имена таблиц, от которых зависит ответ
+        
+    Returns:
+        Функция-проверка, которая возвращает ETag ответа
+    """
+    def build_etag(versions: Dict[str, int]) -> str:
+        return 'W/"' + "-".join(f"{table}.{versions[table]}" for table in tables) + '"'
+
+    async def etag_checker(
+        request: Request,
+        response: Response,
+        table_version_repo: TableVersionRepository = Depends(get_table_version_repository)
+    ) -> str:
+        current = {table: get_table_versions().get(table) for table in tables}
+        if etag_matches(request.headers.get("if-none-match", ""), build_etag(current)):
+            raise HTTPException(
+                status_code=status.HTTP_304_NOT_MODIFIED,
+                headers={"ETag": build_etag(current), "Cache-Control": CACHE_CONTROL}
+            )
+
+        snapshot = await table_version_repo.begin_read_snapshot(tables)
+        etag = build_etag({table: min(snapshot.get(table, 0), current[table]) for table in tables})
+        response.headers.update({"ETag": etag, "Cache-Control": CACHE_CONTROL})
+        return etag
+    return etag_checker
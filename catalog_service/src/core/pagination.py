@@ -0,0 +1,39 @@
+import base64
+import json
+from typing import Any, Sequence, Tuple
+
+
+def encode_cursor(values: Sequence[Any]) -> str:
+    """
+    Закодировать позицию keyset пагинации в непрозрачную строку
+
+    Args:
+        values: Значения ключа сортировки последней записи страницы
+
+    Returns:
+        Курсор следующей страницы
+    """
+    return base64.urlsafe_b64encode(json.dumps(list(values)).encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, types: Sequence[type]) -> Tuple[Any, ...]:
+    """
+    Раскодировать курсор keyset пагинации
+
+    Args:
+        cursor: Курсор, полученный в ответе на предыдущую страницу
+        types: Типы значений ключа сортировки
+
+    Returns:
+        Значения ключа сортировки
+
+    Raises:
+        ValueError: Если курсор поврежден или не подходит к запросу
+    """
+    try:
+        values = json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+        if not isinstance(values, list) or len(values) != len(types):
+            raise ValueError("Unexpected cursor length")
+        return tuple(value_type(value) for value_type, value in zip(types, values))
+    except (ValueError, TypeError, UnicodeDecodeError) as e:
+        raise ValueError("Invalid cursor") from e
@@ -0,0 +1,75 @@
+import csv
+import io
+from datetime import datetime
+from typing import AsyncIterator, List, Literal, Optional
+
+import orjson
+from sqlalchemy import Row
+
+from src.config import get_settings
+from src.core.logging_config import logger
+from src.database import db_dependency_instance
+from src.repositories import ProductRepository
+
+settings = get_settings()
+
+ExportFormat = Literal["ndjson", "csv"]
+
+EXPORT_MEDIA_TYPES = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv; charset=utf-8",
+}
+
+EXPORT_COLUMNS = ("id", "name", "storage_quantity", "price", "category_id", "updated_at")
+
+
+def _encode_ndjson(rows: List[Row]) -> bytes:
+    return b"".join(orjson.dumps(row._asdict()) + b"\n" for row in rows)
+
+
+def _encode_csv(rows: List[Row]) -> bytes:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer, lineterminator="\n")
+    writer.writerows(
+        (row.id, row.name, row.storage_quantity, row.price, row.category_id, row.updated_at.isoformat())
+        for row in rows
+    )
+    return buffer.getvalue().encode()
+
+
+async def export_products(
+    fmt: ExportFormat,
+    category_ids: Optional[List[int]] = None,
+    updated_since: Optional[datetime] = None
+) -> AsyncIterator[bytes]:
+    """
+    Выгрузка товаров в NDJSON или CSV частями
+
+    Открывает собственную сессию: ответ отправляется потоком уже после
+    завершения обработчика запроса и его зависимостей. Каждая пачка строк
+    серверного курсора (PRODUCT_EXPORT_BATCH_SIZE) отправляется одной частью ответа
+
+    Args:
+        fmt: Формат выгрузки
+        category_ids: ID категорий (None - все товары)
+        updated_since: Только товары, измененные начиная с этого времени
+
+    Returns:
+        Асинхронный итератор частей тела ответа
+    """
+    encode = _encode_ndjson if fmt == "ndjson" else _encode_csv
+    if fmt == "csv":
+        yield (",".join(EXPORT_COLUMNS) + "\n").encode()
+
+    exported = 0
+    try:
+        async with db_dependency_instance.db_session() as session:
+            repository = ProductRepository(session)
+            async for rows in repository.stream_export(category_ids, updated_since, settings.product_export_batch_size):
+                exported += len(rows)
+                yield encode(rows)
+    except Exception as e:
+        # Статус ответа уже отправлен: клиент получит оборванное тело
+        logger.error("Product export failed after %s products: %s", exported, e, exc_info=True)
+        raise
+    logger.info("Products exported: %s", exported)
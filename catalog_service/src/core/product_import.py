@@ -0,0 +1,208 @@
+import codecs
+import csv
+import json
+from typing import Any, AsyncIterator, List, Literal, Optional, Tuple, Union
+
+from pydantic import ValidationError
+
+from src.schemas import ProductAddDTO, ProductImportErrorDTO
+
+ImportFormat = Literal["csv", "ndjson"]
+
+CSV_COLUMNS = ("name", "quantity", "price", "category_id")
+
+
+def import_format(content_type: str) -> Optional[ImportFormat]:
+    """
+    Формат импорта по заголовку Content-Type
+
+    Args:
+        content_type: Значение заголовка Content-Type
+
+    Returns:
+        "csv", "ndjson" или None, если формат не поддерживается
+    """
+    media_type = content_type.split(";")[0].strip().lower()
+    if media_type in ("text/csv", "application/csv"):
+        return "csv"
+    if media_type in ("application/x-ndjson", "application/ndjson", "application/jsonl", "application/json-lines"):
+        return "ndjson"
+    return None
+
+
+async def iter_lines(chunks: AsyncIterator[bytes]) -> AsyncIterator[str]:
+    """
+    Разбить поток байтов UTF-8 на строки, не загружая его в память целиком
+
+    Args:
+        chunks: Части тела запроса
+
+    Returns:
+        Асинхронный итератор строк без переводов строки (BOM в начале пропускается)
+    """
+    decoder = codecs.getincrementaldecoder("utf-8-sig")()
+    tail = ""
+    async for chunk in chunks:
+        lines = (tail + decoder.decode(chunk)).split("\n")
+        tail = lines.pop()
+        for line in lines:
+            yield line.rstrip("\r")
+    tail += decoder.decode(b"", final=True)
+    if tail:
+        yield tail.rstrip("\r")
+
+
+def _parse_csv_line(line: str) -> List[str]:
+    return next(csv.reader([line]))
+
+
+async def iter_csv_records(chunks: AsyncIterator[bytes]) -> AsyncIterator[Tuple[int, Union[str, ValueError]]]:
+    """
+    Собрать строки потока в записи CSV
+
+    Поле в кавычках может содержать переводы строк: запись продолжается,
+    пока в ней нечетное число кавычек (экранированная кавычка "" четность не меняет)
+
+    Args:
+        chunks: Части тела запроса
+
+    Returns:
+        Асинхронный итератор пар (номер первой строки записи, запись с переводами
+        строк внутри полей); запись с незакрытой до конца потока кавычкой или
+        длиннее csv.field_size_limit() - ValueError с описанием ошибки
+    """
+    parts: List[str] = []
+    quotes = 0
+    size = 0
+    start = 0
+    line_number = 0
+    async for line in iter_lines(chunks):
+        line_number += 1
+        if not parts:
+            start = line_number
+        parts.append(line)
+        quotes += line.count('"')
+        size += len(line) + 1
+        if quotes % 2 == 0:
+            yield start, "\n".join(parts)
+        elif size > csv.field_size_limit():
+            yield start, ValueError("CSV record is too long (unclosed quote?)")
+        else:
+            continue
+        parts, quotes, size = [], 0, 0
+    if parts:
+        yield start, ValueError("Unclosed quote in CSV record")
+
+
+async def iter_records(chunks: AsyncIterator[bytes], fmt: ImportFormat) -> AsyncIterator[Tuple[int, Any]]:
+    """
+    Разобрать строки CSV или NDJSON в записи
+
+    CSV - первая строка заголовок с колонками name, quantity, price, category_id
+    (в любом порядке), одна запись в строке (поле в кавычках может занимать
+    несколько строк). NDJSON - один JSON объект в строке. Пустые строки пропускаются
+
+    Args:
+        chunks: Части тела запроса
+        fmt: Формат тела
+
+    Returns:
+        Асинхронный итератор пар (номер строки, запись); запись, которую
+        не удалось разобрать, - ValueError с описанием ошибки
+
+    Raises:
+        ValueError: Если в заголовке CSV нет нужных колонок
+    """
+    header = None
+    lines = iter_lines(chunks) if fmt == "ndjson" else iter_csv_records(chunks)
+    line_number = 0
+    async for line in lines:
+        if fmt == "ndjson":
+            line_number += 1
+        else:
+            line_number, line = line
+            if isinstance(line, ValueError):
+                yield line_number, line
+                continue
+        if not line.strip():
+            continue
+        try:
+            if fmt == "ndjson":
+                yield line_number, json.loads(line)
+                continue
+            values = _parse_csv_line(line)
+        except (ValueError, csv.Error) as e:
+            yield line_number, ValueError(f"Invalid {fmt} line: {e}")
+            continue
+
+        if header is None:
+            header = [column.strip() for column in values]
+            missing = set(CSV_COLUMNS) - set(header)
+            if missing:
+                raise ValueError(f"CSV header must contain columns: {', '.join(CSV_COLUMNS)}")
+        elif len(values) != len(header):
+            yield line_number, ValueError(f"Expected {len(header)} columns, got {len(values)}")
+        else:
+            yield line_number, dict(zip(header, values))
+
+
+def validation_message(error: ValidationError) -> str:
+    """
+    Краткое описание ошибок валидации строки
+
+    Args:
+        error: Ошибка валидации pydantic
+
+    Returns:
+        Ошибки через "; " в виде "поле: сообщение"
+    """
+    return "; ".join(
+        f"{'.'.join(str(part) for part in item['loc'])}: {item['msg']}" if item["loc"] else item["msg"]
+        for item in error.errors()
+    )
+
+
+async def iter_product_batches(
+    chunks: AsyncIterator[bytes],
+    fmt: ImportFormat,
+    batch_size: int
+) -> AsyncIterator[Tuple[List[Tuple[int, ProductAddDTO]], List[ProductImportErrorDTO]]]:
+    """
+    Прочитать товары из потока пакетами с валидацией
+
+    Args:
+        chunks: Части тела запроса
+        fmt: Формат тела
+        batch_size: Количество строк в пакете
+
+    Returns:
+        Асинхронный итератор пакетов: (номер строки, товар) прошедших
+        валидацию строк и ошибки остальных строк пакета
+
+    Raises:
+        ValueError: Если в заголовке CSV нет нужных колонок
+    """
+    records: List[Tuple[int, Any]] = []
+    async for record in iter_records(chunks, fmt):
+        records.append(record)
+        if len(records) >= batch_size:
+            yield _validate_batch(records)
+            records = []
+    if records:
+        yield _validate_batch(records)
+
+
+def _validate_batch(
+    records: List[Tuple[int, Any]]
+) -> Tuple[List[Tuple[int, ProductAddDTO]], List[ProductImportErrorDTO]]:
+    products = []
+    errors = []
+    for line, data in records:
+        if isinstance(data, ValueError):
+            errors.append(ProductImportErrorDTO(line=line, error=str(data)))
+            continue
+        try:
+            products.append((line, ProductAddDTO.model_validate(data)))
+        except ValidationError as e:
+            errors.append(ProductImportErrorDTO(line=line, error=validation_message(e)))
+    return products, errors
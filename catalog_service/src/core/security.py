@@ -1,17 +1,40 @@
-from src.core.logging_config import logger
+from typing import Optional
+
+from src.core.logging_config import hot_path_logger
 import httpx
 
+_http_client: Optional[httpx.AsyncClient] = None
+
+
+def get_http_client() -> httpx.AsyncClient:
+    """Общий HTTP клиент сервиса: соединения с auth-service переиспользуются между запросами"""
+    global _http_client
+
+    if _http_client is None:
+        _http_client = httpx.AsyncClient()
+
+    return _http_client
+
+
+async def close_http_client() -> None:
+    """Закрыть общий HTTP клиент"""
+    global _http_client
+
+    if _http_client is not None:
+        await _http_client.aclose()
+        _http_client = None
+
+
 async def verify_token_with_auth_service(token: str) -> dict:
     """Проверка токена через HTTP запрос к auth-service"""
-    async with httpx.AsyncClient() as client:
-        try:
-            logger.info("Token is received and sent to auth service.")
-            response = await client.post(
-                "http://auth_service:8000/api/v1/auth/verify",
-                params={"token": token}
-            )
-            logger.info(f"Response is received.")
-            return response.json()
-        except:
-            return {"valid": False}
-
+    client = get_http_client()
+    try:
+        hot_path_logger.info("Token is received and sent to auth service.")
+        response = await client.post(
+            "http://auth_service:8000/api/v1/auth/verify",
+            params={"token": token}
+        )
+        hot_path_logger.info("Response is received.")
+        return response.json()
+    except:
+        return {"valid": False}
@@ -0,0 +1,106 @@
+import asyncio
+import copy
+import functools
+from typing import Any, Awaitable, Callable, Dict, Hashable
+
+from src.config import get_settings
+from src.core.metrics import single_flight_calls_total
+from src.database import db_dependency_instance
+from src.repositories.base_repository import BaseRepository
+
+settings = get_settings()
+
+
+class SingleFlight:
+    """
+    Объединение одинаковых одновременных вызовов
+
+    Первый вызов с ключом (leader) запускает загрузку, остальные вызовы
+    с тем же ключом, пришедшие до ее завершения, ждут тот же результат
+    или ту же ошибку. После завершения ключ освобождается, результат не хранится
+    """
+
+    def __init__(self, name: str):
+        """
+        Инициализация группы вызовов
+
+        Args:
+            name: Имя группы (метка метрик)
+        """
+        self.name = name
+        self._calls: Dict[Hashable, asyncio.Task] = {}
+        self._leaders = single_flight_calls_total.labels(name, "leader")
+        self._coalesced = single_flight_calls_total.labels(name, "coalesced")
+
+    async def do(self, key: Hashable, func: Callable[[], Awaitable[Any]]) -> Any:
+        """
+        Выполнить загрузку или дождаться уже выполняющейся с тем же ключом
+
+        Загрузка выполняется в отдельной задаче: отмена одного из ожидающих
+        (например, клиент закрыл соединение) не отменяет ее для остальных
+
+        Args:
+            key: Ключ вызова
+            func: Корутина без аргументов, выполняющая загрузку
+
+        Returns:
+            Результат загрузки
+        """
+        task = self._calls.get(key)
+        if task is None:
+            self._leaders.inc()
+            task = asyncio.ensure_future(func())
+            self._calls[key] = task
+            task.add_done_callback(functools.partial(self._release, key))
+        else:
+            self._coalesced.inc()
+        return await asyncio.shield(task)
+
+    def _release(self, key: Hashable, task: asyncio.Task) -> None:
+        if self._calls.get(key) is task:
+            del self._calls[key]
+        if not task.cancelled():
+            # Ошибку получают ожидающие вызовы, здесь она только помечается полученной
+            task.exception()
+
+
+def _bind_session(service: Any, session: Any) -> Any:
+    # Копия сервиса, репозитории которой работают в переданной сессии
+    bound = copy.copy(service)
+    for name, value in vars(service).items():
+        if isinstance(value, BaseRepository):
+            setattr(bound, name, type(value)(session))
+    return bound
+
+
+def single_flight(func: Callable) -> Callable:
+    """
+    Декоратор метода сервиса: одинаковые одновременные вызовы выполняют один запрос
+
+    Ключ вызова - аргументы метода без self. Метод объединяется, только если
+    его имя указано в SINGLE_FLIGHT_METHODS. Результат общий для всех ожидающих,
+    поэтому его нельзя изменять. Общая загрузка выполняется в собственной
+    сессии, а не в сессии запроса, который ее начал: тот может завершиться
+    или быть отменен раньше ожидающих и закрыть свою сессию
+
+    Args:
+        func: Асинхронный метод сервиса
+
+    Returns:
+        Метод с объединением вызовов или исходный метод
+    """
+    if func.__name__ not in settings.single_flight_methods:
+        return func
+
+    group = SingleFlight(func.__name__)
+
+    async def load(service, *args, **kwargs):
+        async with db_dependency_instance.db_session() as session:
+            return await func(_bind_session(service, session), *args, **kwargs)
+
+    @functools.wraps(func)
+    async def wrapper(self, *args, **kwargs):
+        key = (args, tuple(sorted(kwargs.items())))
+        return await group.do(key, lambda: load(self, *args, **kwargs))
+
+    return wrapper
@@ -0,0 +1,248 @@
+import asyncio
+from bisect import bisect_left, insort
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from src.core.logging_config import logger
+from src.database import db_dependency_instance
+from src.models import Product
+from src.publisher import get_table_versions
+from src.repositories import ProductRepository
+
+
+# Пакеты изменений больше этого применяются сортировкой всего индекса, а не вставками по одной
+BULK_UPDATE_THRESHOLD = 64
+
+
+def normalize(text: str) -> str:
+    """
+    Привести строку к виду для сравнения префиксов
+
+    Args:
+        text: Исходная строка
+
+    Returns:
+        Строка без различия регистра и ё/е, слова разделены одним пробелом
+    """
+    return " ".join(text.casefold().replace("ё", "е").split())
+
+
+class PrefixIndex:
+    """
+    Индекс строк по префиксу в памяти процесса
+
+    Хранит отсортированный список пар (ключ, ID), поиск префикса - бинарный
+    (bisect). Ключи строки - ее окончания, начинающиеся с каждого слова,
+    поэтому префикс ищется с начала любого слова
+    """
+
+    def __init__(self):
+        self._entries: List[Tuple[str, int]] = []
+        self._names: Dict[int, str] = {}
+
+    def __len__(self) -> int:
+        return len(self._names)
+
+    @staticmethod
+    def _keys(name: str) -> List[str]:
+        words = normalize(name).split(" ")
+        return list(dict.fromkeys(" ".join(words[i:]) for i in range(len(words))))
+
+    def replace(self, items: Iterable[Tuple[int, str]]) -> None:
+        """
+        Построить индекс заново
+
+        Args:
+            items: Пары (ID, строка)
+        """
+        self._names = dict(items)
+        self._entries = sorted(
+            (key, item_id)
+            for item_id, name in self._names.items()
+            for key in self._keys(name)
+        )
+
+    def put(self, item_id: int, name: str) -> None:
+        """
+        Добавить или заменить строку
+
+        Args:
+            item_id: ID
+            name: Строка
+        """
+        if self._names.get(item_id) == name:
+            return
+        self.remove(item_id)
+        self._names[item_id] = name
+        for key in self._keys(name):
+            insort(self._entries, (key, item_id))
+
+    def remove(self, item_id: int) -> None:
+        """
+        Удалить строку по ID (если она есть)
+
+        Args:
+            item_id: ID
+        """
+        name = self._names.pop(item_id, None)
+        if name is None:
+            return
+        for key in self._keys(name):
+            position = bisect_left(self._entries, (key, item_id))
+            if position < len(self._entries) and self._entries[position] == (key, item_id):
+                del self._entries[position]
+
+    def update(self, items: Dict[int, str], removed: Iterable[int] = ()) -> None:
+        """
+        Применить пакет изменений
+
+        Небольшие пакеты вставляются бинарным поиском, большие (импорт) - добавлением
+        в конец и сортировкой: вставка по одной стоила бы O(n) на каждую строку
+
+        Args:
+            items: Новые и измененные строки {ID: строка}
+            removed: ID удаленных строк
+        """
+        changed = {item_id: name for item_id, name in items.items() if self._names.get(item_id) != name}
+        stale = {item_id for item_id in (*changed, *removed) if item_id in self._names}
+        if len(changed) + len(stale) <= BULK_UPDATE_THRESHOLD:
+            for item_id in stale:
+                self.remove(item_id)
+            for item_id, name in changed.items():
+                self.put(item_id, name)
+            return
+
+        if stale:
+            self._entries = [entry for entry in self._entries if entry[1] not in stale]
+            for item_id in stale:
+                del self._names[item_id]
+        for item_id, name in changed.items():
+            self._names[item_id] = name
+            self._entries.extend((key, item_id) for key in self._keys(name))
+        self._entries.sort()
+
+    def search(self, prefix: str, limit: int) -> List[Tuple[int, str]]:
+        """
+        Найти строки, одно из слов которых начинается с префикса
+
+        Args:
+            prefix: Префикс
+            limit: Максимальное количество результатов
+
+        Returns:
+            Пары (ID, строка) в порядке ключей
+        """
+        prefix = normalize(prefix)
+        if not prefix:
+            return []
+
+        found: Dict[int, str] = {}
+        position = bisect_left(self._entries, (prefix,))
+        while position < len(self._entries) and len(found) < limit:
+            key, item_id = self._entries[position]
+            if not key.startswith(prefix):
+                break
+            found.setdefault(item_id, self._names[item_id])
+            position += 1
+        return list(found.items())
+
+
+class ProductSuggestions:
+    """
+    Подсказки названий товаров для поиска при вводе
+
+    Индекс строится из таблицы products при запуске и обновляется
+    по рассылке версий таблиц: для измененных ID названия перечитываются
+    из БД (удаленные товары удаляются из индекса), поэтому индекс видит
+    изменения товаров из любого процесса сервиса. Изменения, пришедшие
+    во время обновления, накапливаются и применяются следующим обновлением
+    """
+
+    def __init__(self):
+        self.index = PrefixIndex()
+        # Загрузки выполняются по очереди: более поздняя читает БД позже и применяется последней
+        self._lock = asyncio.Lock()
+        self._pending: Set[int] = set()
+        self._pending_all = False
+        self._task: Optional[asyncio.Task] = None
+
+    async def load(self, ids: Optional[List[int]] = None) -> None:
+        """
+        Загрузить названия товаров из БД в индекс
+
+        Args:
+            ids: ID товаров (None - построить индекс заново из всех товаров)
+        """
+        async with self._lock:
+            async with db_dependency_instance.db_session() as session:
+                names = await ProductRepository(session).get_names(ids)
+            if ids is None:
+                self.index.replace(names)
+                return
+            found = dict(names)
+            self.index.update(found, [product_id for product_id in ids if product_id not in found])
+
+    def suggest(self, prefix: str, limit: int) -> List[Tuple[int, str]]:
+        """
+        Товары, одно из слов названия которых начинается с префикса
+
+        Args:
+            prefix: Введенная часть названия
+            limit: Максимальное количество подсказок
+
+        Returns:
+            Пары (ID товара, название)
+        """
+        return self.index.search(prefix, limit)
+
+    def on_table_change(self, table: str, ids: Optional[List[int]], columns: Optional[List[str]]) -> None:
+        """
+        Слушатель изменений таблиц: запускает обновление индекса в фоне
+
+        Изменения, не затрагивающие названия (цены, остатки, категория),
+        индекс не обновляют: иначе каждое событие stock.changed перечитывало бы названия
+
+        Args:
+            table: Имя таблицы
+            ids: ID измененных строк (None - могли измениться любые строки)
+            columns: Измененные колонки (None - могли измениться любые колонки)
+        """
+        if table != Product.__tablename__:
+            return
+        if columns is not None and Product.name.key not in columns:
+            return
+        if ids is None:
+            self._pending_all = True
+        else:
+            self._pending.update(ids)
+        if self._task is None or self._task.done():
+            self._task = asyncio.ensure_future(self._refresh())
+
+    async def _refresh(self) -> None:
+        while self._pending_all or self._pending:
+            ids = None if self._pending_all else list(self._pending)
+            self._pending_all = False
+            self._pending = set()
+            try:
+                await self.load(ids)
+            except Exception as e:
+                logger.error("Error refreshing product suggestions: %s", e, exc_info=True)
+
+    async def close(self) -> None:
+        """
+        Отменить незавершенное обновление индекса (при остановке сервиса)
+        """
+        if self._task is not None and not self._task.done():
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+
+
+_product_suggestions = None
+
+def get_product_suggestions():
+    global _product_suggestions
+
+    if _product_suggestions is None:
+        _product_suggestions = ProductSuggestions()
+        get_table_versions().add_listener(_product_suggestions.on_table_change)
+
+    return _product_suggestions
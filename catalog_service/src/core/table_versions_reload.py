@@ -0,0 +1,91 @@
+import asyncio
+from typing import Dict, List, Optional
+
+from src.config import get_settings
+from src.core.logging_config import logger
+from src.database import db_dependency_instance
+from src.publisher import get_table_versions
+from src.repositories import TableVersionRepository
+
+settings = get_settings()
+
+
+class TableVersionsReload:
+    """
+    Периодическое перечитывание версий таблиц из БД в каждом процессе
+
+    Без него процесс, пропустивший событие рассылки версий, отдавал бы 304
+    на прежние данные до следующего изменения таблицы. Версия, увиденная
+    в БД, считается пропущенной, только если событие о ней не пришло и
+    к следующему перечитыванию: событие изменения, еще идущее через RabbitMQ,
+    не приводит к сбросу кэшей всей таблицы
+    """
+
+    def __init__(self, interval: float):
+        """
+        Инициализация перечитывания
+
+        Args:
+            interval: Период перечитывания, секунды
+        """
+        self.interval = interval
+        self._task: Optional[asyncio.Task] = None
+        self._seen: Dict[str, int] = {}
+
+    async def run(self) -> List[str]:
+        """
+        Перечитать версии один раз
+
+        Returns:
+            Имена таблиц, события об изменении которых были пропущены
+        """
+        async with db_dependency_instance.db_session() as session:
+            versions = await TableVersionRepository(session).get_all()
+
+        table_versions = get_table_versions()
+        missed = {
+            table: versions.get(table, version)
+            for table, version in self._seen.items()
+            if version > table_versions.get(table)
+        }
+        for table, version in missed.items():
+            # ID измененных строк неизвестны: слушатели сбрасывают данные всей таблицы
+            table_versions.apply(table, version)
+        self._seen = versions
+        if missed:
+            logger.warning("Table version events missed, reloaded from database: %s", missed)
+        return list(missed)
+
+    async def _run_periodically(self) -> None:
+        while True:
+            await asyncio.sleep(self.interval)
+            try:
+                await self.run()
+            except Exception as e:
+                logger.error("Error reloading table versions: %s", e, exc_info=True)
+
+    def start(self) -> None:
+        """
+        Запустить периодическое перечитывание в фоне (при запуске сервиса)
+        """
+        if self.interval > 0 and (self._task is None or self._task.done()):
+            self._task = asyncio.create_task(self._run_periodically())
+
+    async def close(self) -> None:
+        """
+        Остановить периодическое перечитывание (при остановке сервиса)
+        """
+        if self._task is not None and not self._task.done():
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+
+
+_table_versions_reload = None
+
+def get_table_versions_reload():
+    global _table_versions_reload
+
+    if _table_versions_reload is None:
+        _table_versions_reload = TableVersionsReload(settings.table_versions_reload_interval)
+
+    return _table_versions_reload
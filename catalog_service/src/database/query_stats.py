@@ -0,0 +1,136 @@
+import time
+from collections import Counter
+from contextvars import ContextVar
+from typing import Optional
+
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from src.config import get_settings
+from src.core.logging_config import logger
+
+settings = get_settings()
+
+# Ограничение длины параметров запроса в логе медленных запросов
+MAX_LOGGED_PARAMS = 500
+
+
+class QueryStats:
+    """
+    Статистика SQL запросов в рамках одного HTTP запроса
+    """
+
+    def __init__(self, scope: dict) -> None:
+        self.scope = scope
+        self.queries = 0
+        self.total_time = 0.0
+        self.statements: Counter = Counter()
+
+    @property
+    def route(self) -> str:
+        route = self.scope.get("route")
+        path = route.path if route is not None else self.scope.get("path", "")
+        return f"{self.scope.get('method', '')} {path}"
+
+    def record(self, statement: str, elapsed: float) -> None:
+        """
+        Учесть выполненный запрос
+
+        Args:
+            statement: Текст SQL запроса
+            elapsed: Время выполнения в секундах
+        """
+        self.queries += 1
+        self.total_time += elapsed
+        self.statements[statement] += 1
+
+    def repeated_statements(self, threshold: int) -> list:
+        """
+        Одинаковые запросы, выполненные не меньше threshold раз
+
+        Args:
+            threshold: Минимальное число повторов
+
+        Returns:
+            Список пар (текст запроса, число повторов)
+        """
+        return [
+            (statement, count)
+            for statement, count in self.statements.items()
+            if count >= threshold
+        ]
+
+
+_current_stats: ContextVar[Optional[QueryStats]] = ContextVar("query_stats", default=None)
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany) -> None:
+    conn.info.setdefault("query_start", []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany) -> None:
+    elapsed = time.perf_counter() - conn.info["query_start"].pop()
+
+    stats = _current_stats.get()
+    if stats is not None:
+        stats.record(statement, elapsed)
+
+    if elapsed * 1000 >= settings.db_slow_query_ms:
+        logger.warning(
+            "Slow query (%.1f ms) on %s: %s | params: %.*s",
+            elapsed * 1000,
+            stats.route if stats is not None else "background task",
+            statement,
+            MAX_LOGGED_PARAMS,
+            parameters,
+        )
+
+
+def register_query_hooks(engine: AsyncEngine) -> None:
+    """
+    Подключить учет запросов к движку
+
+    Args:
+        engine: Асинхронный движок SQLAlchemy
+    """
+    event.listen(engine.sync_engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(engine.sync_engine, "after_cursor_execute", _after_cursor_execute)
+
+
+class QueryStatsMiddleware:
+    """
+    ASGI middleware: считает SQL запросы HTTP запроса
+
+    Добавляет в ответ заголовки X-DB-Queries и X-DB-Time (мс) и пишет
+    предупреждение о возможной проблеме N+1, если одинаковый запрос
+    выполнился не меньше DB_N_PLUS_ONE_THRESHOLD раз
+    """
+
+    def __init__(self, app) -> None:
+        self.app = app
+
+    async def __call__(self, scope, receive, send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        stats = QueryStats(scope)
+        token = _current_stats.set(stats)
+
+        async def send_with_stats(message) -> None:
+            if message["type"] == "http.response.start":
+                headers = list(message.get("headers", []))
+                headers.append((b"x-db-queries", str(stats.queries).encode()))
+                headers.append((b"x-db-time", f"{stats.total_time * 1000:.2f}".encode()))
+                message["headers"] = headers
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_stats)
+        finally:
+            _current_stats.reset(token)
+            for statement, count in stats.repeated_statements(settings.db_n_plus_one_threshold):
+                logger.warning(
+                    "Possible N+1 on %s: statement executed %d times: %s",
+                    stats.route, count, statement
+                )
@@ -1,31 +1,124 @@
+import asyncio
 from contextlib import asynccontextmanager
 
 import uvicorn
-from fastapi import FastAPI
+from fastapi import APIRouter, FastAPI, Response
+from fastapi.responses import ORJSONResponse
+from prometheus_client import CONTENT_TYPE_LATEST
 
-from src import db_dependency_instance, router
+from src import brokers, db_dependency_instance, router
+from src.config import get_settings
+from src.core.cache import get_product_cache
+from src.core.category_counts import get_category_counts_repair
+from src.core.compression import CompressionMiddleware
 from src.core.logging_config import logger
+from src.core.security import close_http_client
+from src.core.suggest import get_product_suggestions
+from src.core.table_versions_reload import get_table_versions_reload
+from src.core.metrics import MetricsMiddleware, register_db_pool_collector, render_metrics
+from src.core.tracing import setup_tracing, shutdown_tracing
+from src.database.query_stats import QueryStatsMiddleware
+from src.publisher import get_table_versions
+from src.repositories import TableVersionRepository
+
+settings = get_settings()
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     logger.info("Starting application...")
     try:
-        await db_dependency_instance.table_creating()
+        await db_dependency_instance.check_schema_version()
     except Exception as e:
-        logger.error(f"Error creating database tables: {str(e)}", exc_info=True)
+        logger.error("Database schema check failed: %s", e, exc_info=True)
         raise
     yield
     logger.info("Shutting down application...")
+    await db_dependency_instance.dispose()
+    shutdown_tracing()
+
+
+@asynccontextmanager
+async def table_versions_lifespan(app: FastAPI):
+    """
+    Загрузка версий таблиц для ETag и индекса подсказок названий товаров из БД,
+    запуск периодического перечитывания версий и сверки счетчиков товаров категорий
+
+    Роутер с этим lifespan подключается после роутеров брокеров, поэтому версии
+    и индекс загружаются, когда подписка на рассылку версий уже работает, и изменения
+    других процессов во время запуска не теряются
+    """
+    async with db_dependency_instance.db_session() as session:
+        versions = await TableVersionRepository(session).get_all()
+    get_table_versions().load(versions)
+    logger.info("Table versions loaded: %s", versions)
 
+    suggestions = get_product_suggestions()
+    await suggestions.load()
+    logger.info("Product suggestions index loaded: %s products", len(suggestions.index))
 
-app = FastAPI(lifespan=lifespan)
+    versions_reload = get_table_versions_reload()
+    versions_reload.start()
+    counts_repair = get_category_counts_repair()
+    counts_repair.start()
+    yield
+    await counts_repair.close()
+    await suggestions.close()
+    await versions_reload.close()
+
+
+@asynccontextmanager
+async def shutdown_lifespan(app: FastAPI):
+    """
+    Упорядоченная остановка, пока брокеры RabbitMQ еще подключены
+
+    Роутер с этим lifespan подключается последним, поэтому при остановке
+    он завершается первым: раньше lifespan брокеров и приложения.
+    Останавливает прием сообщений и ждет обработчики (не дольше SHUTDOWN_TIMEOUT),
+    закрывает HTTP клиент. Брокеры закрываются после, соединения с БД - в lifespan приложения
+    """
+    yield
+    logger.info("Stopping message consumers...")
+    await asyncio.gather(*(
+        subscriber.stop()
+        for broker in brokers
+        for subscriber in broker.subscribers
+    ))
+    await close_http_client()
+
+
+app = FastAPI(lifespan=lifespan, default_response_class=ORJSONResponse)
+app.add_middleware(
+    CompressionMiddleware,
+    minimum_size=settings.compression_minimum_size,
+    compresslevel=settings.compression_gzip_level,
+    brotli_quality=settings.compression_brotli_quality,
+)
+app.add_middleware(QueryStatsMiddleware)
+app.add_middleware(MetricsMiddleware)
+
+register_db_pool_collector(db_dependency_instance.pool_stats)
+setup_tracing(app)
 
 app.include_router(router, prefix="/api/v1")
+app.include_router(APIRouter(lifespan=table_versions_lifespan))
+app.include_router(APIRouter(lifespan=shutdown_lifespan))
 
 @app.get("/health")
 async def health():
     return {"status": "ok"}
 
+@app.get("/metrics/db_pool")
+async def db_pool_metrics():
+    return db_dependency_instance.pool_stats()
+
+@app.get("/metrics/cache")
+async def cache_metrics():
+    return {"product": get_product_cache().stats()}
+
+@app.get("/metrics")
+async def metrics():
+    return Response(render_metrics(), media_type=CONTENT_TYPE_LATEST)
+
 if __name__ == "__main__":
     uvicorn.run("main:app", port=8001)
@@ -3,6 +3,7 @@ from src.models.base_classes import Base, IDMixin, NameMixin
 from src.models.users import User, UserRole
 from src.models.categories import Category
 from src.models.products import Product
+from src.models.table_versions import TableVersion
 
 __all__ = [
     "Base",
@@ -11,4 +12,5 @@ __all__ = [
     "UserRole",
     "Category",
     "Product",
+    "TableVersion",
 ]
@@ -6,7 +6,7 @@ from sqlalchemy.orm import relationship, Mapped, mapped_column
 
 from src.models.base_classes import Base, IDMixin, NameMixin
 
-parent_fk = Annotated[int, mapped_column(ForeignKey('categories.id'))]
+parent_fk = Annotated[int, mapped_column(ForeignKey('categories.id'), index=True)]
 
 
 class Category(Base, IDMixin, NameMixin):
@@ -14,6 +14,10 @@ class Category(Base, IDMixin, NameMixin):
 
     parent_id: Mapped[Optional[parent_fk]]
     level: Mapped[int] = mapped_column(default=0)  # Уровень вложенности (0 - корень)
+    # Количество товаров в категории и вместе с подкатегориями: изменяются вместе с товарами
+    # (CategoryRepository.add_product_counts), периодически сверяются с таблицей products
+    direct_count: Mapped[int] = mapped_column(default=0, server_default="0")
+    subtree_count: Mapped[int] = mapped_column(default=0, server_default="0")
 
     children: Mapped[list["Category"]] = relationship(
         back_populates="parent",
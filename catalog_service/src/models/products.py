@@ -1,4 +1,7 @@
-from sqlalchemy import ForeignKey, CheckConstraint
+from datetime import datetime
+
+from sqlalchemy import ForeignKey, CheckConstraint, Computed, DateTime, Index, func
+from sqlalchemy.dialects.postgresql import TSVECTOR
 from sqlalchemy.orm import relationship, mapped_column, Mapped
 from typing_extensions import Annotated
 
@@ -6,16 +9,49 @@ from src.models.base_classes import Base, IDMixin, NameMixin
 
 category_fk = Annotated[int, mapped_column(ForeignKey('categories.id'))]
 
+# Конфигурация полнотекстового поиска: русские слова со стеммингом, латиница - английский стемминг
+SEARCH_CONFIG = 'russian'
+
 
 class Product(Base, IDMixin, NameMixin):
     __tablename__ = 'products'
     __table_args__ = (
         CheckConstraint('storage_quantity >= 0', name='check_quantity_positive'),
         CheckConstraint('price >= 0', name='check_price_positive'),
+        Index('ix_products_search_vector', 'search_vector', postgresql_using='gin'),
+        Index(
+            'ix_products_name_trgm', 'name',
+            postgresql_using='gin',
+            postgresql_ops={'name': 'gin_trgm_ops'},
+        ),
+        # Ключи сортировки списков товаров (ProductRepository.sort_key): все и по категории.
+        # Индекс по категории с id заодно обслуживает внешний ключ
+        Index('ix_products_category_id_id', 'category_id', 'id'),
+        Index('ix_products_category_id_price_id', 'category_id', 'price', 'id'),
+        Index('ix_products_category_id_name_id', 'category_id', 'name', 'id'),
+        Index('ix_products_price_id', 'price', 'id'),
+        Index('ix_products_name_id', 'name', 'id'),
     )
+    # updated_at задается БД при INSERT и UPDATE и сразу возвращается в объект (RETURNING)
+    __mapper_args__ = {"eager_defaults": True}
 
     storage_quantity: Mapped[int]
     price: Mapped[int]
     category_id: Mapped[category_fk]
+    # Время последнего изменения (для выгрузки изменений с updated_since).
+    # clock_timestamp(), а не now(): now() - время начала транзакции, и строка, записанная
+    # в конце долгой транзакции, получала бы время раньше уже выгруженных изменений
+    updated_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True),
+        server_default=func.clock_timestamp(),
+        onupdate=func.clock_timestamp(),
+        index=True,
+    )
+    # Вычисляется БД из name, в обычных запросах не загружается
+    search_vector: Mapped[str] = mapped_column(
+        TSVECTOR,
+        Computed(f"to_tsvector('{SEARCH_CONFIG}'::regconfig, (name)::text)", persisted=True),
+        deferred=True,
+    )
 
     category: Mapped["Category"] = relationship(back_populates="products")
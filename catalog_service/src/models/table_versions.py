@@ -0,0 +1,14 @@
+from sqlalchemy import BigInteger
+from sqlalchemy.orm import Mapped, mapped_column
+
+from src.models.base_classes import Base
+
+
+class TableVersion(Base):
+    """
+    Счетчик версии данных таблицы, увеличивается при каждом изменении таблицы
+    """
+    __tablename__ = 'table_versions'
+
+    table_name: Mapped[str] = mapped_column(primary_key=True)
+    version: Mapped[int] = mapped_column(BigInteger, default=0, server_default="0")
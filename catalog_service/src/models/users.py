@@ -15,5 +15,5 @@ class UserRole(str, enum.Enum):
 class User(Base, UUIDMixin):
     __tablename__ = 'users'
 
-    username: Mapped[str]
+    username: Mapped[str] = mapped_column(index=True)
     role: Mapped[UserRole] = mapped_column(Enum(UserRole), default=UserRole.USER, nullable=False)
@@ -0,0 +1,11 @@
+from src.publisher.table_versions import (
+    router as table_versions_pub,
+    TableVersions,
+    get_table_versions,
+)
+
+__all__ = [
+    "table_versions_pub",
+    "TableVersions",
+    "get_table_versions",
+]
@@ -0,0 +1,162 @@
+import uuid
+from typing import Callable, Dict, List, Optional
+
+from faststream.rabbit import ExchangeType, RabbitExchange, RabbitQueue
+from faststream.rabbit.fastapi import RabbitRouter
+
+from src.config import get_settings
+from src.core.logging_config import logger
+from src.core.metrics import broker_metrics_middleware
+from src.core.tracing import broker_tracing_middleware
+from src.schemas import TableVersionDTO
+
+settings = get_settings()
+
+router = RabbitRouter(
+    settings.rabbitmq_url,
+    graceful_timeout=settings.shutdown_timeout,
+    middlewares=[broker_metrics_middleware, broker_tracing_middleware],
+)
+
+# Версии рассылаются всем worker-процессам сервиса: у каждого процесса своя временная очередь
+TABLE_VERSIONS_EXCHANGE = RabbitExchange(name="catalog_table_versions", type=ExchangeType.FANOUT)
+TABLE_VERSIONS_QUEUE = RabbitQueue(
+    name=f"catalog_table_versions.{uuid.uuid4().hex}",
+    exclusive=True,
+    auto_delete=True,
+)
+
+
+class TableVersions:
+    """
+    Версии данных таблиц в памяти процесса
+
+    Используются для ETag ответов на чтение: совпадение версии проверяется
+    без запроса к БД. Версии загружаются из таблицы table_versions при запуске
+    и обновляются событиями, которые процесс, изменивший таблицу, рассылает
+    через fanout exchange. Версия таблицы только растет, поэтому повторные
+    и запоздавшие события ничего не ломают
+
+    Слушатели (кэши процесса) получают каждое изменение вместе с ID измененных строк
+    и измененными колонками.
+    Событие рассылки может потеряться (ошибка публикации, переподключение
+    к RabbitMQ), поэтому версии еще и периодически перечитываются из БД
+    (src.core.table_versions_reload)
+    """
+
+    def __init__(self):
+        self._versions: Dict[str, int] = {}
+        self._listeners: List[Callable[[str, Optional[List[int]], Optional[List[str]]], None]] = []
+
+    def get(self, table: str) -> int:
+        """
+        Текущая версия таблицы
+
+        Args:
+            table: Имя таблицы
+
+        Returns:
+            Версия таблицы (0, если таблица еще не изменялась)
+        """
+        return self._versions.get(table, 0)
+
+    def update(self, table: str, version: int) -> None:
+        """
+        Запомнить версию таблицы, если она новее известной
+
+        Args:
+            table: Имя таблицы
+            version: Версия таблицы
+        """
+        if version > self._versions.get(table, 0):
+            self._versions[table] = version
+
+    def add_listener(self, listener: Callable[[str, Optional[List[int]], Optional[List[str]]], None]) -> None:
+        """
+        Подписаться на изменения таблиц
+
+        Args:
+            listener: Функция (имя таблицы, ID измененных строк или None, измененные колонки или None)
+        """
+        self._listeners.append(listener)
+
+    def apply(
+        self,
+        table: str,
+        version: int,
+        ids: Optional[List[int]] = None,
+        columns: Optional[List[str]] = None
+    ) -> None:
+        """
+        Применить изменение таблицы: обновить версию и уведомить слушателей
+
+        Args:
+            table: Имя таблицы
+            version: Новая версия таблицы
+            ids: ID измененных строк (None - могли измениться любые строки)
+            columns: Измененные колонки (None - могли измениться любые колонки)
+        """
+        self.update(table, version)
+        for listener in self._listeners:
+            listener(table, ids, columns)
+
+    def load(self, versions: Dict[str, int]) -> None:
+        """
+        Запомнить версии нескольких таблиц (при запуске сервиса)
+
+        Args:
+            versions: Словарь {имя таблицы: версия}
+        """
+        for table, version in versions.items():
+            self.update(table, version)
+
+    async def publish(
+        self,
+        table: str,
+        version: int,
+        ids: Optional[List[int]] = None,
+        columns: Optional[List[str]] = None
+    ) -> None:
+        """
+        Применить изменение таблицы в этом процессе и разослать остальным
+
+        Вызывается после фиксации транзакции, увеличившей версию. Ошибка
+        публикации не прерывает запрос: остальные процессы получат версию
+        со следующим изменением таблицы, а записи их кэшей устареют по времени жизни
+
+        Args:
+            table: Имя таблицы
+            version: Новая версия таблицы
+            ids: ID измененных строк (None - могли измениться любые строки)
+            columns: Измененные колонки (None - могли измениться любые колонки)
+        """
+        self.apply(table, version, ids, columns)
+        try:
+            await router.broker.publish(
+                message=TableVersionDTO(table=table, version=version, ids=ids, columns=columns).model_dump(),
+                exchange=TABLE_VERSIONS_EXCHANGE
+            )
+        except Exception as e:
+            logger.error("Error publishing table version %s=%s: %s", table, version, e, exc_info=True)
+
+
+_table_versions = None
+
+def get_table_versions():
+    global _table_versions
+
+    if _table_versions is None:
+        _table_versions = TableVersions()
+
+    return _table_versions
+
+
+@router.subscriber(queue=TABLE_VERSIONS_QUEUE, exchange=TABLE_VERSIONS_EXCHANGE)
+async def handle_table_version(data: TableVersionDTO):
+    """
+    Обработка события об изменении версии таблицы другим процессом сервиса
+
+    Args:
+        data: Имя таблицы, новая версия, ID измененных строк и измененные колонки
+    """
+    get_table_versions().apply(data.table, data.version, data.ids, data.columns)
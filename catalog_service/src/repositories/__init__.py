@@ -1,10 +1,12 @@
 from src.repositories.user_repository import UserRepository
 from src.repositories.product_repository import ProductRepository
 from src.repositories.category_repository import CategoryRepository
+from src.repositories.table_version_repository import TableVersionRepository
 
 __all__ = [
     "UserRepository",
     "ProductRepository",
     "CategoryRepository",
+    "TableVersionRepository",
 ]
 
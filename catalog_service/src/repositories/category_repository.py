@@ -1,10 +1,11 @@
-from typing import Optional, List
+from typing import Dict, Optional, List, Set
 
-from sqlalchemy import select
+from sqlalchemy import select, update, delete, func, case, literal, or_, any_, bindparam, Boolean, Integer, Row
+from sqlalchemy.dialects.postgresql import ARRAY
 from sqlalchemy.orm import selectinload
 
 from src.repositories.base_repository import BaseRepository
-from src.models import Category
+from src.models import Category, Product
 
 
 class CategoryRepository(BaseRepository):
@@ -37,7 +38,7 @@ class CategoryRepository(BaseRepository):
         Returns:
             Category с загруженными связями или None, если категория не найдена
         """
-        result = await self.session.execute(
+        result = await self.execute_read(
             select(Category)
             .where(Category.id == category_id)
             .options(
@@ -48,6 +49,253 @@ class CategoryRepository(BaseRepository):
         )
         return result.scalar_one_or_none()
 
+    async def get_subtree_count(self, category_id: int) -> Optional[int]:
+        """
+        Получить количество товаров категории вместе с подкатегориями (основная БД)
+        
+        Args:
+            category_id: ID категории
+            
+        Returns:
+            subtree_count или None, если категория не найдена
+        """
+        result = await self.session.execute(
+            select(Category.subtree_count).where(Category.id == category_id)
+        )
+        return result.scalar_one_or_none()
+
+    async def get_existing_ids(self, category_ids: Set[int]) -> Set[int]:
+        """
+        Получить ID существующих категорий из заданных одним запросом
+        
+        Args:
+            category_ids: ID категорий для проверки
+            
+        Returns:
+            ID категорий, которые есть в БД
+        """
+        if not category_ids:
+            return set()
+
+        result = await self.session.execute(
+            select(Category.id).where(Category.id.in_(category_ids))
+        )
+        return set(result.scalars().all())
+
+    @staticmethod
+    def _subtree(category_id: int, root_level: int = 0):
+        subtree = (
+            select(Category.id, literal(root_level, Integer).label("level"))
+            .where(Category.id == category_id)
+            .cte("subtree", recursive=True)
+        )
+        return subtree.union_all(
+            select(Category.id, subtree.c.level + 1).where(Category.parent_id == subtree.c.id)
+        )
+
+    async def get_subtree_ids(self, category_id: int, primary: bool = False) -> List[int]:
+        """
+        Получить ID категории и всех ее потомков одним рекурсивным запросом
+        
+        Args:
+            category_id: ID корня поддерева
+            primary: Читать основную БД (в транзакции, изменяющей дерево)
+            
+        Returns:
+            ID категорий поддерева (пустой список, если категория не найдена)
+        """
+        statement = select(self._subtree(category_id).c.id)
+        if primary:
+            result = await self.session.execute(statement)
+        else:
+            result = await self.execute_read(statement)
+        return list(result.scalars().all())
+
+    async def get_ancestor_ids(self, category_id: int) -> List[int]:
+        """
+        Получить ID категории и всех ее предков одним рекурсивным запросом (основная БД)
+        
+        Args:
+            category_id: ID категории
+            
+        Returns:
+            ID категории и предков до корня (пустой список, если категория не найдена)
+        """
+        ancestors = (
+            select(Category.id, Category.parent_id)
+            .where(Category.id == category_id)
+            .cte("ancestors", recursive=True)
+        )
+        ancestors = ancestors.union_all(
+            select(Category.id, Category.parent_id).where(Category.id == ancestors.c.parent_id)
+        )
+        result = await self.session.execute(select(ancestors.c.id))
+        return list(result.scalars().all())
+
+    async def lock_tree(self, shared: bool = False) -> None:
+        """
+        Заблокировать изменения дерева категорий до конца текущей транзакции
+        
+        Транзакционная advisory-блокировка: создание, перемещение и удаление
+        категорий выполняются по очереди, поэтому проверка на цикл и уровни
+        не устаревают до фиксации. Изменения товаров, меняющие счетчики категорий,
+        берут блокировку в разделяемом режиме: путь от категории до корня
+        не меняется до фиксации. Чтение дерева не блокируется
+        
+        Args:
+            shared: Разделяемый режим (изменения товаров не ждут друг друга)
+        """
+        lock = func.pg_advisory_xact_lock_shared if shared else func.pg_advisory_xact_lock
+        await self.session.execute(select(lock(func.hashtext(Category.__tablename__))))
+
+    async def add_product_counts(self, deltas: Dict[int, int]) -> None:
+        """
+        Изменить счетчики товаров категорий и всех их предков одним запросом
+        
+        direct_count меняется у самих категорий, subtree_count - у категорий
+        и предков до корня (рекурсивный CTE по пути вверх, изменения одной
+        категории суммируются). Изменения товаров вызывают его после увеличения
+        версии таблицы products: строка версии упорядочивает такие транзакции,
+        поэтому строки категорий не блокируются ими во встречном порядке
+        
+        Args:
+            deltas: Словарь {ID категории: изменение количества товаров в ней}
+        """
+        deltas = {category_id: delta for category_id, delta in deltas.items() if delta}
+        if not deltas:
+            return
+
+        source = func.unnest(
+            bindparam("category_ids", list(deltas), type_=ARRAY(Integer)),
+            bindparam("deltas", list(deltas.values()), type_=ARRAY(Integer)),
+        ).table_valued("id", "delta").render_derived(name="deltas")
+        chain = (
+            select(source.c.id, source.c.delta, literal(True, Boolean).label("direct"))
+            .cte("chain", recursive=True)
+        )
+        chain = chain.union_all(
+            select(Category.parent_id, chain.c.delta, literal(False, Boolean))
+            .where(Category.id == chain.c.id, Category.parent_id.is_not(None))
+        )
+        totals = (
+            select(
+                chain.c.id,
+                func.coalesce(func.sum(chain.c.delta).filter(chain.c.direct), 0).label("direct"),
+                func.sum(chain.c.delta).label("subtree"),
+            )
+            .group_by(chain.c.id)
+            .subquery("totals")
+        )
+
+        async with self.transaction():
+            await self.session.execute(
+                update(Category)
+                .where(Category.id == totals.c.id)
+                .values(
+                    direct_count=Category.direct_count + totals.c.direct,
+                    subtree_count=Category.subtree_count + totals.c.subtree,
+                )
+                .execution_options(synchronize_session=False)
+            )
+
+    async def repair_product_counts(self) -> List[int]:
+        """
+        Пересчитать счетчики товаров всех категорий по таблице products одним запросом
+        
+        Записываются только расходящиеся значения
+        
+        Returns:
+            ID категорий, счетчики которых были исправлены
+        """
+        paths = (
+            select(Category.id.label("ancestor_id"), Category.id.label("id"))
+            .cte("paths", recursive=True)
+        )
+        paths = paths.union_all(
+            select(paths.c.ancestor_id, Category.id).where(Category.parent_id == paths.c.id)
+        )
+        direct = (
+            select(Product.category_id.label("id"), func.count().label("n"))
+            .group_by(Product.category_id)
+            .subquery("direct")
+        )
+        counts = (
+            select(
+                paths.c.ancestor_id.label("id"),
+                func.coalesce(func.sum(direct.c.n).filter(paths.c.ancestor_id == paths.c.id), 0).label("direct_count"),
+                func.coalesce(func.sum(direct.c.n), 0).label("subtree_count"),
+            )
+            .select_from(paths.outerjoin(direct, direct.c.id == paths.c.id))
+            .group_by(paths.c.ancestor_id)
+            .subquery("counts")
+        )
+
+        async with self.transaction():
+            result = await self.session.execute(
+                update(Category)
+                .where(
+                    Category.id == counts.c.id,
+                    or_(
+                        Category.direct_count != counts.c.direct_count,
+                        Category.subtree_count != counts.c.subtree_count,
+                    ),
+                )
+                .values(direct_count=counts.c.direct_count, subtree_count=counts.c.subtree_count)
+                .returning(Category.id)
+                .execution_options(synchronize_session=False)
+            )
+            return list(result.scalars().all())
+
+    async def move_subtree(self, category_id: int, parent_id: Optional[int], level: int) -> List[int]:
+        """
+        Переместить категорию с потомками к новому родителю одним запросом
+        
+        Родитель меняется у корня поддерева, уровни всего поддерева
+        пересчитываются рекурсивным CTE в том же UPDATE
+        
+        Args:
+            category_id: ID перемещаемой категории
+            parent_id: ID нового родителя (None - корневая категория)
+            level: Новый уровень перемещаемой категории
+            
+        Returns:
+            ID категорий поддерева
+        """
+        subtree = self._subtree(category_id, level)
+        async with self.transaction():
+            result = await self.session.execute(
+                update(Category)
+                .where(Category.id == subtree.c.id)
+                .values(
+                    level=subtree.c.level,
+                    parent_id=case((Category.id == category_id, parent_id), else_=Category.parent_id),
+                )
+                .returning(Category.id)
+                .execution_options(synchronize_session=False)
+            )
+            return list(result.scalars().all())
+
+    async def delete_many(self, category_ids: List[int]) -> int:
+        """
+        Удалить категории одним запросом
+        
+        Args:
+            category_ids: ID категорий (вместе с потомками: внешние ключи проверяются в конце запроса)
+            
+        Returns:
+            Количество удаленных категорий
+        """
+        if not category_ids:
+            return 0
+
+        async with self.transaction():
+            result = await self.session.execute(
+                delete(Category)
+                .where(Category.id == any_(bindparam("ids", category_ids, type_=ARRAY(Integer))))
+                .execution_options(synchronize_session=False)
+            )
+            return result.rowcount
+
     async def get_all(self, skip: int = 0, limit: int = 100) -> List[Category]:
         """
         Получить список всех категорий
@@ -59,11 +307,30 @@ class CategoryRepository(BaseRepository):
         Returns:
             Список категорий
         """
-        result = await self.session.execute(
+        result = await self.execute_read(
             select(Category).offset(skip).limit(limit)
         )
         return list(result.scalars().all())
 
+    async def get_tree(self) -> List[Row]:
+        """
+        Получить все категории для построения дерева одним запросом
+        
+        Returns:
+            Категории (id, name, parent_id, level, direct_count, subtree_count) в порядке ID
+        """
+        result = await self.execute_read(
+            select(
+                Category.id,
+                Category.name,
+                Category.parent_id,
+                Category.level,
+                Category.direct_count,
+                Category.subtree_count,
+            ).order_by(Category.id)
+        )
+        return list(result.all())
+
     async def create(self, category: Category) -> Category:
         """
         Создать новую категорию
@@ -1,10 +1,17 @@
-from typing import Optional, List
+from datetime import datetime
+from typing import Any, AsyncIterator, Optional, List, Dict, Set, Tuple
 
-from sqlalchemy import select
-from sqlalchemy.orm import selectinload
+from sqlalchemy import (
+    select, insert, update, delete, values, column, func, cast, and_, or_, true, tuple_, any_, bindparam, Integer, Row, String
+)
+from sqlalchemy.dialects.postgresql import ARRAY, REGCONFIG, array
+from sqlalchemy.orm import aliased, selectinload
 
+from src.database.db_dependency import REPLICA_OPTION
 from src.repositories.base_repository import BaseRepository
-from src.models import Product, Category
+from src.models import Product
+from src.models.products import SEARCH_CONFIG
+from src.schemas import ProductFilterDTO
 
 
 class ProductRepository(BaseRepository):
@@ -12,25 +19,32 @@ class ProductRepository(BaseRepository):
     Репозиторий для работы с товарами
     """
     
-    async def get_by_id(self, product_id: int) -> Optional[Product]:
+    async def get_by_id(self, product_id: int, for_update: bool = False) -> Optional[Product]:
         """
         Получить товар по ID
         
         Args:
             product_id: ID товара
+            for_update: Заблокировать строку товара до конца текущей транзакции (SELECT ... FOR UPDATE)
+                и перечитать значения, даже если товар уже загружен в сессии
             
         Returns:
             Product или None, если товар не найден
         """
-        result = await self.session.execute(
-            select(Product).where(Product.id == product_id)
-        )
+        statement = select(Product).where(Product.id == product_id)
+        if for_update:
+            statement = statement.with_for_update().execution_options(populate_existing=True)
+        result = await self.session.execute(statement)
         return result.scalar_one_or_none()
 
     async def get_by_id_with_category(self, product_id: int) -> Optional[Product]:
         """
         Получить товар по ID с загруженной категорией
         
+        Читает основную БД: результат кэшируется после изменения товара
+        (кэш уже инвалидирован), и отстающая реплика положила бы в кэш
+        прежние значения на все время жизни записи
+        
         Args:
             product_id: ID товара
             
@@ -42,44 +56,306 @@ class ProductRepository(BaseRepository):
             .where(Product.id == product_id)
             .options(selectinload(Product.category))
         )
-        return result.scalar_one_or_none()
+        product = result.scalar_one_or_none()
+        await self.release_connection()
+        return product
 
-    async def get_all(self, skip: int = 0, limit: int = 100) -> List[Product]:
+    async def get_all(
+        self,
+        skip: int = 0,
+        limit: int = 100,
+        filters: ProductFilterDTO = ProductFilterDTO(),
+        after: Optional[Tuple[Any, ...]] = None
+    ) -> List[Product]:
         """
         Получить список всех товаров
         
         Args:
-            skip: Количество записей для пропуска
+            skip: Количество записей для пропуска (не применяется вместе с after)
             limit: Максимальное количество записей
+            filters: Фильтры и сортировка
+            after: Ключ сортировки последнего товара предыдущей страницы (keyset пагинация)
             
         Returns:
             Список товаров
         """
-        result = await self.session.execute(
-            select(Product).offset(skip).limit(limit)
-        )
-        return list(result.scalars().all())
+        return await self._get_page(None, skip, limit, filters, after)
 
-    async def get_by_category_id(self, category_id: int, skip: int = 0, limit: int = 100) -> List[Product]:
+    async def get_by_category_id(
+        self,
+        category_id: int,
+        skip: int = 0,
+        limit: int = 100,
+        filters: ProductFilterDTO = ProductFilterDTO(),
+        after: Optional[Tuple[Any, ...]] = None
+    ) -> List[Product]:
         """
         Получить товары по категории
         
         Args:
             category_id: ID категории
-            skip: Количество записей для пропуска
+            skip: Количество записей для пропуска (не применяется вместе с after)
             limit: Максимальное количество записей
+            filters: Фильтры и сортировка
+            after: Ключ сортировки последнего товара предыдущей страницы (keyset пагинация)
             
         Returns:
             Список товаров в категории
         """
-        result = await self.session.execute(
+        return await self._get_page(category_id, skip, limit, filters, after)
+
+    @staticmethod
+    def sort_key(sort: str) -> Tuple[list, bool]:
+        """
+        Ключ сортировки списка товаров
+
+        Ключ всегда заканчивается ID, поэтому однозначно задает позицию товара
+        и совпадает с индексами (price, id), (name, id) и (category_id, ..., id)
+
+        Args:
+            sort: Сортировка из ProductFilterDTO
+
+        Returns:
+            Колонки ключа и признак сортировки по убыванию
+        """
+        field = sort.lstrip("-")
+        columns = [Product.id] if field == "id" else [getattr(Product, field), Product.id]
+        return columns, sort.startswith("-")
+
+    @staticmethod
+    def _filter_conditions(category_id: Optional[int], filters: ProductFilterDTO, with_price: bool = True) -> list:
+        conditions = []
+        if category_id is not None:
+            conditions.append(Product.category_id == category_id)
+        if filters.in_stock:
+            conditions.append(Product.storage_quantity > 0)
+        if with_price:
+            conditions.extend(ProductRepository._price_conditions(filters))
+        return conditions
+
+    @staticmethod
+    def _price_conditions(filters: ProductFilterDTO) -> list:
+        conditions = []
+        if filters.min_price is not None:
+            conditions.append(Product.price >= filters.min_price)
+        if filters.max_price is not None:
+            conditions.append(Product.price <= filters.max_price)
+        return conditions
+
+    async def _get_page(
+        self,
+        category_id: Optional[int],
+        skip: int,
+        limit: int,
+        filters: ProductFilterDTO,
+        after: Optional[Tuple[Any, ...]]
+    ) -> List[Product]:
+        columns, descending = self.sort_key(filters.sort)
+        statement = (
             select(Product)
-            .where(Product.category_id == category_id)
-            .offset(skip)
+            .where(*self._filter_conditions(category_id, filters))
+            .order_by(*(column.desc() if descending else column for column in columns))
             .limit(limit)
         )
+        if after is not None:
+            # Курсор уже пропускает строки до себя: OFFSET с ним терял бы товары
+            key, position = tuple_(*columns), tuple_(*after)
+            statement = statement.where(key < position if descending else key > position)
+        else:
+            statement = statement.offset(skip)
+
+        result = await self.execute_read(statement)
         return list(result.scalars().all())
 
+    async def stream_export(
+        self,
+        category_ids: Optional[List[int]] = None,
+        updated_since: Optional[datetime] = None,
+        batch_size: int = 1000
+    ) -> AsyncIterator[List[Row]]:
+        """
+        Прочитать товары для выгрузки через серверный курсор
+        
+        Строки читаются из курсора пачками по batch_size (yield_per), поэтому
+        память не зависит от количества товаров. Запрос может быть направлен
+        на реплику. Сессия держит соединение, пока выгрузка не дочитана
+        
+        Args:
+            category_ids: ID категорий (None - все товары)
+            updated_since: Только товары, измененные начиная с этого времени
+            batch_size: Количество строк, читаемых из курсора за раз
+            
+        Returns:
+            Асинхронный итератор пачек строк (id, name, storage_quantity, price, category_id, updated_at)
+            в порядке ID
+        """
+        statement = (
+            select(
+                Product.id,
+                Product.name,
+                Product.storage_quantity,
+                Product.price,
+                Product.category_id,
+                Product.updated_at,
+            )
+            .order_by(Product.id)
+            .execution_options(yield_per=batch_size)
+        )
+        if category_ids is not None:
+            statement = statement.where(
+                Product.category_id == any_(bindparam("category_ids", category_ids, type_=ARRAY(Integer)))
+            )
+        if updated_since is not None:
+            statement = statement.where(Product.updated_at >= updated_since)
+
+        self.session.info[REPLICA_OPTION] = True
+        try:
+            result = await self.session.stream(statement)
+        finally:
+            self.session.info[REPLICA_OPTION] = False
+        async for rows in result.partitions():
+            yield rows
+
+    async def get_facets(
+        self,
+        category_id: Optional[int],
+        filters: ProductFilterDTO,
+        price_buckets: List[int]
+    ) -> Tuple[Dict[int, int], Dict[int, int]]:
+        """
+        Посчитать товары по категориям и диапазонам цен одним запросом (GROUPING SETS)
+
+        Количество по категориям учитывает все фильтры. Количество по диапазонам
+        цен не учитывает фильтр по цене, чтобы показать, сколько товаров
+        в каждом диапазоне при остальных фильтрах
+
+        Args:
+            category_id: ID категории (None - все товары)
+            filters: Фильтры (сортировка не используется)
+            price_buckets: Границы диапазонов цен по возрастанию
+
+        Returns:
+            Словари {ID категории: количество} и {номер диапазона: количество};
+            номер диапазона - результат width_bucket (0 - цена меньше первой границы)
+        """
+        price_conditions = self._price_conditions(filters)
+        rows = (
+            select(
+                Product.category_id,
+                func.width_bucket(Product.price, array(price_buckets)).label("bucket"),
+                (and_(*price_conditions) if price_conditions else true()).label("price_match"),
+            )
+            .where(*self._filter_conditions(category_id, filters, with_price=False))
+            .subquery()
+        )
+        statement = (
+            select(
+                rows.c.category_id,
+                rows.c.bucket,
+                func.grouping(rows.c.category_id).label("by_bucket"),
+                func.count().filter(rows.c.price_match).label("filtered"),
+                func.count().label("total"),
+            )
+            .group_by(func.grouping_sets(tuple_(rows.c.category_id), tuple_(rows.c.bucket)))
+        )
+
+        categories: Dict[int, int] = {}
+        buckets: Dict[int, int] = {}
+        result = await self.execute_read(statement)
+        for row in result.all():
+            if row.by_bucket:
+                buckets[row.bucket] = row.total
+            elif row.filtered:
+                categories[row.category_id] = row.filtered
+        return categories, buckets
+
+    async def search(
+        self,
+        query: str,
+        category_id: Optional[int] = None,
+        limit: int = 20,
+        after: Optional[Tuple[float, int]] = None
+    ) -> List[Tuple[Product, float]]:
+        """
+        Поиск товаров по названию с ранжированием
+        
+        Совпадение - полнотекстовое (ix_products_search_vector), нечеткое по триграммам
+        с каким-либо словом названия или по началу названия (ix_products_name_trgm).
+        Ранг - сумма ts_rank и триграммного сходства со словами названия.
+        Сортировка по рангу по убыванию, затем по ID
+        
+        Args:
+            query: Поисковый запрос
+            category_id: ID категории для фильтрации (необязательно)
+            limit: Максимальное количество записей
+            after: Ранг и ID последнего товара предыдущей страницы (keyset пагинация)
+            
+        Returns:
+            Список пар (товар, ранг)
+        """
+        ts_query = func.websearch_to_tsquery(cast(SEARCH_CONFIG, REGCONFIG), query)
+        rank = func.ts_rank(Product.search_vector, ts_query, 32) + func.word_similarity(query, Product.name)
+        prefix = query.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_") + "%"
+
+        statement = (
+            select(Product, rank.label("rank"))
+            .where(or_(
+                Product.search_vector.op("@@")(ts_query),
+                Product.name.op("%>")(query),
+                Product.name.ilike(prefix, escape="\\"),
+            ))
+            .order_by(rank.desc(), Product.id)
+            .limit(limit)
+        )
+        if category_id is not None:
+            statement = statement.where(Product.category_id == category_id)
+        if after is not None:
+            after_rank, after_id = after
+            statement = statement.where(or_(
+                rank < after_rank,
+                and_(rank == after_rank, Product.id > after_id),
+            ))
+
+        result = await self.execute_read(statement)
+        return [(product, product_rank) for product, product_rank in result.all()]
+
+    async def get_names(self, ids: Optional[List[int]] = None) -> List[Tuple[int, str]]:
+        """
+        Получить названия товаров
+
+        Читает основную БД: вызывается сразу после изменения товаров
+
+        Args:
+            ids: ID товаров (None - все товары)
+
+        Returns:
+            Список пар (ID товара, название)
+        """
+        statement = select(Product.id, Product.name)
+        if ids is not None:
+            # Один параметр-массив: список ID после импорта может быть больше лимита параметров запроса
+            statement = statement.where(Product.id == any_(bindparam("ids", ids, type_=ARRAY(Integer))))
+        result = await self.session.execute(statement)
+        return [(product_id, name) for product_id, name in result.all()]
+
+    async def get_existing_ids(self, ids: List[int]) -> Set[int]:
+        """
+        Получить ID существующих товаров из заданных одним запросом
+        
+        Args:
+            ids: ID товаров для проверки
+            
+        Returns:
+            ID товаров, которые есть в БД
+        """
+        if not ids:
+            return set()
+
+        result = await self.session.execute(
+            select(Product.id).where(Product.id == any_(bindparam("ids", ids, type_=ARRAY(Integer))))
+        )
+        return set(result.scalars().all())
+
     async def create(self, product: Product) -> Product:
         """
         Создать новый товар
@@ -92,3 +368,226 @@ class ProductRepository(BaseRepository):
         """
         return (await self.save_all([product]))[0]
 
+    async def create_many(self, rows: List[Dict[str, Any]]) -> List[Row]:
+        """
+        Создать несколько товаров одним запросом INSERT ... SELECT FROM unnest(...)
+        
+        Значения колонок передаются четырьмя параметрами-массивами: запрос
+        не зависит от количества товаров, ORM объекты не создаются
+        
+        Args:
+            rows: Значения колонок товаров (name, storage_quantity, price, category_id)
+            
+        Returns:
+            Созданные товары (id, name, storage_quantity, price, category_id)
+        """
+        if not rows:
+            return []
+
+        columns = {
+            "name": ARRAY(String),
+            "storage_quantity": ARRAY(Integer),
+            "price": ARRAY(Integer),
+            "category_id": ARRAY(Integer),
+        }
+        source = func.unnest(*(
+            bindparam(name, [row[name] for row in rows], type_=array_type)
+            for name, array_type in columns.items()
+        )).table_valued(*columns).render_derived(name="source")
+
+        async with self.transaction():
+            result = await self.session.execute(
+                insert(Product)
+                .from_select(list(columns), select(*(source.c[name] for name in columns)))
+                .returning(Product.id, Product.name, Product.storage_quantity, Product.price, Product.category_id)
+            )
+            return list(result.all())
+
+    async def update(self, product: Product, changes: Dict[str, Any]) -> Product:
+        """
+        Изменить поля товара
+        
+        Args:
+            product: Товар, загруженный в текущей сессии
+            changes: Новые значения полей {имя атрибута: значение}
+            
+        Returns:
+            Измененный товар (updated_at обновлен)
+        """
+        async with self.transaction():
+            for name, value in changes.items():
+                setattr(product, name, value)
+            await self.session.flush()
+        return product
+
+    async def bulk_update(self, changes: List[Tuple[int, Optional[int], Optional[int]]]) -> List[Row]:
+        """
+        Изменить цены и остатки нескольких товаров одним запросом
+        UPDATE ... FROM unnest(...) RETURNING
+        
+        Изменения передаются тремя параметрами-массивами: запрос не зависит
+        от количества товаров и от того, какие значения не меняются (NULL).
+        Товары, цена и остаток которых уже равны новым, не перезаписываются:
+        не создаются новые версии строк и записи индексов, updated_at не меняется.
+        Прежние остатки читаются в том же запросе с блокировкой строк (FOR UPDATE),
+        поэтому изменение остатка считается от значения, которое было перезаписано
+        
+        Args:
+            changes: Тройки (ID товара, новая цена, новый остаток); None - значение не меняется
+            
+        Returns:
+            Измененные товары (id, name, price, storage_quantity, quantity_delta - изменение остатка);
+            ID, которых нет в БД, и товары без изменений пропускаются
+        """
+        if not changes:
+            return []
+
+        ids, prices, quantities = zip(*changes)
+        source = func.unnest(
+            bindparam("ids", list(ids), type_=ARRAY(Integer)),
+            bindparam("prices", list(prices), type_=ARRAY(Integer)),
+            bindparam("quantities", list(quantities), type_=ARRAY(Integer)),
+        ).table_valued("id", "price", "quantity").render_derived(name="source")
+        current = aliased(Product, name="current")
+        locked = (
+            select(source.c.id, source.c.price, source.c.quantity, current.storage_quantity.label("old_quantity"))
+            .join_from(source, current, current.id == source.c.id)
+            .with_for_update(of=current)
+            .subquery("changes")
+        )
+
+        new_price = func.coalesce(locked.c.price, Product.price)
+        new_quantity = func.coalesce(locked.c.quantity, Product.storage_quantity)
+
+        async with self.transaction():
+            result = await self.session.execute(
+                update(Product)
+                .where(
+                    Product.id == locked.c.id,
+                    or_(new_price != Product.price, new_quantity != Product.storage_quantity),
+                )
+                .values(
+                    price=new_price,
+                    storage_quantity=new_quantity,
+                )
+                .returning(
+                    Product.id,
+                    Product.name,
+                    Product.price,
+                    Product.storage_quantity,
+                    (Product.storage_quantity - locked.c.old_quantity).label("quantity_delta"),
+                )
+                .execution_options(synchronize_session=False)
+            )
+            return list(result.all())
+
+    async def move_to_category(self, category_ids: List[int], target_id: int) -> List[int]:
+        """
+        Перенести все товары категорий в другую категорию одним запросом
+        
+        Args:
+            category_ids: ID категорий, товары которых переносятся
+            target_id: ID категории назначения
+            
+        Returns:
+            ID перенесенных товаров
+        """
+        if not category_ids:
+            return []
+
+        async with self.transaction():
+            result = await self.session.execute(
+                update(Product)
+                .where(Product.category_id == any_(bindparam("category_ids", category_ids, type_=ARRAY(Integer))))
+                .values(category_id=target_id)
+                .returning(Product.id)
+                .execution_options(synchronize_session=False)
+            )
+            return list(result.scalars().all())
+
+    async def delete_by_category_ids(self, category_ids: List[int]) -> List[int]:
+        """
+        Удалить все товары категорий одним запросом
+        
+        Args:
+            category_ids: ID категорий
+            
+        Returns:
+            ID удаленных товаров
+        """
+        if not category_ids:
+            return []
+
+        async with self.transaction():
+            result = await self.session.execute(
+                delete(Product)
+                .where(Product.category_id == any_(bindparam("category_ids", category_ids, type_=ARRAY(Integer))))
+                .returning(Product.id)
+                .execution_options(synchronize_session=False)
+            )
+            return list(result.scalars().all())
+
+    async def exists_in_categories(self, category_ids: List[int]) -> bool:
+        """
+        Проверить, есть ли товары в категориях (основная БД)
+        
+        Args:
+            category_ids: ID категорий
+            
+        Returns:
+            True, если хотя бы в одной категории есть товар
+        """
+        if not category_ids:
+            return False
+
+        result = await self.session.execute(
+            select(
+                select(Product.id)
+                .where(Product.category_id == any_(bindparam("category_ids", category_ids, type_=ARRAY(Integer))))
+                .exists()
+            )
+        )
+        return result.scalar()
+
+    async def apply_stock_deltas(self, deltas: Dict[int, int]) -> Tuple[int, List[int]]:
+        """
+        Применить изменения остатков к нескольким товарам одним запросом
+        UPDATE ... FROM (VALUES ...)
+
+        Остаток не опускается ниже нуля. Строки товаров блокируются в подзапросе
+        (FOR UPDATE), прежний остаток читается там же: по нему видно, какие
+        остатки были обрезаны до нуля
+
+        Args:
+            deltas: Словарь {ID товара: изменение остатка}
+
+        Returns:
+            Количество обновленных товаров и ID товаров, остаток которых ушел бы
+            ниже нуля и был обнулен (продано больше, чем было, или остатки сервисов разошлись)
+        """
+        if not deltas:
+            return 0, []
+
+        changes = values(
+            column("id", Integer),
+            column("delta", Integer),
+            name="source"
+        ).data(list(deltas.items()))
+        current = aliased(Product, name="current")
+        locked = (
+            select(changes.c.id, changes.c.delta, current.storage_quantity.label("old_quantity"))
+            .join_from(changes, current, current.id == changes.c.id)
+            .with_for_update(of=current)
+            .subquery("changes")
+        )
+
+        async with self.transaction():
+            result = await self.session.execute(
+                update(Product)
+                .where(Product.id == locked.c.id)
+                .values(storage_quantity=func.greatest(Product.storage_quantity + locked.c.delta, 0))
+                .returning(Product.id, (locked.c.old_quantity + locked.c.delta < 0).label("clamped"))
+                .execution_options(synchronize_session=False)
+            )
+            rows = result.all()
+        return len(rows), [row.id for row in rows if row.clamped]
@@ -0,0 +1,80 @@
+from typing import Dict, Iterable
+
+from sqlalchemy import select
+from sqlalchemy.dialects.postgresql import insert
+
+from src.repositories.base_repository import BaseRepository
+from src.database.db_dependency import READ_SNAPSHOT, REPLICA_OPTION
+from src.models import TableVersion
+
+
+class TableVersionRepository(BaseRepository):
+    """
+    Репозиторий для работы с версиями данных таблиц
+    """
+
+    async def get_all(self) -> Dict[str, int]:
+        """
+        Получить версии всех таблиц
+
+        Читает основную БД: процессу нужны последние версии, а реплика может отставать
+
+        Returns:
+            Словарь {имя таблицы: версия}
+        """
+        result = await self.session.execute(
+            select(TableVersion.table_name, TableVersion.version)
+        )
+        versions = dict(result.all())
+        await self.release_connection()
+        return versions
+
+    async def begin_read_snapshot(self, tables: Iterable[str]) -> Dict[str, int]:
+        """
+        Начать транзакцию чтения с одним снимком данных и прочитать в ней версии таблиц
+
+        Транзакция REPEATABLE READ открывается на реплике (если она настроена)
+        и остается открытой до конца сессии: последующие execute_read читают
+        тот же снимок, поэтому данные ответа соответствуют прочитанным версиям
+
+        Args:
+            tables: Имена таблиц
+
+        Returns:
+            Словарь {имя таблицы: версия}; таблиц, которые еще не изменялись, в нем нет
+        """
+        self.session.info[REPLICA_OPTION] = True
+        try:
+            await self.session.connection(execution_options={"isolation_level": "REPEATABLE READ"})
+            result = await self.session.execute(
+                select(TableVersion.table_name, TableVersion.version)
+                .where(TableVersion.table_name.in_(list(tables)))
+            )
+        finally:
+            self.session.info[REPLICA_OPTION] = False
+        self.session.info[READ_SNAPSHOT] = True
+        return dict(result.all())
+
+    async def bump(self, table_name: str) -> int:
+        """
+        Увеличить версию таблицы в текущей транзакции
+
+        Строка версии блокируется до конца транзакции, поэтому версии
+        выдаются в порядке фиксации изменений
+
+        Args:
+            table_name: Имя таблицы
+
+        Returns:
+            Новая версия таблицы
+        """
+        result = await self.session.execute(
+            insert(TableVersion)
+            .values(table_name=table_name, version=1)
+            .on_conflict_do_update(
+                index_elements=[TableVersion.table_name],
+                set_={"version": TableVersion.version + 1}
+            )
+            .returning(TableVersion.version)
+        )
+        return result.scalar_one()
@@ -1,6 +1,44 @@
 from src.schemas.user import UserBase, UserAll
-from src.schemas.product import ProductAddDTO
-from src.schemas.category import CategoryAddDTO
+from src.schemas.product import (
+    ProductAddDTO,
+    ProductEventDTO,
+    ProductsCreatedDTO,
+    ProductUpdateDTO,
+    ProductBulkUpdateItemDTO,
+    ProductBulkUpdateDTO,
+    ProductChangeDTO,
+    ProductsUpdatedDTO,
+    ProductsDeletedDTO,
+    ProductBulkUpdateResponse,
+    ProductImportErrorDTO,
+    ProductImportResponse,
+    ProductDTO,
+    ProductWithCategoryDTO,
+    ProductSort,
+    ProductFilterDTO,
+    CategoryFacetDTO,
+    PriceBucketFacetDTO,
+    ProductFacetsDTO,
+    ProductResponse,
+    ProductListResponse,
+    ProductDetailResponse,
+    ProductSearchResponse,
+    ProductSuggestionDTO,
+    ProductSuggestResponse,
+)
+from src.schemas.category import (
+    CategoryAddDTO,
+    CategoryMoveDTO,
+    CategoryDTO,
+    CategoryWithCountsDTO,
+    CategoryTreeDTO,
+    CategoryResponse,
+    CategoryListResponse,
+    CategoryTreeResponse,
+    CategoryDeleteResponse,
+)
+from src.schemas.stock import StockDeltaDTO, StockChangedDTO
+from src.schemas.table_version import TableVersionDTO
 
 __all__ = [
     # user
@@ -9,7 +47,46 @@ __all__ = [
     
     # product
     "ProductAddDTO",
+    "ProductEventDTO",
+    "ProductsCreatedDTO",
+    "ProductUpdateDTO",
+    "ProductBulkUpdateItemDTO",
+    "ProductBulkUpdateDTO",
+    "ProductChangeDTO",
+    "ProductsUpdatedDTO",
+    "ProductsDeletedDTO",
+    "ProductBulkUpdateResponse",
+    "ProductImportErrorDTO",
+    "ProductImportResponse",
+    "ProductDTO",
+    "ProductWithCategoryDTO",
+    "ProductSort",
+    "ProductFilterDTO",
+    "CategoryFacetDTO",
+    "PriceBucketFacetDTO",
+    "ProductFacetsDTO",
+    "ProductResponse",
+    "ProductListResponse",
+    "ProductDetailResponse",
+    "ProductSearchResponse",
+    "ProductSuggestionDTO",
+    "ProductSuggestResponse",
     
     # category
     "CategoryAddDTO",
+    "CategoryMoveDTO",
+    "CategoryDTO",
+    "CategoryWithCountsDTO",
+    "CategoryTreeDTO",
+    "CategoryResponse",
+    "CategoryListResponse",
+    "CategoryTreeResponse",
+    "CategoryDeleteResponse",
+
+    # stock
+    "StockDeltaDTO",
+    "StockChangedDTO",
+
+    # table version
+    "TableVersionDTO",
 ]
@@ -1,9 +1,9 @@
 """
 Схемы для категорий
 """
-from typing import Optional
+from typing import List, Optional
 
-from pydantic import BaseModel
+from pydantic import BaseModel, ConfigDict
 
 
 class CategoryAddDTO(BaseModel):
@@ -11,3 +11,59 @@ class CategoryAddDTO(BaseModel):
     name: str
     parent_id: Optional[int] = None
 
+
+class CategoryMoveDTO(BaseModel):
+    """Схема для перемещения категории"""
+    parent_id: Optional[int] = None  # 0 или None - корневая категория
+
+
+class CategoryDTO(BaseModel):
+    """Схема категории в ответах API"""
+    model_config = ConfigDict(from_attributes=True)
+
+    id: int
+    name: str
+    parent_id: Optional[int] = None
+    level: int
+
+
+class CategoryWithCountsDTO(CategoryDTO):
+    """Схема категории с количеством товаров (в категории и вместе с подкатегориями)"""
+    direct_count: int
+    subtree_count: int
+
+
+class CategoryTreeDTO(BaseModel):
+    """Узел дерева категорий"""
+    id: int
+    name: str
+    level: int
+    direct_count: int
+    subtree_count: int
+    children: List["CategoryTreeDTO"] = []
+
+
+class CategoryResponse(BaseModel):
+    """Ответ с одной категорией"""
+    Message: str = "Ok"
+    Category: CategoryDTO
+
+
+class CategoryListResponse(BaseModel):
+    """Ответ со списком категорий"""
+    Message: str = "Ok"
+    Categories: List[CategoryWithCountsDTO]
+
+
+class CategoryTreeResponse(BaseModel):
+    """Ответ с деревом категорий"""
+    Message: str = "Ok"
+    Categories: List[CategoryTreeDTO]
+
+
+class CategoryDeleteResponse(BaseModel):
+    """Ответ с результатом удаления категории с подкатегориями"""
+    Message: str = "Ok"
+    Deleted: int
+    ProductsMoved: int
+    ProductsDeleted: int
@@ -1,13 +1,183 @@
 """
 Схемы для товаров
 """
-from pydantic import BaseModel
+from datetime import datetime
+from typing import List, Literal, Optional
+
+from pydantic import BaseModel, ConfigDict, Field, model_validator
+
+from src.schemas.category import CategoryDTO
 
 
 class ProductAddDTO(BaseModel):
     """Схема для создания товара"""
+    name: str = Field(min_length=1)
+    quantity: int = Field(ge=0)
+    price: int = Field(ge=0)
+    category_id: int
+
+
+class ProductEventDTO(ProductAddDTO):
+    """Схема события о товаре для других сервисов"""
+    id: int
+
+
+class ProductsCreatedDTO(BaseModel):
+    """Событие products.created: пакет созданных товаров (импорт)"""
+    items: List[ProductEventDTO]
+
+
+class ProductUpdateDTO(BaseModel):
+    """Схема для изменения товара (передаются только изменяемые поля)"""
+    name: Optional[str] = Field(None, min_length=1)
+    quantity: Optional[int] = Field(None, ge=0)
+    price: Optional[int] = Field(None, ge=0)
+    category_id: Optional[int] = None
+
+
+class ProductBulkUpdateItemDTO(BaseModel):
+    """Новая цена и/или остаток одного товара"""
+    id: int
+    price: Optional[int] = Field(None, ge=0)
+    quantity: Optional[int] = Field(None, ge=0)
+
+    @model_validator(mode="after")
+    def check_has_changes(self):
+        if self.price is None and self.quantity is None:
+            raise ValueError("price or quantity is required")
+        return self
+
+
+class ProductBulkUpdateDTO(BaseModel):
+    """Схема для массового изменения цен и остатков"""
+    items: List[ProductBulkUpdateItemDTO] = Field(min_length=1)
+
+
+class ProductChangeDTO(BaseModel):
+    """Изменение товара в событии products.updated (None - поле не изменилось)"""
+    id: int
+    name: Optional[str] = None
+    price: Optional[int] = None
+    # Остаток передается изменением: order_service прибавляет его к своему остатку,
+    # в котором могут быть списания, еще не дошедшие до каталога (stock.changed)
+    quantity_delta: Optional[int] = None
+
+
+class ProductsUpdatedDTO(BaseModel):
+    """Событие products.updated: новые значения измененных полей товаров и изменения остатков"""
+    items: List[ProductChangeDTO]
+
+
+class ProductsDeletedDTO(BaseModel):
+    """Событие products.deleted: ID удаленных товаров"""
+    ids: List[int]
+
+
+class ProductBulkUpdateResponse(BaseModel):
+    """Ответ с результатом массового изменения товаров"""
+    Message: str = "Ok"
+    Updated: int
+    NotFound: List[int]  # не больше PRODUCT_BULK_UPDATE_MAX_NOT_FOUND
+
+
+class ProductImportErrorDTO(BaseModel):
+    """Ошибка строки импорта"""
+    line: int
+    error: str
+
+
+class ProductImportResponse(BaseModel):
+    """Ответ с результатом импорта товаров"""
+    Message: str = "Ok"
+    Imported: int
+    Failed: int
+    Errors: List[ProductImportErrorDTO]  # не больше PRODUCT_IMPORT_MAX_ERRORS
+
+
+class ProductDTO(BaseModel):
+    """Схема товара в ответах API"""
+    model_config = ConfigDict(from_attributes=True)
+
+    id: int
     name: str
-    quantity: int
+    storage_quantity: int
     price: int
     category_id: int
+    updated_at: datetime
+
+
+class ProductWithCategoryDTO(ProductDTO):
+    """Схема товара с категорией"""
+    category: CategoryDTO
+
+
+class ProductResponse(BaseModel):
+    """Ответ с одним товаром"""
+    Message: str = "Ok"
+    Product: ProductDTO
+
+
+# Сортировка списка товаров: "-" - по убыванию
+ProductSort = Literal["id", "price", "-price", "name", "-name"]
+
+
+class ProductFilterDTO(BaseModel):
+    """Фильтры и сортировка списка товаров (параметры запроса)"""
+    model_config = ConfigDict(frozen=True)
+
+    min_price: Optional[int] = Field(None, ge=0)
+    max_price: Optional[int] = Field(None, ge=0)
+    in_stock: bool = False  # только товары с storage_quantity > 0
+    sort: ProductSort = "id"
+
+
+class CategoryFacetDTO(BaseModel):
+    """Количество товаров категории"""
+    category_id: int
+    count: int
+
+
+class PriceBucketFacetDTO(BaseModel):
+    """Количество товаров в диапазоне цен [min_price, max_price)"""
+    min_price: int
+    max_price: Optional[int] = None  # None - без верхней границы
+    count: int
+
+
+class ProductFacetsDTO(BaseModel):
+    """Количество товаров по категориям и диапазонам цен"""
+    categories: List[CategoryFacetDTO]
+    price_buckets: List[PriceBucketFacetDTO]
+
+
+class ProductListResponse(BaseModel):
+    """Ответ со списком товаров"""
+    Message: str = "Ok"
+    Products: List[ProductDTO]
+    NextCursor: Optional[str] = None  # None - страница последняя
+    Facets: Optional[ProductFacetsDTO] = None  # только на первой странице
+
+
+class ProductDetailResponse(BaseModel):
+    """Ответ с товаром и его категорией"""
+    Message: str = "Ok"
+    Product: ProductWithCategoryDTO
+
+
+class ProductSearchResponse(BaseModel):
+    """Ответ со страницей результатов поиска товаров"""
+    Message: str = "Ok"
+    Products: List[ProductDTO]
+    NextCursor: Optional[str] = None  # None - страница последняя
+
+
+class ProductSuggestionDTO(BaseModel):
+    """Схема подсказки названия товара"""
+    id: int
+    name: str
+
 
+class ProductSuggestResponse(BaseModel):
+    """Ответ с подсказками названий товаров"""
+    Message: str = "Ok"
+    Suggestions: List[ProductSuggestionDTO]
@@ -0,0 +1,17 @@
+"""
+Схемы для событий об изменении остатков (из order_service)
+"""
+from typing import List
+
+from pydantic import BaseModel
+
+
+class StockDeltaDTO(BaseModel):
+    """Изменение остатка одного товара"""
+    product_id: int
+    delta: int
+
+
+class StockChangedDTO(BaseModel):
+    """Событие stock.changed: накопленные изменения остатков по товарам"""
+    items: List[StockDeltaDTO]
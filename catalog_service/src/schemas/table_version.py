@@ -0,0 +1,14 @@
+"""
+Схемы для версий данных таблиц
+"""
+from typing import List, Optional
+
+from pydantic import BaseModel
+
+
+class TableVersionDTO(BaseModel):
+    """Событие об изменении версии таблицы для остальных процессов сервиса"""
+    table: str
+    version: int
+    ids: Optional[List[int]] = None  # ID измененных строк, None - могли измениться любые строки
+    columns: Optional[List[str]] = None  # Измененные колонки, None - могли измениться любые колонки
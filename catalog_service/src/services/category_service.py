@@ -1,9 +1,11 @@
-from typing import List, Optional
+from typing import List, Optional, Tuple
 
-from src.repositories import CategoryRepository
-from src.models import Category
-from src.schemas import CategoryAddDTO
-from src.exceptions import NotFoundError
+from src.repositories import CategoryRepository, ProductRepository, TableVersionRepository
+from src.models import Category, Product
+from src.core.single_flight import single_flight
+from src.publisher import TableVersions
+from src.schemas import CategoryAddDTO, CategoryMoveDTO, CategoryTreeDTO
+from src.exceptions import NotFoundError, BusinessRuleError
 
 
 class CategoryService:
@@ -11,14 +13,21 @@ class CategoryService:
     Сервис для работы с категориями
     """
     
-    def __init__(self, category_repository: CategoryRepository):
+    def __init__(self, category_repository: CategoryRepository, product_repository: ProductRepository,
+                 table_version_repository: TableVersionRepository, table_versions: TableVersions):
         """
         Инициализация сервиса
         
         Args:
             category_repository: Репозиторий для работы с категориями
+            product_repository: Репозиторий для работы с товарами (перенос и удаление товаров категорий)
+            table_version_repository: Репозиторий версий данных таблиц
+            table_versions: Версии данных таблиц в памяти процесса (для ETag)
         """
         self.category_repo = category_repository
+        self.product_repo = product_repository
+        self.table_version_repo = table_version_repository
+        self.table_versions = table_versions
 
     async def create_category(self, data: CategoryAddDTO) -> Category:
         """
@@ -40,19 +49,173 @@ class CategoryService:
         if parent_id == 0 or not parent_id:
             parent_id = None
         
-        # Если есть родительская категория, вычисляем уровень
-        if parent_id:
-            parent_category = await self.category_repo.get_by_id(parent_id)
-            if not parent_category:
-                raise NotFoundError(f"Parent category with id {parent_id} not found")
-            level = parent_category.level + 1
+        async with self.category_repo.transaction():
+            # Уровень родителя не изменится до фиксации: перемещения дерева ждут блокировку
+            await self.category_repo.lock_tree()
+
+            # Если есть родительская категория, вычисляем уровень
+            if parent_id:
+                parent_category = await self.category_repo.get_by_id(parent_id)
+                if not parent_category:
+                    raise NotFoundError(f"Parent category with id {parent_id} not found")
+                level = parent_category.level + 1
+
+            category = Category(
+                name=data.name,
+                parent_id=parent_id,
+                level=level
+            )
+            category = await self.category_repo.create(category)
+            version = await self.table_version_repo.bump(Category.__tablename__)
+        await self.table_versions.publish(Category.__tablename__, version, [category.id])
+        return category
+
+    async def move_category(self, category_id: int, data: CategoryMoveDTO) -> Category:
+        """
+        Переместить категорию вместе с подкатегориями к другому родителю
         
-        category = Category(
-            name=data.name,
-            parent_id=parent_id,
-            level=level
-        )
-        return await self.category_repo.create(category)
+        Уровни всего поддерева пересчитываются одним запросом
+        
+        Args:
+            category_id: ID перемещаемой категории
+            data: Новый родитель (0 или None - корневая категория)
+            
+        Returns:
+            Перемещенная категория
+            
+        Raises:
+            NotFoundError: Если категория или новый родитель не найдены
+            BusinessRuleError: Если новый родитель - сама категория или ее потомок
+        """
+        parent_id = data.parent_id or None
+
+        async with self.category_repo.transaction():
+            await self.category_repo.lock_tree()
+            count = await self.category_repo.get_subtree_count(category_id)
+            if count is None:
+                raise NotFoundError(f"Category with id {category_id} not found")
+
+            level = 0
+            if parent_id:
+                # Путь от нового родителя до корня: его длина - уровень категории после перемещения
+                ancestors = await self.category_repo.get_ancestor_ids(parent_id)
+                if not ancestors:
+                    raise NotFoundError(f"Parent category with id {parent_id} not found")
+                if category_id in ancestors:
+                    raise BusinessRuleError("Category cannot be moved into itself or its subcategory")
+                level = len(ancestors)
+
+            # Товары поддерева вычитаются из счетчиков прежних предков и добавляются новым
+            await self.category_repo.add_product_counts({category_id: -count})
+            ids = await self.category_repo.move_subtree(category_id, parent_id, level)
+            await self.category_repo.add_product_counts({category_id: count})
+            version = await self.table_version_repo.bump(Category.__tablename__)
+        await self.table_versions.publish(Category.__tablename__, version, ids)
+        return await self.category_repo.get_by_id(category_id)
+
+    async def delete_category(
+        self,
+        category_id: int,
+        move_products_to: Optional[int] = None,
+        cascade: bool = False
+    ) -> Tuple[List[int], List[int], List[int]]:
+        """
+        Удалить категорию вместе с подкатегориями
+        
+        Товары поддерева переносятся в другую категорию или удаляются
+        одним запросом; категории поддерева удаляются одним запросом
+        
+        Args:
+            category_id: ID удаляемой категории
+            move_products_to: ID категории, в которую переносятся товары поддерева
+            cascade: Удалить товары поддерева (если move_products_to не задан)
+            
+        Returns:
+            ID удаленных категорий, ID перенесенных товаров, ID удаленных товаров
+            
+        Raises:
+            NotFoundError: Если категория или категория для товаров не найдены
+            BusinessRuleError: Если категория для товаров входит в удаляемое поддерево
+                или в поддереве есть товары, а move_products_to и cascade не заданы
+        """
+        moved: List[int] = []
+        deleted: List[int] = []
+
+        async with self.category_repo.transaction():
+            await self.category_repo.lock_tree()
+            ids = await self.category_repo.get_subtree_ids(category_id, primary=True)
+            if not ids:
+                raise NotFoundError(f"Category with id {category_id} not found")
+
+            if move_products_to is not None:
+                if move_products_to in ids:
+                    raise BusinessRuleError("Products cannot be moved into a deleted category")
+                if not await self.category_repo.get_existing_ids({move_products_to}):
+                    raise NotFoundError(f"Category with id {move_products_to} not found")
+                moved = await self.product_repo.move_to_category(ids, move_products_to)
+            elif cascade:
+                deleted = await self.product_repo.delete_by_category_ids(ids)
+            elif await self.product_repo.exists_in_categories(ids):
+                raise BusinessRuleError("Category has products: pass move_products_to or cascade")
+
+            # Товары поддерева вычитаются из счетчиков предков удаляемой категории
+            count = len(moved) + len(deleted)
+            deltas = {category_id: -count}
+            if moved:
+                deltas[move_products_to] = count
+            await self.category_repo.add_product_counts(deltas)
+            await self.category_repo.delete_many(ids)
+            category_version = await self.table_version_repo.bump(Category.__tablename__)
+            if moved or deleted:
+                product_version = await self.table_version_repo.bump(Product.__tablename__)
+
+        await self.table_versions.publish(Category.__tablename__, category_version, ids)
+        if moved or deleted:
+            await self.table_versions.publish(Product.__tablename__, product_version, moved + deleted)
+        return ids, moved, deleted
+
+    async def repair_product_counts(self) -> List[int]:
+        """
+        Сверить счетчики товаров категорий с таблицей products и исправить расхождения
+        
+        Выполняется под блокировкой дерева: изменения товаров и категорий ждут окончания
+        
+        Returns:
+            ID категорий, счетчики которых были исправлены
+        """
+        async with self.category_repo.transaction():
+            await self.category_repo.lock_tree()
+            ids = await self.category_repo.repair_product_counts()
+            if ids:
+                version = await self.table_version_repo.bump(Category.__tablename__)
+        if ids:
+            await self.table_versions.publish(Category.__tablename__, version, ids)
+        return ids
+
+    @single_flight
+    async def get_category_tree(self) -> List[CategoryTreeDTO]:
+        """
+        Получить дерево категорий с количеством товаров
+        
+        Returns:
+            Корневые категории с вложенными подкатегориями (по возрастанию ID)
+        """
+        rows = await self.category_repo.get_tree()
+        nodes = {
+            row.id: CategoryTreeDTO(
+                id=row.id,
+                name=row.name,
+                level=row.level,
+                direct_count=row.direct_count,
+                subtree_count=row.subtree_count,
+            )
+            for row in rows
+        }
+        roots = []
+        for row in rows:
+            parent = nodes.get(row.parent_id)
+            (parent.children if parent is not None else roots).append(nodes[row.id])
+        return roots
 
     async def get_category_by_id(self, category_id: int) -> Optional[Category]:
         """
@@ -66,6 +229,25 @@ class CategoryService:
         """
         return await self.category_repo.get_by_id(category_id)
 
+    async def get_subtree_ids(self, category_id: int) -> List[int]:
+        """
+        Получить ID категории и всех ее потомков
+        
+        Args:
+            category_id: ID корня поддерева
+            
+        Returns:
+            ID категорий поддерева
+            
+        Raises:
+            NotFoundError: Если категория не найдена
+        """
+        ids = await self.category_repo.get_subtree_ids(category_id)
+        if not ids:
+            raise NotFoundError(f"Category with id {category_id} not found")
+        return ids
+
+    @single_flight
     async def get_all_categories(self, skip: int = 0, limit: int = 100) -> List[Category]:
         """
         Получить список всех категорий
@@ -1,26 +1,55 @@
-from typing import List, Optional
+from collections import Counter, defaultdict
+from typing import List, Optional, Tuple
 
-from src.repositories import ProductRepository, CategoryRepository
+from sqlalchemy import Row
+
+from src.config import get_settings
+from src.repositories import ProductRepository, CategoryRepository, TableVersionRepository
 from src.models import Product
-from src.schemas import ProductAddDTO
+from src.core.cache import LRUCache
+from src.core.pagination import decode_cursor, encode_cursor
+from src.core.single_flight import single_flight
+from src.publisher import TableVersions
+from src.schemas import (
+    ProductAddDTO,
+    ProductUpdateDTO,
+    ProductBulkUpdateItemDTO,
+    ProductImportErrorDTO,
+    ProductWithCategoryDTO,
+    ProductFilterDTO,
+    ProductFacetsDTO,
+    CategoryFacetDTO,
+    PriceBucketFacetDTO,
+    StockDeltaDTO,
+)
 from src.exceptions import NotFoundError
 
+settings = get_settings()
+
 
 class ProductService:
     """
     Сервис для работы с товарами
     """
     
-    def __init__(self, product_repository: ProductRepository, category_repository: CategoryRepository):
+    def __init__(self, product_repository: ProductRepository, category_repository: CategoryRepository,
+                 table_version_repository: TableVersionRepository, table_versions: TableVersions,
+                 product_cache: LRUCache):
         """
         Инициализация сервиса
         
         Args:
             product_repository: Репозиторий для работы с товарами
             category_repository: Репозиторий для работы с категориями
+            table_version_repository: Репозиторий версий данных таблиц
+            table_versions: Версии данных таблиц в памяти процесса (для ETag и инвалидации кэшей)
+            product_cache: Кэш товаров с категорией по ID
         """
         self.product_repo = product_repository
         self.category_repo = category_repository
+        self.table_version_repo = table_version_repository
+        self.table_versions = table_versions
+        self.product_cache = product_cache
 
     async def create_product(self, data: ProductAddDTO) -> Product:
         """
@@ -35,18 +64,140 @@ class ProductService:
         Raises:
             NotFoundError: Если категория не найдена
         """
-        # Проверяем существование категории
-        category = await self.category_repo.get_by_id(data.category_id)
-        if not category:
-            raise NotFoundError(f"Category with id {data.category_id} not found")
+        async with self.product_repo.transaction():
+            await self.category_repo.lock_tree(shared=True)
+
+            # Проверяем существование категории
+            category = await self.category_repo.get_by_id(data.category_id)
+            if not category:
+                raise NotFoundError(f"Category with id {data.category_id} not found")
+
+            product = Product(
+                name=data.name,
+                price=data.price,
+                storage_quantity=data.quantity,
+                category_id=data.category_id
+            )
+            product = await self.product_repo.create(product)
+            version = await self.table_version_repo.bump(Product.__tablename__)
+            await self.category_repo.add_product_counts({product.category_id: 1})
+        await self.table_versions.publish(Product.__tablename__, version, [product.id])
+        return product
+
+    async def update_product(self, product_id: int, data: ProductUpdateDTO) -> Tuple[Product, int]:
+        """
+        Изменить товар
         
-        product = Product(
-            name=data.name,
-            price=data.price,
-            storage_quantity=data.quantity,
-            category_id=data.category_id
-        )
-        return await self.product_repo.create(product)
+        Args:
+            product_id: ID товара
+            data: Изменяемые поля (None - поле не меняется)
+            
+        Returns:
+            Измененный товар и изменение его остатка (прежний остаток читается
+            под блокировкой строки товара)
+            
+        Raises:
+            NotFoundError: Если товар или новая категория не найдены
+        """
+        fields = data.model_dump(exclude_none=True)
+        if "quantity" in fields:
+            fields["storage_quantity"] = fields.pop("quantity")
+
+        async with self.product_repo.transaction():
+            # Блокировка дерева берется до блокировки товара: удаление категории
+            # берет их в том же порядке
+            if "category_id" in fields:
+                await self.category_repo.lock_tree(shared=True)
+            # Товар блокируется до конца транзакции: параллельное изменение
+            # прочитает уже новую категорию, и счетчики не разойдутся
+            product = await self.product_repo.get_by_id(product_id, for_update=True)
+            if product is None:
+                raise NotFoundError(f"Product with id {product_id} not found")
+
+            old_category_id = product.category_id
+            old_quantity = product.storage_quantity
+            moved = fields.get("category_id", old_category_id) != old_category_id
+            if moved and not await self.category_repo.get_by_id(fields["category_id"]):
+                raise NotFoundError(f"Category with id {fields['category_id']} not found")
+            product = await self.product_repo.update(product, fields)
+            version = await self.table_version_repo.bump(Product.__tablename__)
+            if moved:
+                await self.category_repo.add_product_counts({old_category_id: -1, product.category_id: 1})
+        await self.table_versions.publish(Product.__tablename__, version, [product.id], list(fields))
+        return product, product.storage_quantity - old_quantity
+
+    async def bulk_update_products(self, items: List[ProductBulkUpdateItemDTO]) -> Tuple[List[Row], List[int]]:
+        """
+        Изменить цены и остатки пакета товаров одним запросом
+        
+        Для повторяющихся ID применяется последнее изменение
+        
+        Args:
+            items: Новые цены и/или остатки товаров
+            
+        Returns:
+            Измененные товары (id, name, price, storage_quantity, quantity_delta; товары,
+            значения которых уже совпадали с новыми, не входят) и ID товаров, которых нет в БД
+        """
+        changes = {item.id: (item.id, item.price, item.quantity) for item in items}
+        async with self.product_repo.transaction():
+            updated = await self.product_repo.bulk_update(list(changes.values()))
+            if updated:
+                version = await self.table_version_repo.bump(Product.__tablename__)
+        if updated:
+            await self.table_versions.publish(
+                Product.__tablename__,
+                version,
+                [row.id for row in updated],
+                [Product.price.key, Product.storage_quantity.key]
+            )
+
+        unchanged = changes.keys() - {row.id for row in updated}
+        existing = await self.product_repo.get_existing_ids(list(unchanged))
+        return updated, [product_id for product_id in changes if product_id in unchanged and product_id not in existing]
+
+    async def import_products(
+        self,
+        rows: List[Tuple[int, ProductAddDTO]]
+    ) -> Tuple[List[Row], List[ProductImportErrorDTO]]:
+        """
+        Создать пакет товаров импорта
+        
+        Категории всех строк проверяются одним запросом, товары создаются
+        одним INSERT в одной транзакции с увеличением версии таблицы
+        
+        Args:
+            rows: Пары (номер строки, данные товара), прошедшие валидацию
+            
+        Returns:
+            Созданные товары (строки с колонками товара) и ошибки строк с несуществующими категориями
+        """
+        async with self.product_repo.transaction():
+            await self.category_repo.lock_tree(shared=True)
+            existing = await self.category_repo.get_existing_ids({data.category_id for _, data in rows})
+            errors = [
+                ProductImportErrorDTO(line=line, error=f"Category with id {data.category_id} not found")
+                for line, data in rows
+                if data.category_id not in existing
+            ]
+            values = [
+                {
+                    "name": data.name,
+                    "price": data.price,
+                    "storage_quantity": data.quantity,
+                    "category_id": data.category_id,
+                }
+                for _, data in rows
+                if data.category_id in existing
+            ]
+            if not values:
+                return [], errors
+
+            products = await self.product_repo.create_many(values)
+            version = await self.table_version_repo.bump(Product.__tablename__)
+            await self.category_repo.add_product_counts(Counter(product.category_id for product in products))
+        await self.table_versions.publish(Product.__tablename__, version, [product.id for product in products])
+        return products, errors
 
     async def get_product_by_id(self, product_id: int) -> Optional[Product]:
         """
@@ -60,20 +211,62 @@ class ProductService:
         """
         return await self.product_repo.get_by_id(product_id)
 
-    async def get_all_products(self, skip: int = 0, limit: int = 100) -> List[Product]:
+    async def get_product_with_category(self, product_id: int) -> Optional[ProductWithCategoryDTO]:
+        """
+        Получить товар с категорией по ID через кэш товаров
+        
+        Args:
+            product_id: ID товара
+            
+        Returns:
+            ProductWithCategoryDTO или None, если товар не найден
+        """
+        return await self.product_cache.get_or_load(
+            product_id,
+            lambda: self._load_product_with_category(product_id)
+        )
+
+    @single_flight
+    async def _load_product_with_category(self, product_id: int) -> Optional[ProductWithCategoryDTO]:
+        product = await self.product_repo.get_by_id_with_category(product_id)
+        if product is None:
+            return None
+        return ProductWithCategoryDTO.model_validate(product)
+
+    @single_flight
+    async def get_all_products(
+        self,
+        skip: int = 0,
+        limit: int = 100,
+        filters: ProductFilterDTO = ProductFilterDTO(),
+        cursor: Optional[str] = None
+    ) -> Tuple[List[Product], Optional[str]]:
         """
         Получить список всех товаров
         
         Args:
             skip: Количество записей для пропуска
             limit: Максимальное количество записей
+            filters: Фильтры и сортировка
+            cursor: Курсор страницы из предыдущего ответа (None - первая страница)
             
         Returns:
-            Список товаров
+            Список товаров и курсор следующей страницы (None - страница последняя)
+            
+        Raises:
+            ValueError: Если курсор поврежден, получен с другой сортировкой или передан вместе со skip
         """
-        return await self.product_repo.get_all(skip, limit)
+        return await self._get_page(None, skip, limit, filters, cursor)
 
-    async def get_products_by_category_id(self, category_id: int, skip: int = 0, limit: int = 100) -> List[Product]:
+    @single_flight
+    async def get_products_by_category_id(
+        self,
+        category_id: int,
+        skip: int = 0,
+        limit: int = 100,
+        filters: ProductFilterDTO = ProductFilterDTO(),
+        cursor: Optional[str] = None
+    ) -> Tuple[List[Product], Optional[str]]:
         """
         Получить товары по категории
         
@@ -81,9 +274,133 @@ class ProductService:
             category_id: ID категории
             skip: Количество записей для пропуска
             limit: Максимальное количество записей
+            filters: Фильтры и сортировка
+            cursor: Курсор страницы из предыдущего ответа (None - первая страница)
+            
+        Returns:
+            Список товаров в категории и курсор следующей страницы (None - страница последняя)
+            
+        Raises:
+            ValueError: Если курсор поврежден, получен с другой сортировкой или передан вместе со skip
+        """
+        return await self._get_page(category_id, skip, limit, filters, cursor)
+
+    async def _get_page(
+        self,
+        category_id: Optional[int],
+        skip: int,
+        limit: int,
+        filters: ProductFilterDTO,
+        cursor: Optional[str]
+    ) -> Tuple[List[Product], Optional[str]]:
+        columns, _ = self.product_repo.sort_key(filters.sort)
+        after = None
+        if cursor:
+            # Позицию задает курсор: пропуск от нее сдвинул бы страницу
+            if skip:
+                raise ValueError("skip cannot be used with cursor")
+            # Курсор начинается с сортировки: с курсором другой сортировки позиция не имеет смысла
+            sort, *after = decode_cursor(cursor, (str, *(column.type.python_type for column in columns)))
+            if sort != filters.sort:
+                raise ValueError("Cursor does not match sort")
+
+        if category_id is None:
+            products = await self.product_repo.get_all(skip, limit + 1, filters, after)
+        else:
+            products = await self.product_repo.get_by_category_id(category_id, skip, limit + 1, filters, after)
+
+        next_cursor = None
+        if len(products) > limit:
+            products = products[:limit]
+            last = products[-1]
+            next_cursor = encode_cursor([filters.sort, *(getattr(last, column.key) for column in columns)])
+        return products, next_cursor
+
+    @single_flight
+    async def get_product_facets(
+        self,
+        category_id: Optional[int] = None,
+        filters: ProductFilterDTO = ProductFilterDTO()
+    ) -> ProductFacetsDTO:
+        """
+        Количество товаров по категориям и диапазонам цен (границы - PRODUCT_PRICE_BUCKETS)
+        
+        Args:
+            category_id: ID категории (None - все товары)
+            filters: Фильтры списка товаров
+            
+        Returns:
+            ProductFacetsDTO: Непустые категории и диапазоны цен
+        """
+        edges = settings.product_price_buckets
+        categories, buckets = await self.product_repo.get_facets(category_id, filters, edges)
+        return ProductFacetsDTO(
+            categories=[
+                CategoryFacetDTO(category_id=facet_category_id, count=count)
+                for facet_category_id, count in sorted(categories.items())
+            ],
+            price_buckets=[
+                PriceBucketFacetDTO(
+                    min_price=edges[bucket - 1] if bucket > 0 else 0,
+                    max_price=edges[bucket] if bucket < len(edges) else None,
+                    count=count,
+                )
+                for bucket, count in sorted(buckets.items())
+            ],
+        )
+
+    async def search_products(
+        self,
+        query: str,
+        category_id: Optional[int] = None,
+        limit: int = 20,
+        cursor: Optional[str] = None
+    ) -> Tuple[List[Product], Optional[str]]:
+        """
+        Поиск товаров по названию
+        
+        Args:
+            query: Поисковый запрос
+            category_id: ID категории для фильтрации (необязательно)
+            limit: Размер страницы
+            cursor: Курсор страницы из предыдущего ответа (None - первая страница)
             
         Returns:
-            Список товаров в категории
+            Товары страницы по убыванию релевантности и курсор следующей страницы (None - страница последняя)
+            
+        Raises:
+            ValueError: Если курсор поврежден
+        """
+        after = decode_cursor(cursor, (float, int)) if cursor else None
+        rows = await self.product_repo.search(query, category_id, limit + 1, after)
+
+        next_cursor = None
+        if len(rows) > limit:
+            rows = rows[:limit]
+            last_product, last_rank = rows[-1]
+            next_cursor = encode_cursor([last_rank, last_product.id])
+        return [product for product, _ in rows], next_cursor
+
+    async def apply_stock_changes(self, items: List[StockDeltaDTO]) -> Tuple[int, List[int]]:
+        """
+        Применить пакет изменений остатков из order_service
+
+        Args:
+            items: Изменения остатков по товарам
+
+        Returns:
+            Количество обновленных товаров и ID товаров, остаток которых ушел бы
+            ниже нуля и был обнулен
         """
-        return await self.product_repo.get_by_category_id(category_id, skip, limit)
+        deltas = defaultdict(int)
+        for item in items:
+            deltas[item.product_id] += item.delta
 
+        changes = {product_id: delta for product_id, delta in deltas.items() if delta}
+        async with self.product_repo.transaction():
+            updated, clamped = await self.product_repo.apply_stock_deltas(changes)
+            if not updated:
+                return 0, []
+            version = await self.table_version_repo.bump(Product.__tablename__)
+        await self.table_versions.publish(Product.__tablename__, version, list(changes), [Product.storage_quantity.key])
+        return updated, clamped
@@ -0,0 +1,21 @@
+import os
+import sys
+from pathlib import Path
+
+# Настройки читаются при импорте модулей сервиса; тесты не подключаются к БД и RabbitMQ
+for name, value in {
+    "DB_NAME": "catalog",
+    "DB_USER": "postgres",
+    "DB_PASSWORD": "postgres",
+    "DB_HOST": "localhost",
+    "DB_PORT": "5432",
+    "DB_ECHO": "false",
+    "JWT_SECRET_KEY": "test",
+    "RABBITMQ_HOST": "localhost",
+    "RABBITMQ_PORT": "5672",
+    "RABBITMQ_USER": "guest",
+    "RABBITMQ_PASSWORD": "guest",
+}.items():
+    os.environ.setdefault(name, value)
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
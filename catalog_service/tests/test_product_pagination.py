@@ -0,0 +1,76 @@
+import asyncio
+
+import pytest
+from sqlalchemy.dialects import postgresql
+
+from src.core.cache import LRUCache
+from src.core.pagination import encode_cursor
+from src.publisher import TableVersions
+from src.repositories import CategoryRepository, ProductRepository, TableVersionRepository
+from src.schemas import ProductFilterDTO
+from src.services import ProductService
+
+
+class RecordingProductRepository(ProductRepository):
+    """Репозиторий без БД: запоминает SQL запросов на чтение (в том числе копий в других сессиях)"""
+
+    statements = []
+
+    async def execute_read(self, statement):
+        self.statements.append(str(statement.compile(dialect=postgresql.dialect())))
+        return _EmptyResult()
+
+
+class _EmptyResult:
+    def scalars(self):
+        return self
+
+    def all(self):
+        return []
+
+
+@pytest.fixture
+def repo():
+    RecordingProductRepository.statements = []
+    return RecordingProductRepository(None)
+
+
+def make_service(product_repo: ProductRepository) -> ProductService:
+    return ProductService(
+        product_repo,
+        CategoryRepository(None),
+        TableVersionRepository(None),
+        TableVersions(),
+        LRUCache("test", 10, 60),
+    )
+
+
+def test_page_with_cursor_does_not_apply_offset(repo):
+
+    asyncio.run(repo.get_all(skip=5, limit=10, filters=ProductFilterDTO(sort="price"), after=(100, 7)))
+    asyncio.run(repo.get_all(skip=5, limit=10, filters=ProductFilterDTO(sort="price")))
+
+    with_cursor, without_cursor = repo.statements
+    assert "OFFSET" not in with_cursor
+    assert "OFFSET" in without_cursor
+
+
+def test_cursor_with_skip_is_rejected(repo):
+    service = make_service(repo)
+    cursor = encode_cursor(["price", 100, 7])
+
+    with pytest.raises(ValueError, match="skip"):
+        asyncio.run(service.get_all_products(5, 10, ProductFilterDTO(sort="price"), cursor))
+    with pytest.raises(ValueError, match="skip"):
+        asyncio.run(service.get_products_by_category_id(1, 5, 10, ProductFilterDTO(sort="price"), cursor))
+    assert repo.statements == []
+
+
+def test_cursor_without_skip_reads_after_cursor(repo):
+    service = make_service(repo)
+    cursor = encode_cursor(["price", 100, 7])
+
+    products, next_cursor = asyncio.run(service.get_all_products(0, 10, ProductFilterDTO(sort="price"), cursor))
+
+    assert products == [] and next_cursor is None
+    assert "OFFSET" not in repo.statements[0]
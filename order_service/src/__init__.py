@@ -1,7 +1,8 @@
-from src.api import router
+from src.api import router, brokers
 from src.database import db_dependency_instance
 
 __all__ = [
     "router",
+    "brokers",
     "db_dependency_instance",
 ]
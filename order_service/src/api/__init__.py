@@ -2,6 +2,7 @@ from fastapi import APIRouter
 
 from src.api.order_api import router as change_order_router
 from src.consumer import user_sub, product_sub
+from src.publisher import stock_pub
 
 
 router = APIRouter()
@@ -9,7 +10,12 @@ router = APIRouter()
 router.include_router(change_order_router)
 router.include_router(user_sub)
 router.include_router(product_sub)
+router.include_router(stock_pub)
+
+# Брокеры RabbitMQ сервиса: при остановке их подписчики останавливаются первыми
+brokers = [user_sub.broker, product_sub.broker, stock_pub.broker]
 
 __all__ = [
     "router",
+    "brokers",
 ]
@@ -70,16 +70,16 @@ async def add_order(
             ]
         )
     except NotFoundError as e:
-        logger.warning(f"Order creation failed: {str(e)}")
+        logger.warning("Order creation failed: %s", e)
         raise HTTPException(status_code=404, detail=str(e))
     except InsufficientStockError as e:
-        logger.warning(f"Order creation failed: {str(e)}")
+        logger.warning("Order creation failed: %s", e)
         raise HTTPException(status_code=400, detail=str(e))
     except BusinessRuleError as e:
-        logger.warning(f"Order creation failed: {str(e)}")
+        logger.warning("Order creation failed: %s", e)
         raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
-        logger.error(f"Unexpected error in add_order: {str(e)}", exc_info=True)
+        logger.error("Unexpected error in add_order: %s", e, exc_info=True)
         raise HTTPException(status_code=500, detail="Internal server error")
 
 
@@ -124,10 +124,10 @@ async def get_order(
             ]
         )
     except NotFoundError as e:
-        logger.warning(f"Order retrieval failed: {str(e)}")
+        logger.warning("Order retrieval failed: %s", e)
         raise HTTPException(status_code=404, detail=str(e))
     except Exception as e:
-        logger.error(f"Unexpected error in get_order: {str(e)}", exc_info=True)
+        logger.error("Unexpected error in get_order: %s", e, exc_info=True)
         raise HTTPException(status_code=500, detail="Internal server error")
 
 
@@ -177,7 +177,7 @@ async def get_all_orders(
             total=len(orders)
         )
     except Exception as e:
-        logger.error(f"Unexpected error in get_all_orders: {str(e)}", exc_info=True)
+        logger.error("Unexpected error in get_all_orders: %s", e, exc_info=True)
         raise HTTPException(status_code=500, detail="Internal server error")
 
 
@@ -214,16 +214,16 @@ async def update_order(
             )
         )
     except NotFoundError as e:
-        logger.warning(f"Order update failed: {str(e)}")
+        logger.warning("Order update failed: %s", e)
         raise HTTPException(status_code=404, detail=str(e))
     except InsufficientStockError as e:
-        logger.warning(f"Order update failed: {str(e)}")
+        logger.warning("Order update failed: %s", e)
         raise HTTPException(status_code=400, detail=str(e))
     except BusinessRuleError as e:
-        logger.warning(f"Order update failed: {str(e)}")
+        logger.warning("Order update failed: %s", e)
         raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
-        logger.error(f"Unexpected error in update_order: {str(e)}", exc_info=True)
+        logger.error("Unexpected error in update_order: %s", e, exc_info=True)
         raise HTTPException(status_code=500, detail="Internal server error")
 
 
@@ -249,8 +249,8 @@ async def delete_order(
         return {"Status": "Ok"}
 
     except NotFoundError as e:
-        logger.warning(f"Order update failed: {str(e)}")
+        logger.warning("Order update failed: %s", e)
         raise HTTPException(status_code=404, detail=str(e))
     except Exception as e:
-        logger.error(f"Unexpected error in update_order: {str(e)}", exc_info=True)
+        logger.error("Unexpected error in update_order: %s", e, exc_info=True)
         raise HTTPException(status_code=500, detail="Internal server error")
@@ -5,12 +5,18 @@ from faststream.rabbit.fastapi import RabbitRouter
 from src.config import get_settings
 from src.core import get_product_service
 from src.core.logging_config import logger
-from src.schemas import ProductAddDTO
+from src.core.metrics import broker_metrics_middleware
+from src.core.tracing import broker_tracing_middleware
+from src.schemas import ProductAddDTO, ProductsCreatedDTO, ProductsUpdatedDTO, ProductsDeletedDTO
 from src.services.product_service import ProductService
 
 settings = get_settings()
 
-router = RabbitRouter(settings.rabbitmq_url)
+router = RabbitRouter(
+    settings.rabbitmq_url,
+    graceful_timeout=settings.shutdown_timeout,
+    middlewares=[broker_metrics_middleware, broker_tracing_middleware],
+)
 
 
 @router.subscriber("product.created")
@@ -26,11 +32,85 @@ async def handle_product_created(
         product_service: Сервис для работы с товарами
     """
     try:
-        logger.info(f"New product received in order service: {data.name}")
+        logger.info("New product received in order service: %s", data.name)
         product = await product_service.create_product(data)
-        logger.info(f"Product created successfully: {product.id} - {product.name}")
+        logger.info("Product created successfully: %s - %s", product.id, product.name)
     except Exception as e:
-        logger.error(f"Error creating product: {str(e)}", exc_info=True)
+        logger.error("Error creating product: %s", e, exc_info=True)
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Internal server error"
+        )
+
+
+@router.subscriber("products.created")
+async def handle_products_created(
+        data: ProductsCreatedDTO,
+        product_service: ProductService = Depends(get_product_service)
+):
+    """
+    Обработка пакета созданных товаров (импорт в catalog_service)
+    
+    Args:
+        data: Данные созданных товаров
+        product_service: Сервис для работы с товарами
+    """
+    try:
+        created = await product_service.create_products(data.items)
+        logger.info("Products batch received in order service: %s items, %s created", len(data.items), created)
+    except Exception as e:
+        logger.error("Error creating products batch: %s", e, exc_info=True)
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Internal server error"
+        )
+
+
+@router.subscriber("products.updated")
+async def handle_products_updated(
+        data: ProductsUpdatedDTO,
+        product_service: ProductService = Depends(get_product_service)
+):
+    """
+    Обработка пакета изменений товаров (изменение товара, массовое изменение цен и остатков)
+    
+    Args:
+        data: Новые значения измененных полей товаров
+        product_service: Сервис для работы с товарами
+    """
+    try:
+        updated, clamped = await product_service.apply_changes(data.items)
+        logger.info("Products changes received in order service: %s items, %s updated", len(data.items), updated)
+        if clamped:
+            logger.warning("Stock clamped to zero for %s products: %s", len(clamped), clamped[:20])
+    except Exception as e:
+        logger.error("Error applying products changes: %s", e, exc_info=True)
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Internal server error"
+        )
+
+
+@router.subscriber("products.deleted")
+async def handle_products_deleted(
+        data: ProductsDeletedDTO,
+        product_service: ProductService = Depends(get_product_service)
+):
+    """
+    Обработка удаления товаров (удаление категории вместе с товарами в catalog_service)
+    
+    Args:
+        data: ID удаленных товаров
+        product_service: Сервис для работы с товарами
+    """
+    try:
+        deleted, disabled = await product_service.delete_products(data.ids)
+        logger.info(
+            "Products deletion received in order service: %s items, %s deleted, %s kept for orders",
+            len(data.ids), deleted, disabled
+        )
+    except Exception as e:
+        logger.error("Error deleting products: %s", e, exc_info=True)
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail="Internal server error"
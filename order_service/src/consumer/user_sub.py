@@ -5,12 +5,18 @@ from faststream.rabbit.fastapi import RabbitRouter
 from src.config import get_settings
 from src.core import get_user_service
 from src.core.logging_config import logger
+from src.core.metrics import broker_metrics_middleware
+from src.core.tracing import broker_tracing_middleware
 from src.services import UserService
 from src.schemas import UserBase, UserAll
 
 settings = get_settings()
 
-router = RabbitRouter(settings.rabbitmq_url)
+router = RabbitRouter(
+    settings.rabbitmq_url,
+    graceful_timeout=settings.shutdown_timeout,
+    middlewares=[broker_metrics_middleware, broker_tracing_middleware],
+)
 
 
 @router.subscriber(
@@ -29,21 +35,21 @@ async def handle_user_created(
         user_service: Сервис для работы с пользователями
     """
     try:
-        logger.info(f"New user received in order service: {user_data.username}")
+        logger.info("New user received in order service: %s", user_data.username)
         existing_user = await user_service.get_user_by_username(user_data.username)
         if existing_user:
-            logger.warning(f"User already exists: {user_data.username}")
+            logger.warning("User already exists: %s", user_data.username)
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail="Username already taken"
             )
         
         await user_service.create_user(user_data)
-        logger.info(f"User created successfully: {user_data.id} - {user_data.username}")
+        logger.info("User created successfully: %s - %s", user_data.id, user_data.username)
     except HTTPException:
         raise
     except Exception as e:
-        logger.error(f"Error creating user: {str(e)}", exc_info=True)
+        logger.error("Error creating user: %s", e, exc_info=True)
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail="Internal server error"
@@ -66,11 +72,11 @@ async def handle_user_updated(
         user_service: Сервис для работы с пользователями
     """
     try:
-        logger.info(f"User update received in order service: {user_data.username}")
+        logger.info("User update received in order service: %s", user_data.username)
         
         existing_user = await user_service.get_user_by_id(user_data.id)
         if not existing_user:
-            logger.warning(f"User not found for update: {user_data.id}")
+            logger.warning("User not found for update: %s", user_data.id)
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail="User not found"
@@ -78,17 +84,17 @@ async def handle_user_updated(
 
         updated_user = await user_service.update_user(user_data)
         if not updated_user:
-            logger.warning(f"Failed to update user: {user_data.id}")
+            logger.warning("Failed to update user: %s", user_data.id)
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail="User not found"
             )
         
-        logger.info(f"User updated successfully: {user_data.id} - {user_data.username}")
+        logger.info("User updated successfully: %s - %s", user_data.id, user_data.username)
     except HTTPException:
         raise
     except Exception as e:
-        logger.error(f"Error updating user: {str(e)}", exc_info=True)
+        logger.error("Error updating user: %s", e, exc_info=True)
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail="Internal server error"
@@ -111,20 +117,20 @@ async def handle_user_deleted(
         user_service: Сервис для работы с пользователями
     """
     try:
-        logger.info(f"User deletion received in order service: {user.id}")
+        logger.info("User deletion received in order service: %s", user.id)
         success = await user_service.delete_user(user.id)
         if not success:
-            logger.warning(f"User not found for deletion: {user.id}")
+            logger.warning("User not found for deletion: %s", user.id)
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail="User not found"
             )
         
-        logger.info(f"User deleted successfully: {user.id}")
+        logger.info("User deleted successfully: %s", user.id)
     except HTTPException:
         raise
     except Exception as e:
-        logger.error(f"Error deleting user: {str(e)}", exc_info=True)
+        logger.error("Error deleting user: %s", e, exc_info=True)
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail="Internal server error"
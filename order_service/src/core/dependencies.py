@@ -10,6 +10,7 @@ from src.database import db_dependency_instance
 from src.repositories import OrderRepository, UserRepository
 from src.repositories import ProductRepository
 from src.services import OrderService
+from src.publisher import get_stock_publisher, StockChangePublisher
 from src.core.security import verify_token_with_auth_service
 
 security = HTTPBearer()
@@ -60,10 +61,11 @@ async def get_product_repository(
 
 async def get_order_service(
     order_repo: OrderRepository = Depends(get_order_repository),
-    product_repo: ProductRepository = Depends(get_product_repository)
+    product_repo: ProductRepository = Depends(get_product_repository),
+    stock_publisher: StockChangePublisher = Depends(get_stock_publisher)
 ) -> OrderService:
     """Dependency для OrderService"""
-    return OrderService(order_repo, product_repo)
+    return OrderService(order_repo, product_repo, stock_publisher)
 
 
 async def get_product_service(
@@ -1,16 +1,78 @@
+import atexit
+import json
 import logging
+import random
 import sys
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener
 from pathlib import Path
+from queue import SimpleQueue
+
+from src.config import SERVICE_NAME, get_settings
+
+settings = get_settings()
+
+
+class JsonFormatter(logging.Formatter):
+    """
+    Форматирование записей лога в одну JSON строку
+    """
+
+    def format(self, record: logging.LogRecord) -> str:
+        data = {
+            "time": datetime.fromtimestamp(record.created, tz=timezone.utc).isoformat(),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+            "file": record.filename,
+            "line": record.lineno,
+        }
+        if record.exc_info:
+            data["exc_info"] = self.formatException(record.exc_info)
+        return json.dumps(data, ensure_ascii=False, default=str)
+
+
+class LocalQueueHandler(QueueHandler):
+    """
+    Передача записей в очередь без форматирования
+
+    Очередь используется внутри процесса, поэтому запись не нужно готовить
+    к сериализации: сообщение и traceback форматирует поток QueueListener
+    """
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        return record
+
+
+class SamplingFilter(logging.Filter):
+    """
+    Пропускает только долю записей уровня INFO и ниже, предупреждения и ошибки - всегда
+    """
+
+    def __init__(self, rate: float) -> None:
+        super().__init__()
+        self.rate = rate
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        return record.levelno > logging.INFO or random.random() < self.rate
+
 
 # Настройка логирования
-logger = logging.getLogger("order_service")
+logger = logging.getLogger(SERVICE_NAME)
 logger.setLevel(logging.INFO)
 
+# Логгер для сообщений, которые пишутся на каждый HTTP запрос: INFO записи сэмплируются
+hot_path_logger = logger.getChild("hot_path")
+hot_path_logger.addFilter(SamplingFilter(settings.log_sample_rate))
+
 # Формат логов
-formatter = logging.Formatter(
-    '%(asctime)s - %(name)s - %(levelname)-8s - %(filename)-20s:%(lineno)-4d - %(message)s',
-    datefmt='%Y-%m-%d %H:%M:%S'
-)
+if settings.log_format == "json":
+    formatter = JsonFormatter()
+else:
+    formatter = logging.Formatter(
+        '%(asctime)s - %(name)s - %(levelname)-8s - %(filename)-20s:%(lineno)-4d - %(message)s',
+        datefmt='%Y-%m-%d %H:%M:%S'
+    )
 
 # Консольный обработчик
 console_handler = logging.StreamHandler(sys.stdout)
@@ -20,12 +82,16 @@ console_handler.setFormatter(formatter)
 # Файловый обработчик (опционально)
 log_dir = Path("logs")
 log_dir.mkdir(exist_ok=True)
-file_handler = logging.FileHandler(log_dir / "order_service.log")
+file_handler = logging.FileHandler(log_dir / f"{SERVICE_NAME}.log")
 file_handler.setLevel(logging.ERROR)
 file_handler.setFormatter(formatter)
 
-logger.addHandler(console_handler)
-logger.addHandler(file_handler)
+# Форматирование и запись выполняются в отдельном потоке, event loop только кладет запись в очередь
+log_queue = SimpleQueue()
+queue_listener = QueueListener(log_queue, console_handler, file_handler, respect_handler_level=True)
+queue_listener.start()
+atexit.register(queue_listener.stop)
 
-__all__ = ["logger"]
+logger.addHandler(LocalQueueHandler(log_queue))
 
+__all__ = ["logger", "hot_path_logger"]
@@ -0,0 +1,139 @@
+import os
+import time
+from typing import Callable
+
+from faststream.rabbit.prometheus import RabbitPrometheusMiddleware
+from prometheus_client import REGISTRY, CollectorRegistry, Counter, Gauge, Histogram, generate_latest, multiprocess
+from prometheus_client.core import CounterMetricFamily, GaugeMetricFamily
+
+from src.config import SERVICE_NAME
+
+# Метка маршрута для запросов, не попавших ни в один маршрут
+UNMATCHED_ROUTE = "<unmatched>"
+
+http_requests_total = Counter(
+    "http_requests_total",
+    "Total HTTP requests",
+    ["method", "route", "status"],
+)
+http_request_duration_seconds = Histogram(
+    "http_request_duration_seconds",
+    "HTTP request latency in seconds",
+    ["method", "route"],
+)
+http_requests_in_progress = Gauge(
+    "http_requests_in_progress",
+    "HTTP requests currently being processed",
+    ["method"],
+    multiprocess_mode="livesum",
+)
+
+# Метрики подписчиков и публикации RabbitMQ: один экземпляр на все брокеры сервиса
+broker_metrics_middleware = RabbitPrometheusMiddleware(registry=REGISTRY, app_name=SERVICE_NAME)
+
+
+class MetricsMiddleware:
+    """
+    ASGI middleware: количество, время и число одновременных HTTP запросов
+
+    Маршрут берется из шаблона пути (например /product/{product_id}),
+    чтобы число временных рядов не зависело от значений параметров
+    """
+
+    def __init__(self, app) -> None:
+        self.app = app
+
+    async def __call__(self, scope, receive, send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        method = scope["method"]
+        status_code = 500
+
+        async def send_with_status(message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        in_progress = http_requests_in_progress.labels(method)
+        in_progress.inc()
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            elapsed = time.perf_counter() - started
+            in_progress.dec()
+            route = scope.get("route")
+            route_path = route.path if route is not None else UNMATCHED_ROUTE
+            http_request_duration_seconds.labels(method, route_path).observe(elapsed)
+            http_requests_total.labels(method, route_path, str(status_code)).inc()
+
+
+class DBPoolCollector:
+    """
+    Коллектор статистики пулов соединений, читается при каждом запросе /metrics
+    """
+
+    def __init__(self, stats_provider: Callable[[], dict]) -> None:
+        """
+        Args:
+            stats_provider: Функция, возвращающая статистику пулов (DBDependency.pool_stats)
+        """
+        self.stats_provider = stats_provider
+
+    def collect(self):
+        size = GaugeMetricFamily("db_pool_size", "Configured connection pool size", labels=["pool"])
+        checked_out = GaugeMetricFamily("db_pool_checked_out", "Connections checked out of the pool", labels=["pool"])
+        overflow = GaugeMetricFamily("db_pool_overflow", "Connections open above the pool size", labels=["pool"])
+        checkouts = CounterMetricFamily("db_pool_checkouts", "Connections handed out by the pool", labels=["pool"])
+        timeouts = CounterMetricFamily("db_pool_timeouts", "Timed out waits for a pool connection", labels=["pool"])
+        wait = CounterMetricFamily("db_pool_wait_seconds", "Total time spent waiting for a pool connection", labels=["pool"])
+
+        for pool, stats in self.stats_provider().items():
+            size.add_metric([pool], stats["size"])
+            checked_out.add_metric([pool], stats["checked_out"])
+            overflow.add_metric([pool], stats["overflow"])
+            checkouts.add_metric([pool], stats["checkouts"])
+            timeouts.add_metric([pool], stats["timeouts"])
+            wait.add_metric([pool], stats["wait_seconds_total"])
+
+        return [size, checked_out, overflow, checkouts, timeouts, wait]
+
+
+_db_pool_collector = None
+
+
+def register_db_pool_collector(stats_provider: Callable[[], dict]) -> None:
+    """
+    Зарегистрировать коллектор статистики пулов соединений
+
+    Args:
+        stats_provider: Функция, возвращающая статистику пулов
+    """
+    global _db_pool_collector
+
+    _db_pool_collector = DBPoolCollector(stats_provider)
+    REGISTRY.register(_db_pool_collector)
+
+
+def render_metrics() -> bytes:
+    """
+    Метрики в текстовом формате Prometheus
+
+    При нескольких worker-процессах (задан PROMETHEUS_MULTIPROC_DIR) счетчики
+    и гистограммы суммируются по всем процессам, а статистика пулов соединений
+    относится к процессу, который обработал запрос /metrics
+
+    Returns:
+        Тело ответа /metrics
+    """
+    if "PROMETHEUS_MULTIPROC_DIR" not in os.environ:
+        return generate_latest(REGISTRY)
+
+    registry = CollectorRegistry()
+    multiprocess.MultiProcessCollector(registry)
+    if _db_pool_collector is not None:
+        registry.register(_db_pool_collector)
+    return generate_latest(registry)
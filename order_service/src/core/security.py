@@ -1,6 +1,38 @@
+from typing import Optional
+
 import httpx
 
-from src.core.logging_config import logger
+from src.core.logging_config import logger, hot_path_logger
+
+_http_client: Optional[httpx.AsyncClient] = None
+
+
+def get_http_client() -> httpx.AsyncClient:
+    """
+    Общий HTTP клиент сервиса
+    
+    Соединения с auth-service переиспользуются между запросами
+    
+    Returns:
+        Асинхронный HTTP клиент
+    """
+    global _http_client
+
+    if _http_client is None:
+        _http_client = httpx.AsyncClient()
+
+    return _http_client
+
+
+async def close_http_client() -> None:
+    """
+    Закрыть общий HTTP клиент
+    """
+    global _http_client
+
+    if _http_client is not None:
+        await _http_client.aclose()
+        _http_client = None
 
 
 async def verify_token_with_auth_service(token: str) -> dict:
@@ -13,16 +45,15 @@ async def verify_token_with_auth_service(token: str) -> dict:
     Returns:
         Словарь с результатом проверки токена
     """
-    async with httpx.AsyncClient() as client:
-        try:
-            logger.info("Token received, sending to auth service for verification")
-            response = await client.post(
-                "http://auth_service:8000/api/v1/auth/verify",
-                params={"token": token}
-            )
-            logger.info("Response received from auth service")
-            return response.json()
-        except Exception as e:
-            logger.error(f"Error verifying token: {str(e)}", exc_info=True)
-            return {"valid": False}
-
+    client = get_http_client()
+    try:
+        hot_path_logger.info("Token received, sending to auth service for verification")
+        response = await client.post(
+            "http://auth_service:8000/api/v1/auth/verify",
+            params={"token": token}
+        )
+        hot_path_logger.info("Response received from auth service")
+        return response.json()
+    except Exception as e:
+        logger.error("Error verifying token: %s", e, exc_info=True)
+        return {"valid": False}
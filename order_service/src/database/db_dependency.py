@@ -1,29 +1,137 @@
 from typing import AsyncGenerator
 
-from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker, AsyncSession
+from alembic.config import Config
+from alembic.script import ScriptDirectory
+from sqlalchemy import event, text
+from sqlalchemy.exc import ProgrammingError
+from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker, AsyncEngine, AsyncSession
 
-from src.config import get_settings
+from src.config import BASE_DIR, get_settings
 from src.core.logging_config import logger
-from src.models import Base
+from src.database.pool import InstrumentedPool
+from src.database.query_stats import register_query_hooks
 
 db_settings_instance = get_settings()
 
+# Файл конфигурации миграций Alembic
+ALEMBIC_INI_PATH = BASE_DIR / "alembic.ini"
+
+# Флаг сессии: выполняемые запросы только читают данные и могут уйти на реплику
+REPLICA_OPTION = "use_replica"
+# Флаг сессии: в текущей транзакции уже была запись
+TRANSACTION_WROTE = "transaction_wrote"
+# Глубина вложенности BaseRepository.transaction() в сессии
+TRANSACTION_DEPTH = "transaction_depth"
+
+
+def get_schema_head() -> str:
+    """
+    Последняя версия схемы по файлам миграций
+
+    Returns:
+        Идентификатор головной ревизии Alembic
+    """
+    return ScriptDirectory.from_config(Config(ALEMBIC_INI_PATH)).get_current_head()
+
+
+class RoutingSession(Session):
+    """
+    Сессия с маршрутизацией запросов между основной БД и репликой
+
+    На реплику уходят запросы, выполняемые при установленном флаге
+    REPLICA_OPTION (включая запросы selectinload). После первой записи
+    в сессии все запросы идут в основную БД, чтобы в рамках запроса
+    читались собственные изменения
+    """
+
+    def get_bind(self, mapper=None, clause=None, **kw):
+        replica_bind = self.info.get("replica_bind")
+        if (
+            replica_bind is not None
+            and not self._flushing
+            and self.info.get(REPLICA_OPTION)
+            and not self.info.get("wrote")
+        ):
+            return replica_bind
+        return super().get_bind(mapper=mapper, clause=clause, **kw)
+
+
+@event.listens_for(RoutingSession, "do_orm_execute")
+def _mark_write_statement(orm_execute_state) -> None:
+    if not orm_execute_state.is_select:
+        orm_execute_state.session.info["wrote"] = True
+        orm_execute_state.session.info[TRANSACTION_WROTE] = True
+
+
+@event.listens_for(RoutingSession, "after_flush")
+def _mark_flush(session, flush_context) -> None:
+    session.info["wrote"] = True
+    session.info[TRANSACTION_WROTE] = True
+
+
+@event.listens_for(RoutingSession, "after_transaction_end")
+def _reset_transaction_write(session, transaction) -> None:
+    if transaction.parent is None:
+        session.info.pop(TRANSACTION_WROTE, None)
+
+
 class DBDependency:
     def __init__(self) -> None:
-        self._engine = create_async_engine(url=db_settings_instance.db_url, echo=db_settings_instance.db_echo)
+        self._engine = self._create_engine(db_settings_instance.db_url)
+
+        self._read_engine = None
+        if db_settings_instance.db_replica_url:
+            self._read_engine = self._create_engine(db_settings_instance.db_replica_url)
+
         self._session_factory = async_sessionmaker(
             bind=self._engine,
+            sync_session_class=RoutingSession,
+            info={"replica_bind": self._read_engine.sync_engine} if self._read_engine else None,
             expire_on_commit=False,
             autocommit=False,
         )
         logger.info("Database connection initialized successfully")
+        if self._read_engine:
+            logger.info("Read replica connection initialized successfully")
+
+    @staticmethod
+    def _create_engine(url: str) -> AsyncEngine:
+        engine = create_async_engine(
+            url=url,
+            echo=db_settings_instance.db_echo,
+            poolclass=InstrumentedPool,
+            pool_size=db_settings_instance.db_pool_size,
+            max_overflow=db_settings_instance.db_max_overflow,
+            pool_timeout=db_settings_instance.db_pool_timeout,
+            pool_recycle=db_settings_instance.db_pool_recycle,
+            pool_pre_ping=db_settings_instance.db_pool_pre_ping,
+            connect_args={
+                "prepared_statement_cache_size": db_settings_instance.db_statement_cache_size,
+                "statement_cache_size": db_settings_instance.db_statement_cache_size,
+            },
+        )
+        register_query_hooks(engine)
+        return engine
+
+    def pool_stats(self) -> dict:
+        """
+        Статистика пулов соединений основной БД и реплики
+
+        Returns:
+            Словарь со статистикой пулов
+        """
+        stats = {"primary": self._engine.pool.stats()}
+        if self._read_engine:
+            stats["replica"] = self._read_engine.pool.stats()
+        return stats
 
     async def get_session(self) -> AsyncGenerator[AsyncSession, None]:
         async with self._session_factory() as session:
             try:
                 yield session
             except Exception as e:
-                logger.error(f"Database session error: {str(e)}", exc_info=True)
+                logger.error("Database session error: %s", e, exc_info=True)
                 await session.rollback()
                 raise
             finally:
@@ -33,15 +141,39 @@ class DBDependency:
     def db_session(self) -> async_sessionmaker[AsyncSession]:
         return self._session_factory
 
-    async def table_creating(self) -> None:
-        logger.info("Creating database tables...")
-        try:
-            async with self._engine.begin() as connection:
-                await connection.run_sync(Base.metadata.create_all)
-            logger.info("Database tables created successfully")
-        except Exception as e:
-            logger.error(f"Error creating database tables: {str(e)}", exc_info=True)
-            raise
+    async def dispose(self) -> None:
+        """
+        Закрыть все соединения пулов основной БД и реплики
+        """
+        await self._engine.dispose()
+        if self._read_engine:
+            await self._read_engine.dispose()
+        logger.info("Database connections closed")
+
+    async def check_schema_version(self) -> None:
+        """
+        Проверить, что схема БД обновлена до последней миграции
+
+        Сравнивается только номер версии в таблице alembic_version,
+        сами таблицы при запуске не создаются и не изменяются
+
+        Raises:
+            RuntimeError: Если миграции не применены или версия схемы отличается
+        """
+        expected_version = get_schema_head()
+        async with self._engine.connect() as connection:
+            try:
+                result = await connection.execute(text("SELECT version_num FROM alembic_version"))
+                current_version = result.scalar_one_or_none()
+            except ProgrammingError:
+                current_version = None
+
+        if current_version != expected_version:
+            raise RuntimeError(
+                f"Database schema version is {current_version}, expected {expected_version}. "
+                f"Run 'alembic upgrade head'"
+            )
+        logger.info("Database schema version %s", current_version)
 
 
 _db_dependency = None
@@ -5,7 +5,7 @@ from typing_extensions import Annotated
 from src.models.base_classes import Base, IDMixin
 
 order_fk = Annotated[int, mapped_column(ForeignKey('orders.id', ondelete='CASCADE'))]
-product_fk = Annotated[int, mapped_column(ForeignKey('products.id', ondelete='CASCADE'))]
+product_fk = Annotated[int, mapped_column(ForeignKey('products.id', ondelete='CASCADE'), index=True)]
 
 
 class OrderItem(Base, IDMixin):
@@ -7,7 +7,7 @@ from typing_extensions import Annotated
 
 from src.models.base_classes import Base, IDMixin
 
-client_fk = Annotated[uuid.UUID, mapped_column(ForeignKey('users.id'))]
+client_fk = Annotated[uuid.UUID, mapped_column(ForeignKey('users.id'), index=True)]
 
 
 class Order(Base, IDMixin):
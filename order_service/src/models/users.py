@@ -1,6 +1,6 @@
 from typing import Optional
 
-from sqlalchemy.orm import Mapped, relationship
+from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from src.models.base_classes import Base, UUIDMixin
 
@@ -8,5 +8,5 @@ from src.models.base_classes import Base, UUIDMixin
 class User(Base, UUIDMixin):
     __tablename__ = 'users'
 
-    username: Mapped[str]
+    username: Mapped[str] = mapped_column(index=True)
     orders: Mapped[Optional[list["Order"]]] = relationship(back_populates="user")
@@ -0,0 +1,11 @@
+from src.publisher.stock_publisher import (
+    router as stock_pub,
+    StockChangePublisher,
+    get_stock_publisher,
+)
+
+__all__ = [
+    "stock_pub",
+    "StockChangePublisher",
+    "get_stock_publisher",
+]
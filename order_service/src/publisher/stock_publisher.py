@@ -0,0 +1,112 @@
+import asyncio
+from collections import defaultdict
+from typing import Dict, Optional
+
+from faststream.rabbit.fastapi import RabbitRouter
+
+from src.config import get_settings
+from src.core.logging_config import logger
+from src.core.metrics import broker_metrics_middleware
+from src.core.tracing import broker_tracing_middleware
+from src.schemas import StockChangedDTO, StockDeltaDTO
+
+settings = get_settings()
+
+router = RabbitRouter(
+    settings.rabbitmq_url,
+    graceful_timeout=settings.shutdown_timeout,
+    middlewares=[broker_metrics_middleware, broker_tracing_middleware],
+)
+
+
+class StockChangePublisher:
+    """
+    Публикация изменений остатков товаров в catalog_service
+
+    Изменения накапливаются по товарам в течение короткого окна
+    и уходят одним сообщением stock.changed, поэтому популярный товар
+    дает одно сообщение за окно, а не одно на каждый заказ
+    """
+
+    def __init__(self, window: float):
+        """
+        Инициализация публикатора
+
+        Args:
+            window: Длительность окна накопления изменений в секундах
+        """
+        self.window = window
+        self._deltas: Dict[int, int] = defaultdict(int)
+        self._flush_task: Optional[asyncio.Task] = None
+
+    def add(self, product_id: int, delta: int) -> None:
+        """
+        Добавить изменение остатка товара в текущее окно
+
+        Args:
+            product_id: ID товара
+            delta: Изменение остатка (отрицательное - списание со склада)
+        """
+        if not delta:
+            return
+
+        self._deltas[product_id] += delta
+        if self._flush_task is None or self._flush_task.done():
+            self._flush_task = asyncio.create_task(self._flush_later())
+
+    async def _flush_later(self) -> None:
+        # Изменения, добавленные во время публикации (и возвращенные после ошибки),
+        # отправляются следующим окном той же задачи: add() не создает новую, пока она работает
+        while self._deltas:
+            await asyncio.sleep(self.window)
+            await self.flush()
+
+    async def flush(self) -> None:
+        """
+        Отправить накопленные изменения одним сообщением
+
+        При ошибке публикации изменения возвращаются в буфер
+        и будут отправлены в следующем окне
+        """
+        deltas, self._deltas = self._deltas, defaultdict(int)
+        items = [
+            StockDeltaDTO(product_id=product_id, delta=delta)
+            for product_id, delta in deltas.items()
+            if delta
+        ]
+        if not items:
+            return
+
+        try:
+            await router.broker.publish(
+                message=StockChangedDTO(items=items).model_dump(),
+                queue="stock.changed"
+            )
+            logger.info("Stock changes published: %s products", len(items))
+        except Exception as e:
+            logger.error("Error publishing stock changes: %s", e, exc_info=True)
+            for item in items:
+                self._deltas[item.product_id] += item.delta
+
+    async def close(self) -> None:
+        """
+        Отправить накопленные изменения без ожидания окна (при остановке сервиса)
+        """
+        if self._flush_task is not None and not self._flush_task.done():
+            self._flush_task.cancel()
+
+        await self.flush()
+
+        if self._deltas:
+            logger.error("Stock changes were not published before shutdown: %s", dict(self._deltas))
+
+
+_stock_publisher = None
+
+def get_stock_publisher():
+    global _stock_publisher
+
+    if _stock_publisher is None:
+        _stock_publisher = StockChangePublisher(settings.stock_events_window)
+
+    return _stock_publisher
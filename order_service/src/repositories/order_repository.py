@@ -1,6 +1,6 @@
-from typing import Optional, List
+from typing import Optional, List, Dict
 
-from sqlalchemy import select
+from sqlalchemy import select, delete
 from sqlalchemy.orm import selectinload
 
 from src.repositories.base_repository import BaseRepository
@@ -48,7 +48,7 @@ class OrderRepository(BaseRepository):
         Returns:
             Order с загруженными связями или None, если заказ не найден
         """
-        result = await self.session.execute(
+        result = await self.execute_read(
             select(Order)
             .where(Order.id == order_id)
             .options(
@@ -94,7 +94,7 @@ class OrderRepository(BaseRepository):
         Returns:
             Список заказов с загруженными связями
         """
-        result = await self.session.execute(
+        result = await self.execute_read(
             select(Order)
             .offset(skip)
             .limit(limit)
@@ -105,15 +105,30 @@ class OrderRepository(BaseRepository):
         )
         return list(result.scalars().all())
 
-    async def delete_order(self, order: Order) -> None:
+    async def delete_order(self, order_id: int) -> Dict[int, int]:
         """
-        Удалить заказ
+        Удалить заказ вместе с его элементами в рамках текущей транзакции
 
         Args:
-            order: Заказа для удаления
+            order_id: ID заказа для удаления
+
+        Returns:
+            Словарь {ID товара: количество} по удаленным элементам заказа
         """
-        async with self.transaction():
-            await self.session.delete(order)
+        result = await self.session.execute(
+            delete(OrderItem)
+            .where(OrderItem.order_id == order_id)
+            .returning(OrderItem.product_id, OrderItem.product_quantity)
+            .execution_options(synchronize_session=False)
+        )
+        returned = {product_id: quantity for product_id, quantity in result.all()}
+
+        await self.session.execute(
+            delete(Order)
+            .where(Order.id == order_id)
+            .execution_options(synchronize_session=False)
+        )
+        return returned
 
 _order_repo = None
 
@@ -1,6 +1,7 @@
-from typing import Optional, List
+from typing import Any, Optional, List, Dict, Tuple
 
-from sqlalchemy import select
+from sqlalchemy import select, text
+from sqlalchemy.dialects.postgresql import insert
 
 from src.repositories.base_repository import BaseRepository
 from src.models import Product
@@ -44,6 +45,26 @@ class ProductRepository(BaseRepository):
         )
         return list(result.scalars().all())
 
+    async def return_stock(self, quantities: Dict[int, int]) -> None:
+        """
+        Вернуть товары на склад одним запросом в рамках текущей транзакции
+
+        Args:
+            quantities: Словарь {ID товара: возвращаемое количество}
+        """
+        if not quantities:
+            return
+
+        await self.session.execute(
+            text(
+                "UPDATE products SET storage_quantity = products.storage_quantity + returned.quantity "
+                "FROM unnest(CAST(:ids AS INTEGER[]), CAST(:quantities AS INTEGER[])) "
+                "AS returned(id, quantity) "
+                "WHERE products.id = returned.id"
+            ),
+            {"ids": list(quantities.keys()), "quantities": list(quantities.values())}
+        )
+
     async def create(self, product: Product) -> Product:
         """
         Создать новый товар
@@ -56,6 +77,108 @@ class ProductRepository(BaseRepository):
         """
         return (await self.save_all([product]))[0]
 
+    async def create_many(self, rows: List[Dict[str, Any]]) -> int:
+        """
+        Создать несколько товаров многострочными INSERT
+
+        Товары с уже существующими ID пропускаются: повторная доставка
+        события не приводит к ошибке
+
+        Args:
+            rows: Значения колонок товаров (id, name, price, storage_quantity)
+
+        Returns:
+            Количество созданных товаров
+        """
+        if not rows:
+            return 0
+
+        async with self.transaction():
+            result = await self.session.execute(
+                insert(Product).on_conflict_do_nothing(index_elements=[Product.id]).returning(Product.id),
+                rows
+            )
+            return len(result.all())
+
+    async def apply_changes(self, changes: List[Dict[str, Any]]) -> Tuple[int, List[int]]:
+        """
+        Применить изменения товаров одним запросом
+
+        Остаток изменяется на quantity_delta, а не перезаписывается: в нем есть
+        списания заказов, которые каталог еще не получил. Строки товаров
+        блокируются в подзапросе (FOR UPDATE), прежний остаток читается там же
+
+        Args:
+            changes: Изменения {id, name, price, quantity_delta}; None - значение не меняется
+
+        Returns:
+            Количество измененных товаров (отсутствующие ID пропускаются) и ID товаров,
+            остаток которых ушел бы ниже нуля и был обнулен
+        """
+        if not changes:
+            return 0, []
+
+        async with self.transaction():
+            result = await self.session.execute(
+                text(
+                    "UPDATE products SET "
+                    "name = COALESCE(changes.name, products.name), "
+                    "price = COALESCE(changes.price, products.price), "
+                    "storage_quantity = GREATEST(products.storage_quantity + changes.quantity_delta, 0) "
+                    "FROM ("
+                    "SELECT current.id, source.name, source.price, source.quantity_delta, "
+                    "current.storage_quantity AS old_quantity "
+                    "FROM unnest(CAST(:ids AS INTEGER[]), CAST(:names AS VARCHAR[]), "
+                    "CAST(:prices AS INTEGER[]), CAST(:quantity_deltas AS INTEGER[])) "
+                    "AS source(id, name, price, quantity_delta) "
+                    "JOIN products AS current ON current.id = source.id "
+                    "FOR UPDATE OF current"
+                    ") AS changes "
+                    "WHERE products.id = changes.id "
+                    "RETURNING products.id, changes.old_quantity + changes.quantity_delta < 0 AS clamped"
+                ),
+                {
+                    "ids": [change["id"] for change in changes],
+                    "names": [change["name"] for change in changes],
+                    "prices": [change["price"] for change in changes],
+                    "quantity_deltas": [change["quantity_delta"] for change in changes],
+                }
+            )
+            rows = result.all()
+            return len(rows), [row.id for row in rows if row.clamped]
+
+    async def delete_many(self, product_ids: List[int]) -> Tuple[int, int]:
+        """
+        Удалить товары, которых нет в заказах; товарам из заказов обнулить остаток
+
+        Позиции заказов удаляются вместе с товаром (ON DELETE CASCADE), поэтому
+        товары из заказов остаются для истории, но больше не могут быть заказаны
+
+        Args:
+            product_ids: ID товаров
+
+        Returns:
+            Количество удаленных товаров и товаров с обнуленным остатком
+        """
+        if not product_ids:
+            return 0, 0
+
+        params = {"ids": product_ids}
+        async with self.transaction():
+            deleted = await self.session.execute(
+                text(
+                    "DELETE FROM products WHERE id = ANY(CAST(:ids AS INTEGER[])) "
+                    "AND NOT EXISTS (SELECT 1 FROM order_items WHERE order_items.product_id = products.id)"
+                ),
+                params
+            )
+            disabled = await self.session.execute(
+                text("UPDATE products SET storage_quantity = 0 WHERE id = ANY(CAST(:ids AS INTEGER[]))"),
+                params
+            )
+            return deleted.rowcount, disabled.rowcount
+
+
 _product_repo = None
 
 def get_product_repo():
@@ -11,7 +11,15 @@ from src.schemas.order_schemas import (
     OrderResponseDTO,
     OrderDetailResponseDTO,
     OrderItemUpdateResponseDTO,
-    OrderUpdateResponseDTO
+    OrderUpdateResponseDTO,
+
+    # Event DTOs
+    StockDeltaDTO,
+    StockChangedDTO,
+    ProductsCreatedDTO,
+    ProductChangeDTO,
+    ProductsUpdatedDTO,
+    ProductsDeletedDTO,
 )
 from src.schemas.user_schemas import (
     UserBase,
@@ -31,6 +39,13 @@ __all__ = [
     "OrderItemUpdateResponseDTO",
     "OrderUpdateResponseDTO",
     "OrdersListResponseDTO",
+    # Event DTOs
+    "StockDeltaDTO",
+    "StockChangedDTO",
+    "ProductsCreatedDTO",
+    "ProductChangeDTO",
+    "ProductsUpdatedDTO",
+    "ProductsDeletedDTO",
     # User DTOs
     "UserBase",
     "UserAll"
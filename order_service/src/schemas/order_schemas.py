@@ -1,5 +1,5 @@
 import uuid
-from typing import List
+from typing import List, Optional
 
 from pydantic import BaseModel, Field
 
@@ -26,8 +26,9 @@ class UpdateOrderDTO(BaseModel):
 
 class ProductAddDTO(BaseModel):
     """DTO для добавления товара"""
+    id: Optional[int] = Field(default=None, gt=0, description="ID товара в catalog_service")
     name: str
-    quantity: int = Field(gt=0, description="Количество товара должно быть больше 0")
+    quantity: int = Field(ge=0, description="Количество товара должно быть неотрицательным")
     price: int = Field(ge=0, description="Цена товара должна быть неотрицательной")
 
 
@@ -79,3 +80,37 @@ class OrdersListResponseDTO(BaseModel):
     orders: List[OrderDetailResponseDTO]
     total: int
 
+
+# Event DTOs
+class StockDeltaDTO(BaseModel):
+    """Изменение остатка одного товара"""
+    product_id: int
+    delta: int
+
+
+class StockChangedDTO(BaseModel):
+    """Событие stock.changed: накопленные изменения остатков по товарам"""
+    items: List[StockDeltaDTO]
+
+
+class ProductsCreatedDTO(BaseModel):
+    """Событие products.created: пакет созданных товаров (импорт в catalog_service)"""
+    items: List[ProductAddDTO]
+
+
+class ProductChangeDTO(BaseModel):
+    """Изменение товара в catalog_service (None - поле не изменилось)"""
+    id: int
+    name: Optional[str] = None
+    price: Optional[int] = Field(None, ge=0)
+    quantity_delta: Optional[int] = None  # изменение остатка, а не новое значение
+
+
+class ProductsUpdatedDTO(BaseModel):
+    """Событие products.updated: новые значения измененных полей товаров и изменения остатков"""
+    items: List[ProductChangeDTO]
+
+
+class ProductsDeletedDTO(BaseModel):
+    """Событие products.deleted: ID товаров, удаленных в catalog_service"""
+    ids: List[int]
@@ -9,6 +9,7 @@ from src.exceptions import (
     BusinessRuleError
 )
 from src.schemas import UpdateOrderDTO, OrderAddDTO
+from src.publisher import StockChangePublisher
 
 
 class OrderService:
@@ -17,16 +18,19 @@ class OrderService:
     """
     
     def __init__(self, order_repository: OrderRepository,
-                 product_repository: ProductRepository):
+                 product_repository: ProductRepository,
+                 stock_publisher: StockChangePublisher):
         """
         Инициализация сервиса
         
         Args:
             order_repository: Репозиторий для работы с заказами
             product_repository: Репозиторий для работы с товарами
+            stock_publisher: Публикатор изменений остатков для catalog_service
         """
         self.order_repo = order_repository
         self.product_repo = product_repository
+        self.stock_publisher = stock_publisher
 
     async def create_order(self, data: OrderAddDTO) -> Order:
         """
@@ -87,6 +91,9 @@ class OrderService:
         # Сохраняем все изменения
         await self.order_repo.save_all(entities_to_save)
 
+        for item_data in data.items:
+            self.stock_publisher.add(item_data.product_id, -item_data.quantity)
+
         # Получаем заказ с загруженными связями
         order = await self.order_repo.get_order_with_relations(order.id)
         return order
@@ -128,9 +135,11 @@ class OrderService:
         self._validate_order_update(product, difference)
 
         # Применяем изменения
+        stock_delta = existing_item.product_quantity - data.quantity
         self._apply_order_changes(existing_item, product, order, data.quantity)
 
         await self.order_repo.save_all([existing_item, product, order])
+        self.stock_publisher.add(product.id, stock_delta)
 
         return existing_item
 
@@ -168,31 +177,27 @@ class OrderService:
 
     async def delete_order(self, order_id: int) -> None:
         """
-        Удалить товар из заказа с возвратом на склад
+        Удалить заказ с возвратом товаров на склад
         
+        Возврат остатков и удаление выполняются в одной транзакции,
+        остатки возвращаются одним UPDATE по всем товарам заказа
+
         Args:
             order_id: ID заказа
-            product_id: ID товара
 
         Raises:
-            NotFoundError: Если заказ, товар или элемент заказа не найдены
+            NotFoundError: Если заказ не найден
         """
-        # Получаем заказ
-        order = await self.order_repo.get_order_with_relations(order_id)
+        order = await self.order_repo.get_by_id(order_id)
         if not order:
             raise NotFoundError(f"Order with id {order_id} not found")
 
-        # Получаем товар
-        products = []
-        for order_item in order.product_items:
-            product = order_item.product
-            # Возвращаем товар на склад
-            product.storage_quantity += order_item.product_quantity
-            products.append(product)
-
-        # Сохраняем изменения и удаляем элемент заказа
-        await self.order_repo.save_all(products)
-        await self.order_repo.delete_order(order)
+        async with self.order_repo.transaction():
+            returned = await self.order_repo.delete_order(order_id)
+            await self.product_repo.return_stock(returned)
+
+        for product_id, quantity in returned.items():
+            self.stock_publisher.add(product_id, quantity)
 
     def _validate_order_update(self, product, quantity: int) -> None:
         """
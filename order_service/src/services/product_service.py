@@ -1,6 +1,8 @@
+from typing import List, Tuple
+
 from src.repositories import ProductRepository
 from src.models import Product
-from src.schemas import ProductAddDTO
+from src.schemas import ProductAddDTO, ProductChangeDTO
 
 
 class ProductService:
@@ -28,9 +30,68 @@ class ProductService:
             Созданный товар
         """
         product = Product(
+            id=data.id,
             name=data.name,
             price=data.price,
             storage_quantity=data.quantity
         )
         return await self.product_repo.create(product)
 
+    async def create_products(self, items: List[ProductAddDTO]) -> int:
+        """
+        Создать пакет товаров
+        
+        Args:
+            items: Данные товаров для создания
+            
+        Returns:
+            Количество созданных товаров (уже существующие пропускаются)
+        """
+        return await self.product_repo.create_many([
+            {
+                "id": item.id,
+                "name": item.name,
+                "price": item.price,
+                "storage_quantity": item.quantity,
+            }
+            for item in items
+        ])
+
+    async def apply_changes(self, items: List[ProductChangeDTO]) -> Tuple[int, List[int]]:
+        """
+        Применить пакет изменений товаров из catalog_service
+        
+        Для повторяющихся ID название и цена берутся из последнего изменения,
+        изменения остатка складываются
+        
+        Args:
+            items: Новые значения измененных полей товаров и изменения остатков
+            
+        Returns:
+            Количество измененных товаров и ID товаров, остаток которых ушел бы
+            ниже нуля и был обнулен (остатки сервисов разошлись)
+        """
+        changes = {}
+        for item in items:
+            change = changes.setdefault(item.id, {"id": item.id, "name": None, "price": None, "quantity_delta": 0})
+            if item.name is not None:
+                change["name"] = item.name
+            if item.price is not None:
+                change["price"] = item.price
+            change["quantity_delta"] += item.quantity_delta or 0
+
+        return await self.product_repo.apply_changes(list(changes.values()))
+
+    async def delete_products(self, product_ids: List[int]) -> Tuple[int, int]:
+        """
+        Удалить товары, удаленные в catalog_service
+        
+        Товары, которые есть в заказах, не удаляются: их остаток обнуляется
+        
+        Args:
+            product_ids: ID товаров
+            
+        Returns:
+            Количество удаленных товаров и товаров с обнуленным остатком
+        """
+        return await self.product_repo.delete_many(product_ids)